@@ -0,0 +1,47 @@
+"""unique signal per channel message
+
+Revision ID: 3f9c2a7d41b8
+Revises: dbcc3d0f6059
+Create Date: 2026-10-17 09:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, None] = 'dbcc3d0f6059'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest signal of each duplicated (channel_id, original_message_id)
+    op.execute("""
+        WITH removed AS (
+            DELETE FROM signals s
+            USING signals keep
+            WHERE s.channel_id = keep.channel_id
+              AND s.original_message_id = keep.original_message_id
+              AND (s.created_at, s.id) > (keep.created_at, keep.id)
+            RETURNING s.channel_id
+        )
+        UPDATE channels c
+        SET signal_count = greatest(c.signal_count - r.removed_count, 0)
+        FROM (SELECT channel_id, count(*) AS removed_count FROM removed GROUP BY channel_id) r
+        WHERE c.id = r.channel_id
+    """)
+    op.create_index(
+        'uq_signals_channel_original_message',
+        'signals',
+        ['channel_id', 'original_message_id'],
+        unique=True,
+        postgresql_where=sa.text('original_message_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_signals_channel_original_message', table_name='signals')
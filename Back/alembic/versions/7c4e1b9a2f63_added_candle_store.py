@@ -0,0 +1,57 @@
+"""added candle store
+
+Revision ID: 7c4e1b9a2f63
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-17 14:03:27.164839
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e1b9a2f63'
+down_revision: Union[str, None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'candles',
+        sa.Column('symbol', sa.String(length=50), nullable=False),
+        sa.Column('interval', sa.String(length=10), nullable=False),
+        sa.Column('time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('open', sa.Float(), nullable=False),
+        sa.Column('high', sa.Float(), nullable=False),
+        sa.Column('low', sa.Float(), nullable=False),
+        sa.Column('close', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('symbol', 'interval', 'time')
+    )
+    op.create_index('ix_candles_time_brin', 'candles', ['time'], unique=False, postgresql_using='brin')
+
+    op.create_table(
+        'candle_coverage',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('symbol', sa.String(length=50), nullable=False),
+        sa.Column('interval', sa.String(length=10), nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_candle_coverage_symbol_interval',
+        'candle_coverage',
+        ['symbol', 'interval', 'start_time'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_candle_coverage_symbol_interval', table_name='candle_coverage')
+    op.drop_table('candle_coverage')
+    op.drop_index('ix_candles_time_brin', table_name='candles')
+    op.drop_table('candles')
@@ -0,0 +1,91 @@
+"""added channel stats
+
+Revision ID: b5e2f8c14d07
+Revises: 7c4e1b9a2f63
+Create Date: 2026-10-17 18:26:51.302417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2f8c14d07'
+down_revision: Union[str, None] = '7c4e1b9a2f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _counter_columns() -> list:
+    return [
+        sa.Column('signal_count', sa.Integer(), nullable=False),
+        sa.Column('pending_count', sa.Integer(), nullable=False),
+        sa.Column('win_count', sa.Integer(), nullable=False),
+        sa.Column('loss_count', sa.Integer(), nullable=False),
+        sa.Column('risk_reward_sum', sa.Float(), nullable=False),
+        sa.Column('risk_reward_count', sa.Integer(), nullable=False),
+        sa.Column('pnl_percent_sum', sa.Float(), nullable=False),
+        sa.Column('pnl_percent_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'channel_stats',
+        sa.Column('channel_id', postgresql.UUID(as_uuid=True), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['channel_id'], ['channels.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('channel_id')
+    )
+    op.create_table(
+        'channel_symbol_stats',
+        sa.Column('channel_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('symbol', sa.String(length=50), nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['channel_id'], ['channels.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('channel_id', 'symbol')
+    )
+
+    # Backfill from the existing signals
+    op.execute("""
+        INSERT INTO channel_symbol_stats
+        SELECT
+            channel_id,
+            symbol,
+            count(*),
+            count(*) FILTER (WHERE performance_outcome IS NULL OR performance_outcome = 'PENDING'),
+            count(*) FILTER (WHERE performance_outcome = 'WIN'),
+            count(*) FILTER (WHERE performance_outcome = 'LOSS'),
+            coalesce(sum((take_profits -> 0 ->> 'risk_reward_ratio')::float), 0),
+            count((take_profits -> 0 ->> 'risk_reward_ratio')::float),
+            coalesce(sum(pnl_percent) FILTER (WHERE performance_outcome IN ('WIN', 'LOSS')), 0),
+            count(pnl_percent) FILTER (WHERE performance_outcome IN ('WIN', 'LOSS')),
+            now()
+        FROM signals
+        GROUP BY channel_id, symbol
+    """)
+    op.execute("""
+        INSERT INTO channel_stats
+        SELECT
+            channel_id,
+            sum(signal_count),
+            sum(pending_count),
+            sum(win_count),
+            sum(loss_count),
+            sum(risk_reward_sum),
+            sum(risk_reward_count),
+            sum(pnl_percent_sum),
+            sum(pnl_percent_count),
+            now()
+        FROM channel_symbol_stats
+        GROUP BY channel_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('channel_symbol_stats')
+    op.drop_table('channel_stats')
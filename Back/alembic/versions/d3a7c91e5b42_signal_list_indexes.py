@@ -0,0 +1,38 @@
+"""signal list indexes
+
+Revision ID: d3a7c91e5b42
+Revises: b5e2f8c14d07
+Create Date: 2026-10-17 19:41:08.925361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c91e5b42'
+down_revision: Union[str, None] = 'b5e2f8c14d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_signals_channel_created_id',
+        'signals',
+        ['channel_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+    op.create_index(
+        'ix_signals_user_created_id',
+        'signals',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_signals_user_created_id', table_name='signals')
+    op.drop_index('ix_signals_channel_created_id', table_name='signals')
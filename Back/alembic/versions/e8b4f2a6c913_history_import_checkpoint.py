@@ -0,0 +1,26 @@
+"""history import checkpoint
+
+Revision ID: e8b4f2a6c913
+Revises: d3a7c91e5b42
+Create Date: 2026-10-17 21:12:47.530194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4f2a6c913'
+down_revision: Union[str, None] = 'd3a7c91e5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('channels', sa.Column('history_import_message_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('channels', 'history_import_message_id')
@@ -12,6 +12,7 @@ from api.routes import market_data
 from api.routes import channels
 from api.routes import templates
 from api.routes import signals
+from api.routes import metrics
 
 __all__ = ["api_bp"]
 
@@ -6,6 +6,7 @@ from . import market_data
 from . import channels
 from . import templates
 from . import signals
+from . import metrics
 
-__all__ = ["accounts", "risk", "market_data", "channels", "templates", "signals"]
+__all__ = ["accounts", "risk", "market_data", "channels", "templates", "signals", "metrics"]
 
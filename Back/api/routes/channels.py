@@ -7,8 +7,10 @@ from utils.auth_utils import auth_required, get_current_account_id
 from api import api_bp
 from api.validations.channel_validations import ChannelSchema
 
-from utils import get_db, db_session_required, get_module_logger
+from utils import get_db, get_read_db, db_session_required, get_module_logger
 from services.channel_service import ChannelService
+from services.backtest_service import BacktestService
+from services.channel_stats_service import ChannelStatsService
 from config.exceptions_handler import DatabaseError, ValidationError
 
 
@@ -20,7 +22,7 @@ logger = get_module_logger("api.routes.channels")
 def list_account_channels():
     """Get all channels for the authenticated account."""
     try:
-        db = get_db()
+        db = get_read_db()
         
         # Parse query parameters
         status = request.args.get('status')
@@ -53,7 +55,7 @@ def list_account_channels():
 def get_channel(channel_id):
     """Get a specific channel by ID."""
     try:
-        db = get_db()
+        db = get_read_db()
         channel = ChannelService.get_channel_by_id(db, channel_id)
         
         if not channel:
@@ -201,3 +203,75 @@ def delete_channel(channel_id):
             'success': False,
             'error': str(e)
         }), 500
+
+
+@api_bp.route('/channels/<uuid:channel_id>/backtest', methods=['POST'])
+@db_session_required
+@auth_required
+def backtest_channel(channel_id):
+    """Replay a channel's signals against historical candles and score them."""
+    try:
+        options = ChannelSchema.validate_backtest(request.get_json(silent=True) or {})
+        
+        db = get_db()
+        channel = ChannelService.get_channel_by_id(db, channel_id)
+        if not channel:
+            return jsonify({
+                'success': False,
+                'error': 'Channel not found'
+            }), 404
+        
+        result = BacktestService.run_channel_backtest(db, channel_id, **options)
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        }), 200
+    
+    except (ValueError, ValidationError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error backtesting channel {channel_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api_bp.route('/channels/<uuid:channel_id>/stats', methods=['GET'])
+@db_session_required
+@auth_required
+def get_channel_stats(channel_id):
+    """Get a channel's signal performance aggregates, overall and per symbol."""
+    try:
+        db = get_read_db()
+        channel = ChannelService.get_channel_by_id(db, channel_id)
+        if not channel:
+            return jsonify({
+                'success': False,
+                'error': 'Channel not found'
+            }), 404
+        
+        stats, symbol_stats = ChannelStatsService.get_channel_stats(db, channel_id)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'channel_id': str(channel_id),
+                **ChannelSchema.serialize_stats(stats),
+                'symbols': [
+                    {'symbol': row.symbol, **ChannelSchema.serialize_stats(row)}
+                    for row in symbol_stats
+                ],
+            }
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Error fetching stats of channel {channel_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
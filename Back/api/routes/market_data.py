@@ -1,16 +1,41 @@
 """Market data API routes - handles HTTP request/response only."""
 
-from flask import request, jsonify
+import json
+import threading
+import time
+
+from flask import request, jsonify, Response, stream_with_context
 
 from api import api_bp
 from services.market_data_service import MarketDataService
+from services.market_data_poller import market_data_poller, quote_store
 from utils.auth_utils import auth_required
 from utils.database_utils import db_session_required
 from utils.logger_utils import get_module_logger
-from config.exceptions_handler import ValidationError
+from config.env_handler import EnvHandler
+from config.exceptions_handler import ValidationError, RateLimitExceeded, ProviderUnavailable
 
 logger = get_module_logger("api.routes.market_data")
 
+env_handler = EnvHandler()
+
+# Seconds between keep-alive comments on an idle quote stream
+STREAM_KEEPALIVE_SECONDS = 15
+
+STREAM_MAX_CLIENTS = env_handler.get_env("MARKET_DATA_STREAM_MAX_CLIENTS")
+STREAM_MAX_SECONDS = env_handler.get_env("MARKET_DATA_STREAM_MAX_SECONDS")
+
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+
+def _release_stream() -> None:
+    """Free the slot of a closed quote stream and stop consuming its quotes."""
+    global _open_streams
+    with _open_streams_lock:
+        _open_streams -= 1
+    market_data_poller.detach()
+
 
 @api_bp.route('/market-data/<symbol>', methods=['GET'])
 @auth_required
@@ -20,14 +45,26 @@ def get_market_data(symbol):
     try:
         logger.debug(f"Fetching market data for symbol: {symbol}")
         
-        # Fetch price with change percentage
-        data = MarketDataService.fetch_price_with_change(symbol.upper())
+        # Fetch price with change percentage (cached)
+        data = MarketDataService.get_quote(symbol.upper())
         
         return jsonify({
             'success': True,
             'data': data
         }), 200
         
+    except RateLimitExceeded as e:
+        logger.warning(f"Rate limited fetching market data for {symbol}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 429
+    except ProviderUnavailable as e:
+        logger.warning(f"Market data provider unavailable for {symbol}: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
     except ValidationError as e:
         logger.warning(f"Validation error fetching market data for {symbol}: {e}")
         return jsonify({
@@ -60,8 +97,14 @@ def get_multiple_market_data():
         symbols = [s.strip().upper() for s in symbols_param.split(',')]
         logger.debug(f"Fetching market data for symbols: {symbols}")
         
-        # Fetch data for all symbols
-        data = MarketDataService.fetch_multiple_prices(symbols)
+        # Serve what the background poller already has; fetch the rest and keep them polled
+        stored = quote_store.get_many(symbols)
+        missing = [symbol for symbol in symbols if symbol not in stored]
+        fetched = {}
+        if missing:
+            fetched = MarketDataService.fetch_multiple_prices(missing)
+            market_data_poller.subscribe(missing)
+        data = {symbol: stored[symbol] if symbol in stored else fetched[symbol] for symbol in symbols}
         
         return jsonify({
             'success': True,
@@ -81,3 +124,72 @@ def get_multiple_market_data():
             'error': str(e)
         }), 500
 
+
+@api_bp.route('/market-data/stream', methods=['GET'])
+@auth_required
+def stream_market_data():
+    """
+    Stream quote updates for multiple symbols as server-sent events.
+    
+    Quotes come from the market data poller, which is started on demand
+    while streams are open if it isn't enabled at boot. At most
+    MARKET_DATA_STREAM_MAX_CLIENTS streams are open at once, and each ends
+    after MARKET_DATA_STREAM_MAX_SECONDS; clients are expected to reconnect.
+    """
+    global _open_streams
+    symbols_param = request.args.get('symbols', '')
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols_param.split(',') if s.strip()))
+    if not symbols:
+        return jsonify({
+            'success': False,
+            'error': 'symbols parameter is required (comma-separated list)'
+        }), 400
+
+    with _open_streams_lock:
+        if _open_streams >= STREAM_MAX_CLIENTS:
+            return jsonify({
+                'success': False,
+                'error': 'Too many open quote streams, try again later'
+            }), 503
+        _open_streams += 1
+
+    market_data_poller.attach(symbols)
+    logger.debug(f"Streaming market data for symbols: {symbols}")
+
+    def events():
+        ends_at = time.monotonic() + STREAM_MAX_SECONDS
+        version, quotes = quote_store.snapshot(symbols)
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if missing:
+            # Give a poll started for new symbols a chance to land before the first event
+            version, _ = quote_store.wait_for_changes(version, missing, STREAM_KEEPALIVE_SECONDS)
+            version, quotes = quote_store.snapshot(symbols)
+        yield _sse_event('quotes', quotes, version)
+        while True:
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return
+            version, changed = quote_store.wait_for_changes(version, symbols, min(STREAM_KEEPALIVE_SECONDS, remaining))
+            if changed:
+                yield _sse_event('quotes', changed, version)
+            else:
+                # Keeps proxies from closing the idle connection and renews the subscription
+                market_data_poller.subscribe(symbols)
+                yield ': keepalive\n\n'
+
+    response = Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
+    # Runs when the server closes the response, including on client disconnect
+    response.call_on_close(_release_stream)
+    return response
+
+
+def _sse_event(event: str, data: dict, event_id: int) -> str:
+    """Format one server-sent event."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
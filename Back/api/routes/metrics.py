@@ -0,0 +1,52 @@
+"""Metrics API routes - exposes in-process cache and queue statistics."""
+
+from flask import jsonify
+
+from api import api_bp
+from services.template_cache import template_cache
+from services.extraction_history_writer import extraction_history_writer
+from services.template_guard import template_guard
+from services.signal_dedup import recent_message_keys
+from services.quote_cache import quote_cache
+from services.market_data_poller import market_data_poller
+from services.credit_scheduler import credit_scheduler
+from services.circuit_breaker import circuit_breaker_stats
+from services.outcome_engine import outcome_evaluator
+from services.level_index import level_index
+from services.channel_stats_service import channel_stats_reconciler
+from utils.auth_utils import auth_required
+from utils.database_utils import read_routing_stats
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("api.routes.metrics")
+
+
+@api_bp.route('/metrics', methods=['GET'])
+@auth_required
+def get_metrics():
+    """Get statistics of in-process caches, queues and background workers."""
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'template_cache': template_cache.stats(),
+                'extraction_history_writer': extraction_history_writer.stats(),
+                'template_guard': template_guard.stats(),
+                'signal_dedup': recent_message_keys.stats(),
+                'quote_cache': quote_cache.stats(),
+                'market_data_poller': market_data_poller.stats(),
+                'credit_scheduler': credit_scheduler.stats(),
+                'circuit_breakers': circuit_breaker_stats(),
+                'outcome_evaluator': outcome_evaluator.stats(),
+                'level_index': level_index.stats(),
+                'channel_stats_reconciler': channel_stats_reconciler.stats(),
+                'database_replicas': read_routing_stats(),
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error fetching metrics: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
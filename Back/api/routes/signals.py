@@ -1,18 +1,47 @@
 """Signal API routes - handles HTTP request/response only."""
 
-from flask import request, jsonify
+import json
+from flask import request, jsonify, Response, stream_with_context
 from uuid import UUID
 
 from api import api_bp
 from api.validations.signal_validations import SignalSchema
 from services.signal_service import SignalService
+from services.channel_service import ChannelService
 from utils.auth_utils import auth_required, get_current_account_id
-from utils.database_utils import get_db, db_session_required
+from utils.database_utils import get_db, get_read_db, db_session_required
 from utils.logger_utils import get_module_logger
+from utils.pagination_utils import decode_cursor, encode_cursor
 from config.exceptions_handler import ValidationError
 
 logger = get_module_logger("api.routes.signals")
 
+# Content types accepted by the streaming ingest endpoint
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+def _page_params():
+    """Read limit, offset and cursor query parameters; one extra row is fetched to detect a next page."""
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', type=int)
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    return limit, (limit + 1 if limit else None), offset, after
+
+
+def _page_response(signals, limit, fields):
+    """Trim the extra row of a page and build the response with its next_cursor."""
+    next_cursor = None
+    if limit and len(signals) > limit:
+        signals = signals[:limit]
+        next_cursor = encode_cursor(signals[-1].created_at, signals[-1].id)
+    return jsonify({
+        'success': True,
+        'data': [SignalSchema.serialize(s, fields) for s in signals],
+        'count': len(signals),
+        'next_cursor': next_cursor
+    }), 200
+
 
 @api_bp.route('/signals', methods=['POST'])
 @auth_required
@@ -47,8 +76,23 @@ def create_signal():
                 'error': f'Invalid channel_id format: {str(e)}'
             }), 400
         
-        # Extract and create signal using active templates
         db = get_db()
+        
+        # Retried deliveries return the signal already created for the message
+        existing = SignalService.get_duplicate_signal(
+            db,
+            channel_id,
+            validated_data.get('original_message_id')
+        )
+        if existing:
+            logger.info(f"Duplicate message, returning existing signal: {existing.id}")
+            return jsonify({
+                'success': True,
+                'data': SignalSchema.serialize(existing),
+                'message': 'Signal already exists for this message'
+            }), 200
+        
+        # Extract and create signal using active templates
         signal = SignalService.extract_signal_from_message(
             db,
             channel_id=channel_id,
@@ -84,13 +128,275 @@ def create_signal():
         }), 500
 
 
+@api_bp.route('/signals/batch', methods=['POST'])
+@auth_required
+@db_session_required
+def create_signals_batch():
+    """Extract and create signals for a batch of messages."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Request body is required'
+            }), 400
+        
+        account_id = get_current_account_id()
+        if not account_id:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required'
+            }), 401
+        
+        messages = SignalSchema.validate_batch_create(data)
+        
+        # Validate each message on its own so bad entries are reported, not fatal
+        results = [None] * len(messages)
+        valid_messages = []
+        positions = []
+        for index, message in enumerate(messages):
+            try:
+                if not isinstance(message, dict):
+                    raise ValueError("Message must be an object")
+                validated_data = SignalSchema.validate_create(message)
+                try:
+                    validated_data['channel_id'] = UUID(str(validated_data['channel_id']))
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Invalid channel_id format: {str(e)}")
+            except ValueError as e:
+                results[index] = {'index': index, 'success': False, 'error': str(e)}
+                continue
+            valid_messages.append(validated_data)
+            positions.append(index)
+        
+        if valid_messages:
+            db = get_db()
+            batch_results = SignalService.extract_signals_batch(
+                db,
+                messages=valid_messages,
+                user_id=str(account_id)
+            )
+            for index, result in zip(positions, batch_results):
+                results[index] = {'index': index, **result}
+        
+        created = sum(1 for result in results if result['success'] and not result.get('duplicate'))
+        duplicates = sum(1 for result in results if result.get('duplicate'))
+        logger.info(f"Signal batch processed: {created}/{len(results)} created, {duplicates} duplicate(s)")
+        return jsonify({
+            'success': True,
+            'data': results,
+            'created': created,
+            'duplicates': duplicates,
+            'failed': len(results) - created - duplicates,
+            'message': 'Signal batch processed'
+        }), 200
+        
+    except ValidationError as e:
+        logger.warning(f"Signal batch validation error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except ValueError as e:
+        logger.warning(f"Signal batch validation error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error creating signal batch: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api_bp.route('/channels/<uuid:channel_id>/signals/ingest', methods=['POST'])
+@auth_required
+@db_session_required
+def ingest_channel_signals(channel_id):
+    """
+    Import a channel's message history from an NDJSON request stream.
+    
+    Each line is {"original_message_text": ..., "original_message_id": ...}.
+    The body is read line by line, messages are extracted and committed in
+    chunks of chunk_size, and progress is streamed back as NDJSON. After each
+    chunk the ID of the last message processed, signal or not, is saved as the
+    channel's import checkpoint. An interrupted import is resent from the
+    start with resume_after=<last_original_message_id of the last progress
+    line>, or with resume=true to use the saved checkpoint; lines up to and
+    including the one with that ID are skipped, whatever the ID order.
+    """
+    try:
+        if request.mimetype not in NDJSON_MIMETYPES:
+            return jsonify({
+                'success': False,
+                'error': f"Content-Type must be one of: {', '.join(NDJSON_MIMETYPES)}"
+            }), 415
+        
+        account_id = get_current_account_id()
+        if not account_id:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required'
+            }), 401
+        
+        params = SignalSchema.validate_ingest_params(request.args)
+        
+        db = get_db()
+        if not ChannelService.get_channel_by_id(db, channel_id):
+            return jsonify({
+                'success': False,
+                'error': 'Channel not found'
+            }), 404
+        
+        resume_after = params['resume_after']
+        if resume_after is None and params['resume']:
+            resume_after = SignalService.get_import_checkpoint(db, channel_id)
+        
+    except ValueError as e:
+        logger.warning(f"Signal ingest validation error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error starting signal ingest for channel {channel_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    logger.info(f"Signal ingest started for channel {channel_id} (resume after: {resume_after})")
+    events = _ingest_events(
+        db,
+        channel_id=channel_id,
+        user_id=str(account_id),
+        stream=request.stream,
+        chunk_size=params['chunk_size'],
+        resume_after=resume_after,
+        verbose=params['verbose']
+    )
+    return Response(
+        stream_with_context(json.dumps(event) + '\n' for event in events),
+        mimetype='application/x-ndjson'
+    )
+
+
+def _read_ndjson_lines(stream):
+    """
+    Yield raw lines from a request stream without buffering the body.
+    
+    Lines longer than SignalSchema.MAX_INGEST_LINE_BYTES are consumed and
+    yielded as None.
+    """
+    max_bytes = SignalSchema.MAX_INGEST_LINE_BYTES
+    while True:
+        line = stream.readline(max_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_bytes and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_bytes + 1)
+            yield None
+            continue
+        yield line
+
+
+def _ingest_events(db, channel_id, user_id, stream, chunk_size, resume_after, verbose):
+    """
+    Run an NDJSON message stream through batch extraction, one commit per chunk.
+    
+    Lines are skipped until the one whose original_message_id is
+    resume_after; the import checkpoint is saved after each chunk.
+    
+    Yields:
+        Event dicts: 'error' for invalid lines or a resume point missing from
+        the stream, 'result' per message when verbose, 'progress' after each
+        committed chunk, then 'done' or 'aborted'
+    """
+    totals = {
+        'lines': 0,
+        'created': 0,
+        'duplicates': 0,
+        'failed': 0,
+        'invalid': 0,
+        'skipped': 0,
+        'last_original_message_id': resume_after,
+    }
+    chunk = []
+    line_numbers = []
+    resuming = resume_after is not None
+    
+    def process_chunk():
+        results = SignalService.extract_signals_batch(db, messages=chunk, user_id=user_id)
+        events = []
+        for line_number, message, result in zip(line_numbers, chunk, results):
+            if result.get('duplicate'):
+                totals['duplicates'] += 1
+            else:
+                totals['created' if result['success'] else 'failed'] += 1
+            if verbose:
+                events.append({'event': 'result', 'line': line_number, **result})
+            if message['original_message_id'] is not None:
+                totals['last_original_message_id'] = message['original_message_id']
+        if totals['last_original_message_id'] is not None:
+            SignalService.save_import_checkpoint(db, channel_id, totals['last_original_message_id'])
+        chunk.clear()
+        line_numbers.clear()
+        events.append({'event': 'progress', **totals})
+        return events
+    
+    try:
+        for line_number, line in enumerate(_read_ndjson_lines(stream), start=1):
+            totals['lines'] = line_number
+            if line is None:
+                totals['invalid'] += 1
+                yield {'event': 'error', 'line': line_number, 'error': f"Line exceeds {SignalSchema.MAX_INGEST_LINE_BYTES} bytes"}
+                continue
+            if not line.strip():
+                continue
+            
+            try:
+                message = SignalSchema.validate_ingest_line(line)
+            except ValueError as e:
+                totals['invalid'] += 1
+                yield {'event': 'error', 'line': line_number, 'error': str(e)}
+                continue
+            
+            if resuming:
+                totals['skipped'] += 1
+                resuming = message['original_message_id'] != resume_after
+                continue
+            
+            message['channel_id'] = channel_id
+            chunk.append(message)
+            line_numbers.append(line_number)
+            if len(chunk) >= chunk_size:
+                yield from process_chunk()
+        
+        if chunk:
+            yield from process_chunk()
+        
+        if resuming:
+            yield {'event': 'error', 'error': f"Resume point {resume_after} not found in the stream; nothing was imported"}
+        
+    except Exception as e:
+        logger.error(f"Signal ingest for channel {channel_id} aborted at line {totals['lines']}: {e}", exc_info=True)
+        yield {'event': 'aborted', 'error': str(e), **totals}
+        return
+    
+    logger.info(f"Signal ingest finished for channel {channel_id}: {totals}")
+    yield {'event': 'done', **totals}
+
+
 @api_bp.route('/signals/<uuid:signal_id>', methods=['GET'])
 @auth_required
 @db_session_required
 def get_signal(signal_id):
     """Get a specific signal by ID."""
     try:
-        db = get_db()
+        db = get_read_db()
         signal = SignalService.get_signal_by_id(db, signal_id)
         
         if not signal:
@@ -117,32 +423,39 @@ def get_signal(signal_id):
 @auth_required
 @db_session_required
 def get_channel_signals(channel_id):
-    """Get all signals for a specific channel."""
+    """
+    Get all signals for a specific channel, newest first. Pass next_cursor as cursor to get the next page.
+    
+    fields=a,b,c or view=summary returns only some fields, and only their columns are loaded.
+    """
     try:
         # Get query parameters
-        limit = request.args.get('limit', type=int)
-        offset = request.args.get('offset', type=int)
+        limit, fetch_limit, offset, after = _page_params()
+        fields = SignalSchema.validate_fields(request.args.get('fields'), request.args.get('view'))
         symbol = request.args.get('symbol')
         signal_type = request.args.get('signal_type')
         performance_outcome = request.args.get('performance_outcome')
         
-        db = get_db()
+        db = get_read_db()
         signals = SignalService.get_channel_signals(
             db,
             channel_id,
-            limit=limit,
+            limit=fetch_limit,
             offset=offset,
             symbol=symbol,
             signal_type=signal_type,
-            performance_outcome=performance_outcome
+            performance_outcome=performance_outcome,
+            after=after,
+            columns=SignalSchema.columns_for(fields)
         )
         
-        return jsonify({
-            'success': True,
-            'data': [SignalSchema.serialize(s) for s in signals],
-            'count': len(signals)
-        }), 200
+        return _page_response(signals, limit, fields)
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error fetching signals for channel {channel_id}: {e}", exc_info=True)
         return jsonify({
@@ -155,7 +468,11 @@ def get_channel_signals(channel_id):
 @auth_required
 @db_session_required
 def get_user_signals():
-    """Get all signals for the authenticated user."""
+    """
+    Get all signals for the authenticated user, newest first. Pass next_cursor as cursor to get the next page.
+    
+    fields=a,b,c or view=summary returns only some fields, and only their columns are loaded.
+    """
     try:
         # Get current account ID from authenticated token
         account_id = get_current_account_id()
@@ -166,27 +483,30 @@ def get_user_signals():
             }), 401
         
         # Get query parameters
-        limit = request.args.get('limit', type=int)
-        offset = request.args.get('offset', type=int)
+        limit, fetch_limit, offset, after = _page_params()
+        fields = SignalSchema.validate_fields(request.args.get('fields'), request.args.get('view'))
 
         
-        db = get_db()
+        db = get_read_db()
         signals = SignalService.get_user_signals(
             db,
             str(account_id),  # Convert UUID to string since user_id is String(50)
-            limit=limit,
-            offset=offset
+            limit=fetch_limit,
+            offset=offset,
+            after=after,
+            columns=SignalSchema.columns_for(fields)
         )
 
         logger.info(f" Signals fetched successfully: {len(signals)}")
 
         
-        return jsonify({
-            'success': True,    
-            'data': [SignalSchema.serialize(s) for s in signals],
-            'count': len(signals)
-        }), 200
+        return _page_response(signals, limit, fields)
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error fetching signals for user {account_id}: {e}", exc_info=True)
         return jsonify({
@@ -7,7 +7,7 @@ from api import api_bp
 from api.validations.template_validations import TemplateSchema
 from services.template_service import TemplateService
 from utils.auth_utils import auth_required, get_current_account_id
-from utils.database_utils import get_db, db_session_required
+from utils.database_utils import get_db, get_read_db, db_session_required
 from utils.logger_utils import get_module_logger
 from config.exceptions_handler import ValidationError
 
@@ -91,7 +91,7 @@ def create_template():
 def get_template(template_id):
     """Get a specific template by ID."""
     try:
-        db = get_db()
+        db = get_read_db()
         template = TemplateService.get_template_by_id(db, template_id)
         
         if not template:
@@ -122,7 +122,7 @@ def get_channel_templates(channel_id):
     try:
         active_only = request.args.get('active_only', 'false').lower() == 'true'
         
-        db = get_db()
+        db = get_read_db()
         templates = TemplateService.get_channel_templates(
             db,
             channel_id,
@@ -248,3 +248,44 @@ def toggle_template_active(template_id):
             'error': str(e)
         }), 500
 
+
+@api_bp.route('/templates/<uuid:template_id>/benchmark', methods=['POST'])
+@auth_required
+@db_session_required
+def benchmark_template(template_id):
+    """Dry-run a template against its test message and recent channel messages."""
+    try:
+        data = request.get_json(silent=True) or {}
+        options = TemplateSchema.validate_benchmark(data)
+        
+        db = get_db()
+        report = TemplateService.benchmark_template(
+            db,
+            template_id,
+            sample_size=options['sample_size'],
+            slowest_count=options['slowest']
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': report
+        }), 200
+        
+    except ValidationError as e:
+        logger.warning(f"Template benchmark error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except ValueError as e:
+        logger.warning(f"Template benchmark validation error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error benchmarking template {template_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
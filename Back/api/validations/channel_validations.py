@@ -1,10 +1,11 @@
 """Request/Response schemas for API validation."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
 from models.channel import STATUS_ACTIVE
+from services.market_data_providers import INTERVAL_SECONDS
 
 
 class ChannelSchema:
@@ -38,6 +39,33 @@ class ChannelSchema:
                          'status', 'connection_status', 'signal_count']
         return {k: v for k, v in data.items() if k in allowed_fields}
     
+    @staticmethod
+    def validate_backtest(data: dict) -> dict:
+        """Validate channel backtest options."""
+        result = {'interval': str(data.get('interval') or '1h')}
+        if result['interval'] not in INTERVAL_SECONDS:
+            raise ValueError(f"Invalid interval. Must be one of: {', '.join(INTERVAL_SECONDS)}")
+        
+        for field in ('start', 'end'):
+            if data.get(field):
+                try:
+                    value = datetime.fromisoformat(str(data[field]).replace('Z', '+00:00'))
+                except ValueError:
+                    raise ValueError(f"{field} must be an ISO 8601 date")
+                result[field] = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        if result.get('start') and result.get('end') and result['start'] >= result['end']:
+            raise ValueError("start must be before end")
+        
+        symbols = data.get('symbols')
+        if symbols:
+            if isinstance(symbols, str):
+                symbols = symbols.split(',')
+            if not isinstance(symbols, list):
+                raise ValueError("symbols must be a list or a comma-separated string")
+            result['symbols'] = [str(symbol).strip() for symbol in symbols if str(symbol).strip()]
+        
+        return result
+    
     @staticmethod
     def serialize(channel) -> dict:
         """Serialize Channel model to dict."""
@@ -52,4 +80,25 @@ class ChannelSchema:
             'created_at': channel.created_at.isoformat() if channel.created_at else None,
             'updated_at': channel.updated_at.isoformat() if channel.updated_at else None,
         }
+    
+    @staticmethod
+    def serialize_stats(stats) -> dict:
+        """Serialize ChannelStats or ChannelSymbolStats model to dict (None serializes as empty)."""
+        def ratio(total, count):
+            return round(total / count, 2) if count else None
+        
+        signal_count = stats.signal_count if stats else 0
+        pending_count = stats.pending_count if stats else 0
+        win_count = stats.win_count if stats else 0
+        loss_count = stats.loss_count if stats else 0
+        return {
+            'signal_count': signal_count,
+            'pending_count': pending_count,
+            'win_count': win_count,
+            'loss_count': loss_count,
+            'win_rate': ratio(win_count * 100, win_count + loss_count),
+            'average_risk_reward': ratio(stats.risk_reward_sum, stats.risk_reward_count) if stats else None,
+            'average_pnl_percent': ratio(stats.pnl_percent_sum, stats.pnl_percent_count) if stats else None,
+            'updated_at': stats.updated_at.isoformat() if stats and stats.updated_at else None,
+        }
 
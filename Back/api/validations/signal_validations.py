@@ -1,12 +1,70 @@
 """Request/Response schemas for signal API validation."""
 
+import json
 from typing import Dict, Any, List, Optional
 from decimal import Decimal
 
 
+def _number(value) -> Optional[float]:
+    return float(value) if value else None
+
+
+def _timestamp(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _risk_reward_ratio(take_profits) -> Optional[float]:
+    # Signals have no risk/reward column; the first take profit's ratio stands for the signal
+    return _number(take_profits[0].get('risk_reward_ratio')) if take_profits else None
+
+
 class SignalSchema:
     """Schema for Signal model."""
     
+    # Maximum number of messages accepted by the batch extraction endpoint
+    MAX_BATCH_SIZE = 500
+    
+    # Serialized fields: the Signal columns each one reads and how it is serialized
+    FIELDS = {
+        'id': (('id',), lambda signal: str(signal.id)),
+        'channel_id': (('channel_id',), lambda signal: str(signal.channel_id)),
+        'template_id': (('template_id',), lambda signal: str(signal.template_id)),
+        'user_id': (('user_id',), lambda signal: signal.user_id),
+        'original_message_id': (('original_message_id',), lambda signal: signal.original_message_id),
+        'original_message_text': (('original_message_text',), lambda signal: signal.original_message_text),
+        'symbol': (('symbol',), lambda signal: signal.symbol),
+        'entry_price': (('entry_price',), lambda signal: _number(signal.entry_price)),
+        'take_profits': (('take_profits',), lambda signal: signal.take_profits),
+        'stop_loss': (('stop_loss',), lambda signal: signal.stop_loss),
+        'signal_type': (('signal_type',), lambda signal: signal.signal_type),
+        'timeframe': (('timeframe',), lambda signal: signal.timeframe),
+        'confidence_score': (('confidence_score',), lambda signal: _number(signal.confidence_score)),
+        'extraction_metadata': (('extraction_metadata',), lambda signal: signal.extraction_metadata),
+        'risk_reward_ratio': (('take_profits',), lambda signal: _risk_reward_ratio(signal.take_profits)),
+        'user_notes': (('user_notes',), lambda signal: signal.user_notes),
+        'performance_outcome': (('performance_outcome',), lambda signal: signal.performance_outcome),
+        'close_price': (('close_price',), lambda signal: _number(signal.close_price)),
+        'pnl': (('pnl',), lambda signal: _number(signal.pnl)),
+        'pnl_percent': (('pnl_percent',), lambda signal: _number(signal.pnl_percent)),
+        'closed_at': (('closed_at',), lambda signal: _timestamp(signal.closed_at)),
+        'created_at': (('created_at',), lambda signal: _timestamp(signal.created_at)),
+        'updated_at': (('updated_at',), lambda signal: _timestamp(signal.updated_at)),
+    }
+    
+    # Fields of view=summary: everything a signal table row shows, without the message text and raw extraction
+    SUMMARY_FIELDS = (
+        'id', 'channel_id', 'symbol', 'signal_type', 'entry_price', 'take_profits',
+        'stop_loss', 'timeframe', 'risk_reward_ratio', 'performance_outcome',
+        'close_price', 'pnl', 'pnl_percent', 'closed_at', 'created_at',
+    )
+    
+    # Columns list queries always load: the primary key and the pagination cursor
+    ALWAYS_LOADED_COLUMNS = ('id', 'created_at')
+    
+    # Streaming ingest: messages per commit, and the longest accepted NDJSON line
+    DEFAULT_INGEST_CHUNK_SIZE = 500
+    MAX_INGEST_LINE_BYTES = 1024 * 1024
+    
     @staticmethod
     def validate_create(data: dict) -> dict:
         """
@@ -32,14 +90,127 @@ class SignalSchema:
         if not data.get('original_message_text') or not str(data['original_message_text']).strip():
             raise ValueError("original_message_text cannot be empty")
         
+        original_message_id = data.get('original_message_id')
+        if original_message_id is not None:
+            try:
+                original_message_id = int(original_message_id)
+            except (ValueError, TypeError):
+                raise ValueError("original_message_id must be an integer")
+        
         result = {
             'channel_id': data['channel_id'],
             'original_message_text': str(data['original_message_text']),
-            'original_message_id': data.get('original_message_id'),
+            'original_message_id': original_message_id,
         }
         
         return result
     
+    @staticmethod
+    def validate_batch_create(data: dict) -> List[dict]:
+        """
+        Validate the envelope of a batch signal creation request.
+        
+        Individual messages are validated separately with validate_create so
+        one bad message does not reject the whole batch. A top-level channel_id
+        is used for messages that don't specify their own.
+        
+        Args:
+            data: Dictionary with a 'messages' array and optional 'channel_id'
+            
+        Returns:
+            List of raw message dictionaries
+            
+        Raises:
+            ValueError: If validation fails
+        """
+        messages = data.get('messages')
+        if not isinstance(messages, list) or not messages:
+            raise ValueError("messages must be a non-empty array")
+        
+        if len(messages) > SignalSchema.MAX_BATCH_SIZE:
+            raise ValueError(f"A batch can contain at most {SignalSchema.MAX_BATCH_SIZE} messages")
+        
+        default_channel_id = data.get('channel_id')
+        result = []
+        for message in messages:
+            if isinstance(message, dict) and default_channel_id and 'channel_id' not in message:
+                message = {**message, 'channel_id': default_channel_id}
+            result.append(message)
+        
+        return result
+    
+    @staticmethod
+    def validate_ingest_params(args) -> dict:
+        """
+        Validate query parameters of the streaming ingest endpoint.
+        
+        Args:
+            args: Request query arguments
+            
+        Returns:
+            Dictionary with chunk_size, resume_after, resume and verbose
+            
+        Raises:
+            ValueError: If validation fails
+        """
+        try:
+            chunk_size = int(args.get('chunk_size', SignalSchema.DEFAULT_INGEST_CHUNK_SIZE))
+        except (ValueError, TypeError):
+            raise ValueError("chunk_size must be an integer")
+        if chunk_size < 1 or chunk_size > SignalSchema.MAX_BATCH_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {SignalSchema.MAX_BATCH_SIZE}")
+        
+        resume_after = args.get('resume_after')
+        if resume_after is not None:
+            try:
+                resume_after = int(resume_after)
+            except (ValueError, TypeError):
+                raise ValueError("resume_after must be an integer")
+        
+        return {
+            'chunk_size': chunk_size,
+            'resume_after': resume_after,
+            'resume': str(args.get('resume', '')).lower() in ('true', '1', 'yes'),
+            'verbose': str(args.get('verbose', '')).lower() in ('true', '1', 'yes'),
+        }
+    
+    @staticmethod
+    def validate_ingest_line(line: bytes) -> dict:
+        """
+        Parse and validate one line of an NDJSON ingest stream.
+        
+        Args:
+            line: Raw line, with or without its trailing newline
+            
+        Returns:
+            Validated dictionary with original_message_text and original_message_id
+            
+        Raises:
+            ValueError: If the line is not a valid message object
+        """
+        try:
+            data = json.loads(line)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid JSON: {str(e)}")
+        
+        if not isinstance(data, dict):
+            raise ValueError("Message must be an object")
+        
+        if not data.get('original_message_text') or not str(data['original_message_text']).strip():
+            raise ValueError("original_message_text cannot be empty")
+        
+        original_message_id = data.get('original_message_id')
+        if original_message_id is not None:
+            try:
+                original_message_id = int(original_message_id)
+            except (ValueError, TypeError):
+                raise ValueError("original_message_id must be an integer")
+        
+        return {
+            'original_message_text': str(data['original_message_text']),
+            'original_message_id': original_message_id,
+        }
+    
     @staticmethod
     def validate_update(data: dict) -> dict:
         """
@@ -75,39 +246,68 @@ class SignalSchema:
         return validated_data
     
     @staticmethod
-    def serialize(signal) -> dict:
+    def validate_fields(fields: Optional[str], view: Optional[str]) -> Optional[List[str]]:
+        """
+        Validate the field selection of a signal list request.
+        
+        Args:
+            fields: Optional comma-separated field names; takes precedence over view
+            view: Optional view name, "summary" or "full"
+            
+        Returns:
+            List of fields to return, or None for all fields
+            
+        Raises:
+            ValueError: If a field or the view is unknown
+        """
+        selected = [field.strip() for field in (fields or '').split(',') if field.strip()]
+        if selected:
+            unknown = [field for field in selected if field not in SignalSchema.FIELDS]
+            if unknown:
+                raise ValueError(
+                    f"Unknown fields: {', '.join(unknown)}. Must be among: {', '.join(SignalSchema.FIELDS)}"
+                )
+            return selected
+        
+        if view in (None, '', 'full'):
+            return None
+        if view == 'summary':
+            return list(SignalSchema.SUMMARY_FIELDS)
+        raise ValueError("Invalid view. Must be one of: summary, full")
+    
+    @staticmethod
+    def columns_for(fields: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Get the Signal columns a list query has to load to serialize some fields.
+        
+        Args:
+            fields: Fields returned by validate_fields
+            
+        Returns:
+            List of column names, or None for all columns
+        """
+        if fields is None:
+            return None
+        columns = list(SignalSchema.ALWAYS_LOADED_COLUMNS)
+        for field in fields:
+            columns.extend(column for column in SignalSchema.FIELDS[field][0] if column not in columns)
+        return columns
+    
+    @staticmethod
+    def serialize(signal, fields: Optional[List[str]] = None) -> dict:
         """
         Serialize Signal model to dict.
         
         Args:
             signal: Signal model instance
+            fields: Optional fields to include (defaults to all); only their
+                columns are read, so columns not loaded aren't lazy-loaded
             
         Returns:
             Dictionary representation
         """
         return {
-            'id': str(signal.id),
-            'channel_id': str(signal.channel_id),
-            'template_id': str(signal.template_id),
-            'user_id': signal.user_id,
-            'original_message_id': signal.original_message_id,
-            'original_message_text': signal.original_message_text,
-            'symbol': signal.symbol,
-            'entry_price': float(signal.entry_price) if signal.entry_price else None,
-            'take_profits': signal.take_profits,
-            'stop_loss': signal.stop_loss,
-            'signal_type': signal.signal_type,
-            'timeframe': signal.timeframe,
-            'confidence_score': float(signal.confidence_score) if signal.confidence_score else None,
-            'extraction_metadata': signal.extraction_metadata,
-            'risk_reward_ratio': float(signal.risk_reward_ratio) if signal.risk_reward_ratio else None,
-            'user_notes': signal.user_notes,
-            'performance_outcome': signal.performance_outcome,
-            'close_price': float(signal.close_price) if signal.close_price else None,
-            'pnl': float(signal.pnl) if signal.pnl else None,
-            'pnl_percent': float(signal.pnl_percent) if signal.pnl_percent else None,
-            'closed_at': signal.closed_at.isoformat() if signal.closed_at else None,
-            'created_at': signal.created_at.isoformat() if signal.created_at else None,
-            'updated_at': signal.updated_at.isoformat() if signal.updated_at else None,
+            field: SignalSchema.FIELDS[field][1](signal)
+            for field in (fields or SignalSchema.FIELDS)
         }
 
@@ -1,8 +1,11 @@
 """Request/Response schemas for template API validation."""
 
+import re
 from typing import Dict, Any
 from uuid import UUID
 
+from utils.regex_utils import find_unsafe_construct
+
 
 class TemplateSchema:
     """Schema for Template model."""
@@ -56,6 +59,8 @@ class TemplateSchema:
             if field['method'] not in ['regex', 'marker']:
                 raise ValueError(f"Field at index {i} has invalid method. Must be 'regex' or 'marker'")
         
+        TemplateSchema.validate_patterns(extraction_config['fields'])
+        
         result = {
             'channel_id': data['channel_id'],
             'extraction_config': extraction_config,
@@ -88,9 +93,67 @@ class TemplateSchema:
             if 'fields' in extraction_config:
                 if not isinstance(extraction_config['fields'], list):
                     raise ValueError("extraction_config.fields must be an array")
+                
+                TemplateSchema.validate_patterns(extraction_config['fields'])
         
         return validated_data
     
+    @staticmethod
+    def validate_benchmark(data: dict) -> dict:
+        """
+        Validate template benchmark options.
+        
+        Args:
+            data: Dictionary with optional sample_size and slowest
+            
+        Returns:
+            Validated dictionary
+            
+        Raises:
+            ValueError: If validation fails
+        """
+        result = {}
+        limits = {'sample_size': (200, 1, 2000), 'slowest': (5, 0, 50)}
+        for key, (default, minimum, maximum) in limits.items():
+            value = data.get(key, default)
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"{key} must be an integer")
+            if value < minimum or value > maximum:
+                raise ValueError(f"{key} must be between {minimum} and {maximum}")
+            result[key] = value
+        
+        return result
+    
+    @staticmethod
+    def validate_patterns(fields: list) -> None:
+        """
+        Reject regex fields that don't compile or are prone to catastrophic backtracking.
+        
+        Args:
+            fields: extraction_config fields
+            
+        Raises:
+            ValueError: If a field's regex is invalid or unsafe
+        """
+        for i, field in enumerate(fields):
+            if not isinstance(field, dict) or field.get('method', 'regex') != 'regex':
+                continue
+            
+            pattern = field.get('regex')
+            if not pattern:
+                continue
+            if not isinstance(pattern, str):
+                raise ValueError(f"Field at index {i} has an invalid regex: must be a string")
+            
+            try:
+                re.compile(pattern, re.IGNORECASE)
+                problem = find_unsafe_construct(pattern, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Field at index {i} has an invalid regex: {e}")
+            
+            if problem:
+                raise ValueError(f"Field at index {i} has an unsafe regex: {problem}")
+    
     @staticmethod
     def serialize(template) -> dict:
         """
@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask
 from flask_cors import CORS
 
@@ -5,6 +7,14 @@ from config.env_handler import EnvHandler
 from config.database_handler import DatabaseConnectionHandler
 from api import api_bp
 from utils import close_db
+from services.market_data_poller import market_data_poller
+from services.outcome_engine import outcome_evaluator
+from services.channel_stats_service import channel_stats_reconciler
+
+def _is_reloader_watcher(env_handler: EnvHandler) -> bool:
+    """Whether this is the debug reloader's parent process, which only watches files and never serves."""
+    return bool(env_handler.get_env("DEBUG")) and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+
 
 def create_app() -> Flask:
     app = Flask(__name__)
@@ -28,6 +38,22 @@ def create_app() -> Flask:
     except Exception:
         pass
 
+    # Background workers only run in the process that serves requests
+    if _is_reloader_watcher(env_handler):
+        return app
+
+    # Start refreshing quotes of ticker and open-signal symbols in the background
+    if env_handler.get_env("MARKET_DATA_POLLER_ENABLED"):
+        market_data_poller.start()
+
+    # Close pending signals whose take profits or stop loss the quotes reach
+    if env_handler.get_env("OUTCOME_EVALUATOR_ENABLED"):
+        outcome_evaluator.start()
+
+    # Correct drift of the incrementally maintained channel stats
+    if env_handler.get_env("CHANNEL_STATS_RECONCILER_ENABLED"):
+        channel_stats_reconciler.start()
+
     return app
 
 __all__ = ["create_app"]
\ No newline at end of file
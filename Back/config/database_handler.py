@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.pool import QueuePool
 
@@ -12,6 +15,33 @@ Base = declarative_base()
 # Export Base for use in models
 __all__ = ["Base", "DatabaseConnectionHandler"]
 
+# Replication lag of a standby; 0 when it has replayed everything it received, so an idle primary
+# doesn't look lagging. NULL when its WAL receiver isn't streaming: it may then have replayed all it
+# received while the primary moved on. Reading pg_stat_wal_receiver needs pg_read_all_stats.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Session.info key set once a session has written
+HAS_WRITES_KEY = "has_writes"
+
+
+def _mark_flush_write(session, flush_context):
+    """Record that a session flushed ORM changes."""
+    session.info[HAS_WRITES_KEY] = True
+
+
+def _mark_statement_write(orm_execute_state):
+    """Record that a session executed an INSERT, UPDATE or DELETE statement."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[HAS_WRITES_KEY] = True
+
+
 class DatabaseConnectionHandler:
     DEFAULT_POOL_SIZE = 10
     DEFAULT_MAX_OVERFLOW = 20
@@ -30,30 +60,70 @@ class DatabaseConnectionHandler:
         self.env_handler = EnvHandler()
         self.logger = LoggingHandler().get_logger("database")
         self.database_url = self.env_handler.get_database_url()
+        self.replica_urls = self.env_handler.get_replica_urls()
+        self.replica_max_lag_seconds = self.env_handler.get_env("POSTGRES_REPLICA_MAX_LAG_SECONDS")
+        self.replica_lag_check_seconds = self.env_handler.get_env("POSTGRES_REPLICA_LAG_CHECK_SECONDS")
+        self.replica_connect_timeout = self.env_handler.get_env("POSTGRES_REPLICA_CONNECT_TIMEOUT_SECONDS")
         self._engine = None
         self._session_factory = None
+        self._replica_engines = None
+        self._replica_session_factories = {}
+        # Replica index -> (monotonic time of the check, lag in seconds or None if unreachable)
+        self._replica_lag = {}
+        self._replica_lock = threading.Lock()
+        # Replica indexes whose lag is being checked in the background
+        self._lag_checks = set()
+        self._next_replica = 0
+        self.replica_sessions = 0
+        self.primary_fallbacks = 0
         # Use provided base or default Base (defined above)
         self._base = base or Base
 
+    def _create_engine(self, url, connect_args=None):
+        """Create a pooled engine for a database URL."""
+        return create_engine(
+            url,
+            connect_args=connect_args or {},
+            echo=True,
+            poolclass=QueuePool,
+            pool_size=self.DEFAULT_POOL_SIZE,
+            max_overflow=self.DEFAULT_MAX_OVERFLOW,
+            pool_pre_ping=self.DEFAULT_POOL_PRE_PING,
+            pool_recycle=self.DEFAULT_POOL_RECYCLE,
+        )
+
     def get_engine(self):
         """Create and return database engine (singleton pattern)."""
         if self._engine is None:
             try:
-                self._engine = create_engine(
-                    self.database_url,
-                    echo=True,
-                    poolclass=QueuePool,
-                    pool_size=self.DEFAULT_POOL_SIZE,
-                    max_overflow=self.DEFAULT_MAX_OVERFLOW,
-                    pool_pre_ping=self.DEFAULT_POOL_PRE_PING,
-                    pool_recycle=self.DEFAULT_POOL_RECYCLE,
-                )
+                self._engine = self._create_engine(self.database_url)
                 self.logger.info("Database engine created successfully")
             except Exception as e:
                 self.logger.error(f"Failed to create database engine: {e}")
                 raise DatabaseError(f"Failed to create database engine: {e}")
         return self._engine
 
+    def get_replica_engines(self):
+        """Create and return the read replica engines (singleton pattern); empty without replicas."""
+        if self._replica_engines is None:
+            try:
+                # A short connect timeout keeps an unreachable replica from stalling requests
+                self._replica_engines = [
+                    self._create_engine(url, connect_args={"connect_timeout": self.replica_connect_timeout})
+                    for url in self.replica_urls
+                ]
+                if self._replica_engines:
+                    self.logger.info(f"{len(self._replica_engines)} read replica engine(s) created successfully")
+            except Exception as e:
+                self.logger.error(f"Failed to create read replica engines: {e}")
+                raise DatabaseError(f"Failed to create read replica engines: {e}")
+        return self._replica_engines
+
+    @property
+    def has_replicas(self) -> bool:
+        """Whether read replicas are configured."""
+        return bool(self.replica_urls)
+
 
     def get_session_factory(self):
         """Create and return sessionmaker factory (singleton pattern)."""
@@ -65,12 +135,112 @@ class DatabaseConnectionHandler:
                     bind=self.get_engine(),
                     expire_on_commit=False,
                 )
+                # Lets callers tell whether a session wrote, e.g. to pin the writer's reads to the primary
+                event.listen(self._session_factory, "after_flush", _mark_flush_write)
+                event.listen(self._session_factory, "do_orm_execute", _mark_statement_write)
                 self.logger.info("Session factory created successfully")
             except Exception as e:
                 self.logger.error(f"Failed to create session factory: {e}")
                 raise DatabaseError(f"Failed to create session factory: {e}")
         return self._session_factory
 
+    def get_read_session_factory(self):
+        """
+        Return a sessionmaker bound to a read replica that is within the allowed lag.
+
+        Healthy replicas are used in turn. Replica lag is checked in the
+        background at most once per POSTGRES_REPLICA_LAG_CHECK_SECONDS, so
+        requests never wait for it; a replica that hasn't been checked yet, is
+        unreachable or isn't streaming counts as unhealthy until its next check.
+
+        Returns:
+            Replica sessionmaker, or the primary's if no replica is configured
+            or all of them lag more than POSTGRES_REPLICA_MAX_LAG_SECONDS
+        """
+        engines = self.get_replica_engines()
+        for _ in range(len(engines)):
+            with self._replica_lock:
+                index = self._next_replica % len(engines)
+                self._next_replica += 1
+
+            lag = self.replica_lag_seconds(index)
+            if lag is not None and lag <= self.replica_max_lag_seconds:
+                with self._replica_lock:
+                    factory = self._replica_session_factories.get(index)
+                    if factory is None:
+                        factory = sessionmaker(
+                            autocommit=False,
+                            autoflush=False,
+                            bind=engines[index],
+                            expire_on_commit=False,
+                        )
+                        self._replica_session_factories[index] = factory
+                    self.replica_sessions += 1
+                return factory
+
+        if engines:
+            self.primary_fallbacks += 1
+        return self.get_session_factory()
+
+    def replica_lag_seconds(self, index):
+        """
+        Get the last measured replication lag of a replica.
+
+        Starts a background check when the last one is stale; the value
+        returned is the one measured before.
+
+        Args:
+            index: Replica position in POSTGRES_REPLICA_URLS
+
+        Returns:
+            Lag in seconds, or None if the replica hasn't been checked yet,
+            couldn't be reached or isn't streaming from the primary
+        """
+        checked_at, lag = self._replica_lag.get(index, (None, None))
+        if checked_at is None or time.monotonic() - checked_at >= self.replica_lag_check_seconds:
+            with self._replica_lock:
+                start = index not in self._lag_checks
+                self._lag_checks.add(index)
+            if start:
+                threading.Thread(
+                    target=self._check_replica_lag, args=(index,), name=f"replica-lag-check-{index}", daemon=True
+                ).start()
+        return lag
+
+    def _check_replica_lag(self, index):
+        """Measure the replication lag of a replica and cache it."""
+        try:
+            with self.get_replica_engines()[index].connect() as connection:
+                lag = connection.execute(REPLICA_LAG_QUERY).scalar()
+            if lag is None:
+                self.logger.warning(f"Read replica {index} is not streaming from the primary")
+            else:
+                lag = float(lag)
+        except Exception as e:
+            self.logger.warning(f"Read replica {index} lag check failed: {e}")
+            lag = None
+
+        self._replica_lag[index] = (time.monotonic(), lag)
+        with self._replica_lock:
+            self._lag_checks.discard(index)
+
+    def replica_stats(self):
+        """Return read replica lag and routing counters."""
+        engines = self._replica_engines or []
+        return {
+            'replicas': [
+                {
+                    'host': engines[index].url.host if index < len(engines) else None,
+                    'lag_seconds': self._replica_lag.get(index, (None, None))[1],
+                    'checked': index in self._replica_lag,
+                }
+                for index in range(len(self.replica_urls))
+            ],
+            'max_lag_seconds': self.replica_max_lag_seconds,
+            'replica_sessions': self.replica_sessions,
+            'primary_fallbacks': self.primary_fallbacks,
+        }
+
     def get_db(self):
         """
         Dependency injection function for FastAPI to get database session.
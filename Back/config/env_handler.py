@@ -77,6 +77,285 @@ class EnvHandler:
             "required": False,
             "type": str,
             "default": None,
+        },
+        {
+            "key": "TEMPLATE_CACHE_MAX_SIZE",
+            "required": False,
+            "type": int,
+            "default": 1024,
+        },
+        {
+            "key": "CHANNEL_PLAN_CACHE_MAX_SIZE",
+            "required": False,
+            "type": int,
+            "default": 256,
+        },
+        {
+            "key": "EXTRACTION_ENGINE",
+            "required": False,
+            "type": str,
+            "default": "sequential",
+        },
+        {
+            "key": "TEMPLATE_STATS_HALF_LIFE_SECONDS",
+            "required": False,
+            "type": int,
+            "default": 86400,
+        },
+        {
+            "key": "TEMPLATE_STATS_FLUSH_INTERVAL_SECONDS",
+            "required": False,
+            "type": int,
+            "default": 60,
+        },
+        {
+            "key": "EXTRACTION_HISTORY_QUEUE_SIZE",
+            "required": False,
+            "type": int,
+            "default": 10000,
+        },
+        {
+            "key": "EXTRACTION_HISTORY_BATCH_SIZE",
+            "required": False,
+            "type": int,
+            "default": 500,
+        },
+        {
+            "key": "EXTRACTION_HISTORY_FLUSH_INTERVAL_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 2.0,
+        },
+        {
+            "key": "EXTRACTION_HISTORY_SAMPLE_EVERY",
+            "required": False,
+            "type": int,
+            "default": 10,
+        },
+        {
+            "key": "TEMPLATE_TIME_BUDGET_MS",
+            "required": False,
+            "type": int,
+            "default": 50,
+        },
+        {
+            "key": "TEMPLATE_QUARANTINE_SECONDS",
+            "required": False,
+            "type": int,
+            "default": 600,
+        },
+        {
+            "key": "SIGNAL_DEDUP_TTL_SECONDS",
+            "required": False,
+            "type": int,
+            "default": 3600,
+        },
+        {
+            "key": "SIGNAL_DEDUP_MAX_SIZE",
+            "required": False,
+            "type": int,
+            "default": 100000,
+        },
+        {
+            "key": "QUOTE_CACHE_TTLS",
+            "required": False,
+            "type": str,
+            "default": "crypto:5,forex:10,metal:10,index:30,default:15",
+        },
+        {
+            "key": "QUOTE_CACHE_STALE_SECONDS",
+            "required": False,
+            "type": int,
+            "default": 300,
+        },
+        {
+            "key": "MARKET_DATA_POOL_SIZE",
+            "required": False,
+            "type": int,
+            "default": 10,
+        },
+        {
+            "key": "MARKET_DATA_MAX_WORKERS",
+            "required": False,
+            "type": int,
+            "default": 8,
+        },
+        {
+            "key": "MARKET_DATA_DEADLINE_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 5.0,
+        },
+        {
+            # Off by default: the poller spends provider credits even with no clients.
+            # Quote streams still start it on demand while they are open
+            "key": "MARKET_DATA_POLLER_ENABLED",
+            "required": False,
+            "type": bool,
+            "default": False,
+        },
+        {
+            "key": "MARKET_DATA_POLL_INTERVAL_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 15.0,
+        },
+        {
+            "key": "MARKET_DATA_TICKER_SYMBOLS",
+            "required": False,
+            "type": str,
+            "default": "XAUUSD,BTCUSD,EURUSD,GBPJPY",
+        },
+        {
+            # Each quote stream holds a server thread while it is open
+            "key": "MARKET_DATA_STREAM_MAX_CLIENTS",
+            "required": False,
+            "type": int,
+            "default": 16,
+        },
+        {
+            # Streams end after this long; the frontend's retry loop reconnects and gets a fresh snapshot
+            "key": "MARKET_DATA_STREAM_MAX_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 300.0,
+        },
+        {
+            # Budget of each process: the bucket isn't shared, so split the plan's budget across processes
+            "key": "TWELVE_DATA_CREDITS_PER_MINUTE",
+            "required": False,
+            "type": int,
+            "default": 8,
+        },
+        {
+            # Share of the credit budget the poller spends; it polls less often when it has more symbols
+            "key": "MARKET_DATA_POLL_CREDIT_SHARE",
+            "required": False,
+            "type": float,
+            "default": 0.75,
+        },
+        {
+            "key": "MARKET_DATA_PROVIDER",
+            "required": False,
+            "type": str,
+            "default": "twelve_data",
+        },
+        {
+            "key": "MARKET_DATA_REPLAY_FILE",
+            "required": False,
+            "type": str,
+            "default": None,
+        },
+        {
+            "key": "MARKET_DATA_REPLAY_SPEED",
+            "required": False,
+            "type": float,
+            "default": 1.0,
+        },
+        {
+            "key": "MARKET_DATA_SYNTHETIC_SEED",
+            "required": False,
+            "type": int,
+            "default": 42,
+        },
+        {
+            "key": "MARKET_DATA_SYNTHETIC_TICK_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 1.0,
+        },
+        {
+            "key": "MARKET_DATA_SYNTHETIC_VOLATILITY",
+            "required": False,
+            "type": float,
+            "default": 0.0002,
+        },
+        {
+            "key": "MARKET_DATA_BREAKER_FAILURES",
+            "required": False,
+            "type": int,
+            "default": 5,
+        },
+        {
+            "key": "MARKET_DATA_BREAKER_LATENCY_SLO_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 2.0,
+        },
+        {
+            "key": "MARKET_DATA_BREAKER_OPEN_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 30.0,
+        },
+        {
+            "key": "OUTCOME_EVALUATOR_ENABLED",
+            "required": False,
+            "type": bool,
+            "default": True,
+        },
+        {
+            "key": "OUTCOME_EVAL_INTERVAL_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 5.0,
+        },
+        {
+            "key": "OUTCOME_INDEX_REBUILD_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 300.0,
+        },
+        {
+            "key": "BACKTEST_MAX_BARS",
+            "required": False,
+            "type": int,
+            "default": 200000,
+        },
+        {
+            "key": "CHANNEL_STATS_RECONCILER_ENABLED",
+            "required": False,
+            "type": bool,
+            "default": True,
+        },
+        {
+            # Each run scans signals without blocking writers, then briefly locks the aggregate
+            # tables while drift corrections are written, stalling signal writes for that moment
+            "key": "CHANNEL_STATS_RECONCILE_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 3600.0,
+        },
+        {
+            # Comma-separated read replicas: full SQLAlchemy URLs, or host[:port] sharing the primary's credentials
+            "key": "POSTGRES_REPLICA_URLS",
+            "required": False,
+            "type": str,
+            "default": "",
+        },
+        {
+            "key": "POSTGRES_REPLICA_MAX_LAG_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 5.0,
+        },
+        {
+            "key": "POSTGRES_REPLICA_LAG_CHECK_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 5.0,
+        },
+        {
+            "key": "POSTGRES_REPLICA_CONNECT_TIMEOUT_SECONDS",
+            "required": False,
+            "type": int,
+            "default": 2,
+        },
+        {
+            "key": "READ_AFTER_WRITE_PIN_SECONDS",
+            "required": False,
+            "type": float,
+            "default": 10.0,
         }
     ]
 
@@ -154,6 +433,23 @@ class EnvHandler:
         db = self.get_env("POSTGRES_DB")
         
         return f"postgresql://{user}:{password}@{host}:{port}/{db}"
+
+    def get_replica_urls(self):
+        """Construct read replica database URLs from POSTGRES_REPLICA_URLS."""
+        urls = []
+        for entry in (self.get_env("POSTGRES_REPLICA_URLS") or "").split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            if "://" in entry:
+                urls.append(entry)
+                continue
+            host, _, port = entry.partition(":")
+            urls.append(
+                f"postgresql://{self.get_env('POSTGRES_USER')}:{self.get_env('POSTGRES_PASSWORD')}"
+                f"@{host}:{port or self.get_env('POSTGRES_PORT')}/{self.get_env('POSTGRES_DB')}"
+            )
+        return urls
     
     def get_database_config(self):
         """Get database configuration as a dictionary."""
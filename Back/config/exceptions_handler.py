@@ -32,10 +32,36 @@ class ValidationError(SignalFluxException):
         super().__init__(message, "VALIDATION_ERROR")
 
 
+class TemplateBudgetExceeded(SignalFluxException):
+    """Exception raised when a template's extraction runs past its time budget"""
+
+    def __init__(self, message: str):
+        super().__init__(message, "TEMPLATE_BUDGET_EXCEEDED")
+
+
+class RateLimitExceeded(ValidationError):
+    """Exception raised when an upstream API credit budget can't cover a request in time"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.code = "RATE_LIMIT_EXCEEDED"
+
+
+class ProviderUnavailable(ValidationError):
+    """Exception raised when a market data provider can't currently serve a request (open circuit breaker, timed out or missing quote)"""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.code = "PROVIDER_UNAVAILABLE"
+
+
 
 __all__ = [
     "SignalFluxException",
     "ConfigurationError",
     "DatabaseError",
     "ValidationError",
+    "TemplateBudgetExceeded",
+    "RateLimitExceeded",
+    "ProviderUnavailable",
 ]
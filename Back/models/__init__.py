@@ -4,6 +4,8 @@ from .channel import Channel
 from .account import Account
 from .template import Template, ExtractionHistory
 from .signal import Signal
+from .candle import Candle, CandleCoverage
+from .channel_stats import ChannelStats, ChannelSymbolStats
 
-__all__ = ["Channel", "Account", "Template", "ExtractionHistory", "Signal"]
+__all__ = ["Channel", "Account", "Template", "ExtractionHistory", "Signal", "Candle", "CandleCoverage", "ChannelStats", "ChannelSymbolStats"]
 
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String
+
+from config.database_handler import Base
+
+class Candle(Base):
+    """OHLC candle of a symbol, cached from the market data provider."""
+
+    __tablename__ = "candles"
+    __table_args__ = (
+        # Candles are appended in time order, so a BRIN index keeps time-range scans cheap at a tiny size
+        Index("ix_candles_time_brin", "time", postgresql_using="brin"),
+    )
+
+    # The primary key doubles as the (symbol, interval, time) range lookup index
+    symbol = Column(String(50), primary_key=True)
+    interval = Column(String(10), primary_key=True)  # 1min, 5min, 15min, 30min, 1h, 4h, 1day
+    time = Column(DateTime(timezone=True), primary_key=True)  # Candle open time
+
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self) -> str:
+        return f"<Candle(symbol={self.symbol}, interval={self.interval}, time={self.time}, close={self.close})>"
+
+
+class CandleCoverage(Base):
+    """
+    Time span of a symbol and interval already fetched from the provider.
+
+    Spans can contain no candles (e.g. weekends for forex), which is why
+    coverage is tracked separately instead of inferred from gaps in candles.
+    """
+
+    __tablename__ = "candle_coverage"
+    __table_args__ = (
+        Index("ix_candle_coverage_symbol_interval", "symbol", "interval", "start_time"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String(50), nullable=False)
+    interval = Column(String(10), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False)  # Open time of the first candle covered
+    end_time = Column(DateTime(timezone=True), nullable=False)  # Open time of the last candle covered
+
+    def __repr__(self) -> str:
+        return (
+            f"<CandleCoverage(symbol={self.symbol}, interval={self.interval}, "
+            f"start={self.start_time}, end={self.end_time})>"
+        )
@@ -31,6 +31,7 @@ class Channel(Base):
         telegram_channel_id: Telegram channel ID
         is_active: Whether channel is currently active
         signal_count: Number of signals from this channel
+        history_import_message_id: Last message ID processed by a history import
         created_at: When channel was created
         updated_at: Last update timestamp
     """
@@ -56,6 +57,9 @@ class Channel(Base):
     # Statistics
     signal_count = Column(Integer, default=0, nullable=False)
     
+    # Where an interrupted history import resumes (signal or not, in import order)
+    history_import_message_id = Column(Integer, nullable=True)
+    
     # Timestamps
     last_active_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from config.database_handler import Base
+
+
+class _StatsCounters:
+    """Counters shared by the channel and channel/symbol aggregates, maintained as deltas."""
+
+    signal_count = Column(Integer, default=0, nullable=False)
+    pending_count = Column(Integer, default=0, nullable=False)
+    win_count = Column(Integer, default=0, nullable=False)
+    loss_count = Column(Integer, default=0, nullable=False)
+
+    # Averages are stored as sum and count so deltas stay additive
+    risk_reward_sum = Column(Float, default=0.0, nullable=False)  # TP1 risk/reward of each signal
+    risk_reward_count = Column(Integer, default=0, nullable=False)
+    pnl_percent_sum = Column(Float, default=0.0, nullable=False)  # Closed signals only
+    pnl_percent_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class ChannelStats(_StatsCounters, Base):
+    """Performance aggregates of a channel's signals."""
+
+    __tablename__ = "channel_stats"
+
+    channel_id = Column(UUID(as_uuid=True), ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<ChannelStats(channel_id={self.channel_id}, signals={self.signal_count})>"
+
+
+class ChannelSymbolStats(_StatsCounters, Base):
+    """Performance aggregates of a channel's signals of one symbol."""
+
+    __tablename__ = "channel_symbol_stats"
+
+    channel_id = Column(UUID(as_uuid=True), ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True)
+    symbol = Column(String(50), primary_key=True)
+
+    def __repr__(self) -> str:
+        return f"<ChannelSymbolStats(channel_id={self.channel_id}, symbol={self.symbol}, signals={self.signal_count})>"
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, desc, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,19 @@ class Signal(Base):
     """Signal model for storing extracted trading signals."""
 
     __tablename__ = "signals"
+    __table_args__ = (
+        # A channel message produces at most one signal; retried deliveries hit this index
+        Index(
+            "uq_signals_channel_original_message",
+            "channel_id",
+            "original_message_id",
+            unique=True,
+            postgresql_where=text("original_message_id IS NOT NULL"),
+        ),
+        # Keyset pagination of the channel and user signal lists, newest first
+        Index("ix_signals_channel_created_id", "channel_id", desc("created_at"), desc("id")),
+        Index("ix_signals_user_created_id", "user_id", desc("created_at"), desc("id")),
+    )
 
     # Identification
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -37,10 +50,10 @@ class Signal(Base):
     extraction_metadata = Column(JSON, nullable=True)
 
     # Tracking timestamps
-    created_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc), 
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
                        nullable=False, index=True)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc),
-                       onupdate=datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                       onupdate=lambda: datetime.now(timezone.utc), nullable=False)
 
     # User & Performance
     user_notes = Column(Text, nullable=True)
@@ -0,0 +1,76 @@
+"""
+Script to backtest a channel's stored signals against historical candles.
+
+Run from the Back directory:
+    python -m scripts.backtest_channel <channel_id> [--interval 1h] [--start 2026-01-01] [--end 2026-06-30] [--symbols XAUUSD,BTCUSD] [--json]
+"""
+
+import argparse
+import json
+from uuid import UUID
+
+from api.validations.channel_validations import ChannelSchema
+from services.backtest_service import BacktestService
+from utils.database_utils import get_db_handler
+
+
+def backtest_channel(channel_id: UUID, options: dict) -> dict:
+    """Run the backtest of a channel in its own session."""
+    db = get_db_handler().get_session_factory()()
+    try:
+        return BacktestService.run_channel_backtest(db, channel_id, **options)
+    finally:
+        db.close()
+
+
+def print_report(result: dict) -> None:
+    """Print a backtest summary."""
+    print(f"📊 Backtest of channel {result['channel_id']} on {result['interval']} candles")
+    print("-" * 60)
+    print(f"  Signals:       {result['signals']}")
+    print(f"  Closed:        {result['closed']} ({result['wins']} won, {result['losses']} lost)")
+    print(f"  Win rate:      {result['win_rate']}%")
+    print(f"  Average R:     {result['average_r']}")
+    print(f"  Expectancy:    {result['expectancy']}% per trade")
+    print(f"  Max drawdown:  {result['max_drawdown_r']}R")
+    if result['equity_curve']:
+        print(f"  Final equity:  {result['equity_curve'][-1]['equity_r']}R")
+
+    print("\n📋 Symbols:")
+    print("-" * 60)
+    for symbol, report in result['symbols'].items():
+        if 'error' in report:
+            print(f"  {symbol}: {report['signals']} signal(s) - ⚠️  {report['error']}")
+        else:
+            print(
+                f"  {symbol}: {report['signals']} signal(s), {report['closed']} closed "
+                f"({report['wins']} won, {report['losses']} lost), {report['open']} open"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest a channel's signals against historical candles.")
+    parser.add_argument("channel_id", type=UUID, help="Channel UUID")
+    parser.add_argument("--interval", default="1h", help="Candle interval (default: 1h)")
+    parser.add_argument("--start", help="Only replay signals created at or after this ISO date")
+    parser.add_argument("--end", help="Only replay signals created before this ISO date")
+    parser.add_argument("--symbols", help="Comma-separated symbols to replay")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    args = parser.parse_args()
+
+    try:
+        options = ChannelSchema.validate_backtest({
+            'interval': args.interval,
+            'start': args.start,
+            'end': args.end,
+            'symbols': args.symbols,
+        })
+        result = backtest_channel(args.channel_id, options)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_report(result)
+        exit(0)
+    except Exception as e:
+        print(f"❌ Error running backtest: {e}")
+        exit(1)
@@ -0,0 +1,312 @@
+"""Backtest service - replays a channel's stored signals against historical candles."""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.signal import Signal
+from config.env_handler import EnvHandler
+from config.exceptions_handler import ValidationError
+from services.credit_scheduler import PRIORITY_INTERACTIVE
+from services.market_data_providers import interval_seconds
+from services.market_data_service import MarketDataService
+from services.outcome_engine import SignalLevels
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.backtest_service")
+
+env_handler = EnvHandler()
+
+
+def _rolling_min_tables(values: np.ndarray) -> List[np.ndarray]:
+    """
+    Build a sparse table of window minimums.
+
+    tables[k][j] is the minimum of values[j:j + 2**k], or +inf where the
+    window runs past the end.
+    """
+    tables = [values]
+    width = 1
+    while width * 2 <= len(values):
+        previous = tables[-1]
+        table = np.full(len(values), np.inf)
+        table[:len(values) - width] = np.minimum(previous[:len(values) - width], previous[width:])
+        tables.append(table)
+        width *= 2
+    return tables
+
+
+def _first_at_or_below(values: np.ndarray, tables: List[np.ndarray], starts: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """
+    Find, for each start index, the first value at or below its level.
+
+    Binary lifting over the sparse table skips windows whose minimum stays
+    above the level, so each lookup costs O(log n) whatever the distance.
+
+    Args:
+        values: (n,) series
+        tables: Sparse table of values from _rolling_min_tables
+        starts: (m,) indices to search from
+        levels: (m,) levels, NaN for none
+
+    Returns:
+        (m,) indices, n where the level is never reached
+    """
+    count = len(values)
+    if count == 0:
+        return np.zeros(len(starts), dtype=np.int64)
+
+    position = starts.astype(np.int64)
+    with np.errstate(invalid="ignore"):
+        for power in range(len(tables) - 1, -1, -1):
+            width = 1 << power
+            clear = (position + width <= count) & (tables[power][np.minimum(position, count - 1)] > levels)
+            position = np.where(clear, position + width, position)
+        reached = (position < count) & (values[np.minimum(position, count - 1)] <= levels)
+    return np.where(reached, position, count)
+
+
+def replay_levels(levels: SignalLevels, candles: Dict[str, np.ndarray], starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Find where each signal closes in a candle series, for all signals at once.
+
+    Follows the live evaluator's rules: a signal closes at its stop loss, or
+    at its farthest take profit once every take profit has been reached; a
+    candle reaching both a stop loss and the last take profit counts as a
+    stop loss.
+
+    Args:
+        levels: Signals to replay, with no take profit hit yet
+        candles: Candle columns with low and high arrays
+        starts: (n,) index of each signal's first candle
+
+    Returns:
+        Dictionary of arrays: close_bar (n,), -1 for signals still open at the
+        end of the series, close_price (n,), pnl (n,) and pnl_percent (n,),
+        NaN for open signals, and sl_hit (n,)
+    """
+    low = candles["low"]
+    neg_high = -candles["high"]
+    count = len(low)
+    low_tables = _rolling_min_tables(low)
+    high_tables = _rolling_min_tables(neg_high)
+
+    n, width = levels.take_profits.shape
+    sl_bar = np.full(n, count, dtype=np.int64)
+    tp_bar = np.full((n, width), count, dtype=np.int64)
+
+    # Long stop losses and short take profits trigger on lows, the others on highs
+    for side in (levels.is_long, ~levels.is_long):
+        if not side.any():
+            continue
+        is_long = bool(levels.is_long[side][0])
+        side_starts = starts[side]
+        if is_long:
+            sl_bar[side] = _first_at_or_below(low, low_tables, side_starts, levels.stop_loss[side])
+        else:
+            sl_bar[side] = _first_at_or_below(neg_high, high_tables, side_starts, -levels.stop_loss[side])
+        for level in range(width):
+            if is_long:
+                tp_bar[side, level] = _first_at_or_below(neg_high, high_tables, side_starts, -levels.take_profits[side, level])
+            else:
+                tp_bar[side, level] = _first_at_or_below(low, low_tables, side_starts, levels.take_profits[side, level])
+
+    has_tp = ~np.isnan(levels.take_profits)
+    last_tp_bar = np.where(has_tp, tp_bar, -1).max(axis=1)
+    closed_on_tp = has_tp.any(axis=1) & (last_tp_bar < count) & (last_tp_bar < sl_bar)
+    sl_hit = (sl_bar < count) & ~closed_on_tp
+
+    final_tp = np.where(
+        levels.is_long,
+        np.where(has_tp, levels.take_profits, -np.inf).max(axis=1),
+        np.where(has_tp, levels.take_profits, np.inf).min(axis=1)
+    )
+    close_bar = np.where(closed_on_tp, last_tp_bar, np.where(sl_hit, sl_bar, -1))
+    close_price = np.where(closed_on_tp, final_tp, np.where(sl_hit, levels.stop_loss, np.nan))
+    pnl = np.where(levels.is_long, close_price - levels.entry, levels.entry - close_price)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_percent = np.where(levels.entry > 0, pnl / levels.entry * 100, np.nan)
+
+    return {
+        "close_bar": close_bar,
+        "close_price": close_price,
+        "pnl": pnl,
+        "pnl_percent": pnl_percent,
+        "sl_hit": sl_hit,
+    }
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+class BacktestService:
+    """Service for replaying stored signals against historical candles."""
+
+    @staticmethod
+    def run_channel_backtest(
+        db: Session,
+        channel_id: UUID,
+        interval: str = "1h",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        symbols: Optional[List[str]] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> dict:
+        """
+        Replay a channel's signals against candles and score the results.
+
+        Every signal is entered at its entry price on the first candle that
+        opens at or after its creation, with none of its take profits hit.
+        Stored outcomes are ignored. Symbols whose candles can't be fetched
+        are reported with an error and left out of the totals.
+
+        Args:
+            db: Database session
+            channel_id: Channel UUID
+            interval: Candle interval to replay on
+            start: Only replay signals created at or after this time
+            end: Only replay signals created before this time, and stop the replay there (defaults to now)
+            symbols: Only replay signals of these symbols
+            priority: Credit scheduler priority class of candle requests
+
+        Returns:
+            Dictionary with signal counts, win_rate (percent), average_r,
+            expectancy (average percent return per trade), max_drawdown_r,
+            per-symbol results and an equity curve of cumulative R by close time
+
+        Raises:
+            ValidationError: If the interval is invalid or the replay range is too long
+        """
+        step = interval_seconds(interval)
+        end = end or datetime.now(timezone.utc)
+
+        query = (
+            select(
+                Signal.id,
+                Signal.channel_id,
+                Signal.symbol,
+                Signal.signal_type,
+                Signal.entry_price,
+                Signal.stop_loss,
+                Signal.take_profits,
+                Signal.created_at,
+            )
+            .where(Signal.channel_id == channel_id, Signal.created_at < end)
+        )
+        if start:
+            query = query.where(Signal.created_at >= start)
+        if symbols:
+            query = query.where(Signal.symbol.in_(symbols))
+        rows = db.execute(query).all()
+
+        by_symbol = {}
+        for row in rows:
+            by_symbol.setdefault(row.symbol, []).append(row)
+
+        max_bars = env_handler.get_env("BACKTEST_MAX_BARS")
+        report = {}
+        trades = []
+        for symbol, symbol_rows in sorted(by_symbol.items()):
+            levels = SignalLevels(symbol_rows)
+            levels.tp_hit[:] = False
+            first_created = float(levels.created_at.min())
+
+            if (end.timestamp() - first_created) / step > max_bars:
+                raise ValidationError(
+                    f"Backtest of {symbol} spans more than {max_bars} {interval} candles; "
+                    f"use a longer interval or a later start"
+                )
+
+            try:
+                candles = MarketDataService.get_candles(
+                    db,
+                    symbol,
+                    interval,
+                    datetime.fromtimestamp(first_created, timezone.utc),
+                    end,
+                    priority=priority
+                )
+            except ValidationError as e:
+                logger.warning(f"Skipping {symbol} in backtest of channel {channel_id}: {e}")
+                report[symbol] = {'signals': len(levels), 'error': str(e)}
+                continue
+
+            if len(candles["time"]) == 0:
+                report[symbol] = {'signals': len(levels), 'error': "No candles available"}
+                continue
+
+            starts = np.searchsorted(candles["time"], levels.created_at, side="left")
+            result = replay_levels(levels, candles, starts)
+
+            closed = np.flatnonzero(result["close_bar"] >= 0)
+            risk = np.abs(levels.entry - levels.stop_loss)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r_multiple = np.where(risk > 0, result["pnl"] / risk, np.nan)
+            for index in closed:
+                trades.append((
+                    int(candles["time"][result["close_bar"][index]]) + step,
+                    levels.ids[index],
+                    symbol,
+                    float(result["pnl_percent"][index]),
+                    float(r_multiple[index]),
+                ))
+
+            wins = int((result["pnl"][closed] > 0).sum())
+            report[symbol] = {
+                'signals': len(levels),
+                'closed': len(closed),
+                'open': int((starts < len(candles["time"])).sum()) - len(closed),
+                'not_started': int((starts >= len(candles["time"])).sum()),
+                'wins': wins,
+                'losses': len(closed) - wins,
+            }
+
+        trades.sort(key=lambda trade: trade[0])
+        pnl_percent = np.array([trade[3] for trade in trades], dtype=np.float64)
+        r_multiple = np.array([trade[4] for trade in trades], dtype=np.float64)
+        won = pnl_percent > 0
+        win_rate = won.mean() if len(trades) else np.nan
+        average_win = pnl_percent[won].mean() if won.any() else 0.0
+        average_loss = -pnl_percent[~won].mean() if (~won).any() else 0.0
+
+        # Trades without a stop loss have no R and are left out of the equity curve
+        has_r = ~np.isnan(r_multiple)
+        equity = np.cumsum(r_multiple[has_r])
+        drawdown = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:] - equity
+        equity_curve = [
+            {
+                'time': datetime.fromtimestamp(close_time, timezone.utc).isoformat(),
+                'signal_id': str(signal_id),
+                'symbol': symbol,
+                'r': _round(r),
+                'equity_r': _round(value),
+            }
+            for (close_time, signal_id, symbol, _, r), value in zip(
+                [trade for trade in trades if not np.isnan(trade[4])],
+                equity
+            )
+        ]
+
+        logger.info(f"Backtested {len(rows)} signal(s) of channel {channel_id}: {len(trades)} closed")
+        return {
+            'channel_id': str(channel_id),
+            'interval': interval,
+            'start': start.isoformat() if start else None,
+            'end': end.isoformat(),
+            'signals': len(rows),
+            'closed': len(trades),
+            'wins': int(won.sum()),
+            'losses': int(len(trades) - won.sum()),
+            'win_rate': _round(win_rate * 100, 2),
+            'average_r': _round(r_multiple[has_r].mean() if has_r.any() else np.nan),
+            'trades_without_stop_loss': int((~has_r).sum()),
+            'expectancy': _round(win_rate * average_win - (1 - win_rate) * average_loss),
+            'max_drawdown_r': _round(drawdown.max() if len(drawdown) else 0.0),
+            'symbols': report,
+            'equity_curve': equity_curve,
+        }
@@ -0,0 +1,242 @@
+"""Candle service - persistence and range reads of cached OHLC candles."""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.candle import Candle, CandleCoverage
+from config.exceptions_handler import DatabaseError
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.candle_service")
+
+# Columns of a candle range read, in the order they are selected
+CANDLE_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+# Rows per INSERT statement when storing candles
+INSERT_BATCH_SIZE = 1000
+
+
+def _to_datetime(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+class CandleService:
+    """Service for the local candle store."""
+
+    @staticmethod
+    def get_missing_ranges(
+        db: Session,
+        symbol: str,
+        interval: str,
+        start: int,
+        end: int,
+        step: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Find the parts of a range that haven't been fetched from the provider yet.
+
+        Args:
+            db: Database session
+            symbol: Trading symbol
+            interval: Candle interval
+            start: Open time (Unix seconds) of the first candle wanted, aligned to step
+            end: Open time (Unix seconds) of the last candle wanted, aligned to step
+            step: Interval length in seconds
+
+        Returns:
+            List of (first, last) candle open times of the missing ranges, in order
+        """
+        if end < start:
+            return []
+
+        covered = db.execute(
+            select(CandleCoverage.start_time, CandleCoverage.end_time)
+            .where(
+                CandleCoverage.symbol == symbol,
+                CandleCoverage.interval == interval,
+                CandleCoverage.start_time <= _to_datetime(end),
+                CandleCoverage.end_time >= _to_datetime(start),
+            )
+            .order_by(CandleCoverage.start_time)
+        ).all()
+
+        missing = []
+        cursor = start
+        for covered_start, covered_end in covered:
+            covered_start = int(covered_start.timestamp())
+            covered_end = int(covered_end.timestamp())
+            if covered_start > cursor:
+                missing.append((cursor, min(covered_start - step, end)))
+            cursor = max(cursor, covered_end + step)
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    @staticmethod
+    def store_candles(
+        db: Session,
+        symbol: str,
+        interval: str,
+        candles: List[Dict],
+        start: int,
+        end: int,
+        step: int,
+        settled_before: Optional[int] = None
+    ) -> int:
+        """
+        Store fetched candles and record their range as covered.
+
+        Candles that are already stored are left untouched, so concurrent
+        fetches of the same range are harmless. Candles opening at or after
+        settled_before may not be published yet, so that part of the range
+        is only covered up to the last candle the provider returned in it;
+        the rest is fetched again next time.
+
+        Args:
+            db: Database session
+            symbol: Trading symbol
+            interval: Candle interval
+            candles: Candles as returned by the provider (time in Unix seconds)
+            start: Open time of the first candle of the fetched range
+            end: Open time of the last candle of the fetched range
+            step: Interval length in seconds
+            settled_before: Open time from which missing candles may still be published
+
+        Returns:
+            Number of candles in the range
+
+        Raises:
+            DatabaseError: If storing fails
+        """
+        rows = [
+            {
+                "symbol": symbol,
+                "interval": interval,
+                "time": _to_datetime(int(candle["time"])),
+                "open": candle["open"],
+                "high": candle["high"],
+                "low": candle["low"],
+                "close": candle["close"],
+                "volume": candle.get("volume") or 0.0,
+            }
+            for candle in candles
+            if start <= candle["time"] <= end
+        ]
+
+        try:
+            for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+                db.execute(
+                    insert(Candle)
+                    .values(rows[offset:offset + INSERT_BATCH_SIZE])
+                    .on_conflict_do_nothing(index_elements=["symbol", "interval", "time"])
+                )
+            covered_end = end
+            if settled_before is not None and end >= settled_before:
+                covered_end = settled_before - step
+                returned = [int(candle["time"]) for candle in candles if settled_before <= candle["time"] <= end]
+                if returned:
+                    covered_end = max(returned)
+            if covered_end >= start:
+                CandleService._add_coverage(db, symbol, interval, start, covered_end, step)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise DatabaseError(f"Failed to store candles: {e}") from e
+
+        return len(rows)
+
+    @staticmethod
+    def _add_coverage(db: Session, symbol: str, interval: str, start: int, end: int, step: int) -> None:
+        """Merge a covered range with the overlapping and adjacent ones into a single row."""
+        overlapping = db.execute(
+            select(CandleCoverage.id, CandleCoverage.start_time, CandleCoverage.end_time)
+            .where(
+                CandleCoverage.symbol == symbol,
+                CandleCoverage.interval == interval,
+                CandleCoverage.start_time <= _to_datetime(end + step),
+                CandleCoverage.end_time >= _to_datetime(start - step),
+            )
+        ).all()
+
+        for _, covered_start, covered_end in overlapping:
+            start = min(start, int(covered_start.timestamp()))
+            end = max(end, int(covered_end.timestamp()))
+        if overlapping:
+            db.execute(delete(CandleCoverage).where(CandleCoverage.id.in_([row.id for row in overlapping])))
+
+        db.add(CandleCoverage(
+            symbol=symbol,
+            interval=interval,
+            start_time=_to_datetime(start),
+            end_time=_to_datetime(end),
+        ))
+
+    @staticmethod
+    def read_candles(db: Session, symbol: str, interval: str, start: int, end: int) -> Dict[str, np.ndarray]:
+        """
+        Read stored candles of a range as column arrays.
+
+        Args:
+            db: Database session
+            symbol: Trading symbol
+            interval: Candle interval
+            start: Earliest candle open time (Unix seconds)
+            end: Latest candle open time (Unix seconds)
+
+        Returns:
+            Dictionary with time (int64 Unix seconds) and open, high, low,
+            close and volume (float64) arrays, ordered by time
+        """
+        rows = db.execute(
+            select(
+                func.extract("epoch", Candle.time),
+                Candle.open,
+                Candle.high,
+                Candle.low,
+                Candle.close,
+                Candle.volume,
+            )
+            .where(
+                Candle.symbol == symbol,
+                Candle.interval == interval,
+                Candle.time >= _to_datetime(start),
+                Candle.time <= _to_datetime(end),
+            )
+            .order_by(Candle.time)
+        ).all()
+
+        values = np.array([tuple(row) for row in rows], dtype=np.float64).reshape(len(rows), len(CANDLE_FIELDS))
+        columns = {field: values[:, index] for index, field in enumerate(CANDLE_FIELDS)}
+        columns["time"] = columns["time"].astype(np.int64)
+        return columns
+
+    @staticmethod
+    def delete_candles(db: Session, symbol: str, interval: str) -> None:
+        """
+        Drop the stored candles and coverage of a symbol and interval, so they are fetched again.
+
+        Args:
+            db: Database session
+            symbol: Trading symbol
+            interval: Candle interval
+
+        Raises:
+            DatabaseError: If deleting fails
+        """
+        try:
+            db.execute(delete(Candle).where(Candle.symbol == symbol, Candle.interval == interval))
+            db.execute(delete(CandleCoverage).where(
+                CandleCoverage.symbol == symbol,
+                CandleCoverage.interval == interval
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise DatabaseError(f"Failed to delete candles: {e}") from e
@@ -0,0 +1,381 @@
+"""Channel stats service - incrementally maintained performance aggregates of channels."""
+
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import String, case, cast, delete, func, literal, null, or_, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.signal import Signal
+from models.channel_stats import ChannelStats, ChannelSymbolStats
+from config.env_handler import EnvHandler
+from config.exceptions_handler import DatabaseError
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.channel_stats_service")
+
+env_handler = EnvHandler()
+
+STATS_COUNTERS = (
+    "signal_count",
+    "pending_count",
+    "win_count",
+    "loss_count",
+    "risk_reward_sum",
+    "risk_reward_count",
+    "pnl_percent_sum",
+    "pnl_percent_count",
+)
+
+# Arbitrary key of the advisory lock that keeps reconciliations of several processes from overlapping
+RECONCILE_LOCK_KEY = 7301
+
+# Counter differences at most this large are not treated as drift
+DRIFT_TOLERANCE = 1e-6
+
+
+def stats_counters(
+    performance_outcome: Optional[str],
+    take_profits: Optional[List[dict]],
+    pnl_percent=None
+) -> Dict[str, float]:
+    """
+    Get the contribution of one signal to the aggregates.
+
+    Args:
+        performance_outcome: WIN, LOSS, PENDING or None
+        take_profits: Signal take_profits JSON; the first level's risk_reward_ratio is the signal's
+        pnl_percent: Signal pnl_percent, counted for closed signals only
+
+    Returns:
+        Dictionary of counter values
+    """
+    counters = dict.fromkeys(STATS_COUNTERS, 0)
+    counters["signal_count"] = 1
+    if performance_outcome in (None, "PENDING"):
+        counters["pending_count"] = 1
+    elif performance_outcome == "WIN":
+        counters["win_count"] = 1
+    elif performance_outcome == "LOSS":
+        counters["loss_count"] = 1
+
+    risk_reward = take_profits[0].get("risk_reward_ratio") if take_profits else None
+    if risk_reward is not None:
+        counters["risk_reward_sum"] = float(risk_reward)
+        counters["risk_reward_count"] = 1
+    if performance_outcome in ("WIN", "LOSS") and pnl_percent is not None:
+        counters["pnl_percent_sum"] = float(pnl_percent)
+        counters["pnl_percent_count"] = 1
+    return counters
+
+
+def signal_counters(signal: Signal) -> Dict[str, float]:
+    """Get the contribution of a Signal to the aggregates."""
+    return stats_counters(signal.performance_outcome, signal.take_profits, signal.pnl_percent)
+
+
+def counters_delta(after: Optional[Dict[str, float]], before: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Subtract two counter dictionaries; None stands for a signal that doesn't exist."""
+    return {
+        name: (after or {}).get(name, 0) - (before or {}).get(name, 0)
+        for name in STATS_COUNTERS
+    }
+
+
+class ChannelStatsService:
+    """Service for per-channel and per-channel-symbol signal aggregates."""
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Iterable[Tuple[UUID, str, Dict[str, float]]]) -> None:
+        """
+        Add counter deltas to the aggregates within the caller's transaction.
+
+        Deltas of the same channel and symbol are merged first, so each
+        aggregate row is upserted once. The caller commits.
+
+        Args:
+            db: Database session
+            deltas: (channel_id, symbol, counters delta) tuples
+        """
+        by_symbol = {}
+        for channel_id, symbol, delta in deltas:
+            merged = by_symbol.setdefault((channel_id, symbol), dict.fromkeys(STATS_COUNTERS, 0))
+            for name in STATS_COUNTERS:
+                merged[name] += delta.get(name, 0)
+        by_symbol = {key: delta for key, delta in by_symbol.items() if any(delta.values())}
+        if not by_symbol:
+            return
+
+        by_channel = {}
+        for (channel_id, _), delta in by_symbol.items():
+            merged = by_channel.setdefault(channel_id, dict.fromkeys(STATS_COUNTERS, 0))
+            for name in STATS_COUNTERS:
+                merged[name] += delta[name]
+
+        now = datetime.now(timezone.utc)
+        # Sorted keys make concurrent writers lock rows in the same order
+        ChannelStatsService._upsert(db, ChannelSymbolStats, ["channel_id", "symbol"], [
+            {"channel_id": channel_id, "symbol": symbol, "updated_at": now, **delta}
+            for (channel_id, symbol), delta in sorted(by_symbol.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+        ])
+        ChannelStatsService._upsert(db, ChannelStats, ["channel_id"], [
+            {"channel_id": channel_id, "updated_at": now, **delta}
+            for channel_id, delta in sorted(by_channel.items(), key=lambda item: str(item[0]))
+        ])
+
+    @staticmethod
+    def _upsert(db: Session, model, key_columns: List[str], rows: List[dict]) -> None:
+        """Insert aggregate rows, adding the counters to the existing rows on conflict."""
+        statement = insert(model).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                **{name: getattr(model, name) + getattr(statement.excluded, name) for name in STATS_COUNTERS},
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        db.execute(statement)
+
+    @staticmethod
+    def get_channel_stats(db: Session, channel_id: UUID) -> Tuple[Optional[ChannelStats], List[ChannelSymbolStats]]:
+        """
+        Get the aggregates of a channel.
+
+        Args:
+            db: Database session
+            channel_id: Channel UUID
+
+        Returns:
+            Tuple of the channel aggregate (None if the channel has no signals)
+            and its per-symbol aggregates ordered by signal count
+        """
+        stats = db.get(ChannelStats, channel_id)
+        symbol_stats = db.execute(
+            select(ChannelSymbolStats)
+            .where(ChannelSymbolStats.channel_id == channel_id, ChannelSymbolStats.signal_count > 0)
+            .order_by(ChannelSymbolStats.signal_count.desc(), ChannelSymbolStats.symbol)
+        ).scalars().all()
+        return stats, symbol_stats
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Recompute every aggregate from the signals table, correcting any drift.
+
+        The signal aggregates and the stored counters are read in a single
+        statement, so they come from the same snapshot; as delta writers commit
+        signal changes together with their deltas, the difference between the
+        two is exactly the drift. The scan takes no table lock. The drift is
+        then added to the aggregates, which are locked against delta writers
+        only while the corrections are written and emptied rows are removed,
+        so deltas committed after the snapshot are kept. Only one process
+        reconciles at a time; others return immediately.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of aggregates corrected, or -1 if another process was
+            already reconciling
+
+        Raises:
+            DatabaseError: If the rebuild fails
+        """
+        pending = or_(Signal.performance_outcome.is_(None), Signal.performance_outcome == "PENDING")
+        closed = Signal.performance_outcome.in_(["WIN", "LOSS"])
+        risk_reward = Signal.take_profits[(0, "risk_reward_ratio")].as_float()
+
+        try:
+            if not db.execute(select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY))).scalar():
+                db.rollback()
+                return -1
+
+            rows = db.execute(union_all(
+                select(
+                    literal("signals"),
+                    Signal.channel_id,
+                    Signal.symbol,
+                    func.count(),
+                    func.count().filter(pending),
+                    func.count().filter(Signal.performance_outcome == "WIN"),
+                    func.count().filter(Signal.performance_outcome == "LOSS"),
+                    func.coalesce(func.sum(risk_reward), 0.0),
+                    func.count(risk_reward),
+                    func.coalesce(func.sum(case((closed, Signal.pnl_percent))), 0.0),
+                    func.count(case((closed, Signal.pnl_percent))),
+                ).group_by(Signal.channel_id, Signal.symbol),
+                select(
+                    literal("symbol_stats"),
+                    ChannelSymbolStats.channel_id,
+                    ChannelSymbolStats.symbol,
+                    *(getattr(ChannelSymbolStats, name) for name in STATS_COUNTERS)
+                ),
+                select(
+                    literal("channel_stats"),
+                    ChannelStats.channel_id,
+                    cast(null(), String),
+                    *(getattr(ChannelStats, name) for name in STATS_COUNTERS)
+                ),
+            )).all()
+
+            actual_by_symbol = {}
+            actual_by_channel = {}
+            stored_by_symbol = {}
+            stored_by_channel = {}
+            for source, channel_id, symbol, *values in rows:
+                counters = {name: float(value) for name, value in zip(STATS_COUNTERS, values)}
+                if source == "signals":
+                    actual_by_symbol[(channel_id, symbol)] = counters
+                    merged = actual_by_channel.setdefault(channel_id, dict.fromkeys(STATS_COUNTERS, 0))
+                    for name in STATS_COUNTERS:
+                        merged[name] += counters[name]
+                elif source == "symbol_stats":
+                    stored_by_symbol[(channel_id, symbol)] = counters
+                else:
+                    stored_by_channel[channel_id] = counters
+
+            symbol_corrections = ChannelStatsService._drift(actual_by_symbol, stored_by_symbol)
+            channel_corrections = ChannelStatsService._drift(actual_by_channel, stored_by_channel)
+            if not symbol_corrections and not channel_corrections:
+                db.rollback()
+                logger.info("Channel stats reconciled: no drift")
+                return 0
+
+            now = datetime.now(timezone.utc)
+            db.execute(text("LOCK TABLE channel_stats, channel_symbol_stats IN EXCLUSIVE MODE"))
+            if symbol_corrections:
+                ChannelStatsService._upsert(db, ChannelSymbolStats, ["channel_id", "symbol"], [
+                    {"channel_id": channel_id, "symbol": symbol, "updated_at": now, **delta}
+                    for (channel_id, symbol), delta in symbol_corrections.items()
+                ])
+            if channel_corrections:
+                ChannelStatsService._upsert(db, ChannelStats, ["channel_id"], [
+                    {"channel_id": channel_id, "updated_at": now, **delta}
+                    for channel_id, delta in channel_corrections.items()
+                ])
+            db.execute(delete(ChannelSymbolStats).where(ChannelSymbolStats.signal_count <= 0))
+            db.execute(delete(ChannelStats).where(ChannelStats.signal_count <= 0))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise DatabaseError(f"Failed to reconcile channel stats: {e}") from e
+
+        corrected = len(symbol_corrections) + len(channel_corrections)
+        logger.info(f"Channel stats reconciled: {corrected} aggregate(s) corrected")
+        return corrected
+
+    @staticmethod
+    def _drift(actual: Dict, stored: Dict) -> Dict:
+        """Get the counter deltas that turn the stored aggregates into the actual ones, omitting zero deltas."""
+        drift = {}
+        for key in actual.keys() | stored.keys():
+            delta = counters_delta(actual.get(key), stored.get(key))
+            # Incrementally summed floats differ from a fresh sum by rounding noise alone
+            delta = {name: value if abs(value) > DRIFT_TOLERANCE else 0 for name, value in delta.items()}
+            if any(delta.values()):
+                drift[key] = delta
+        return drift
+
+
+class ChannelStatsReconciler:
+    """Periodically corrects drift of the channel aggregates against the signals table."""
+
+    def __init__(self, interval_seconds: float = 3600.0):
+        """
+        Initialize the reconciler. Call start() to begin reconciling.
+
+        Args:
+            interval_seconds: Time between reconciliations
+        """
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.runs = 0
+        self.skipped_runs = 0
+        self.failed_runs = 0
+        self.last_run_at = None
+        self.last_run_seconds = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the reconciliation thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_once(self) -> int:
+        """
+        Reconcile the aggregates in a session of its own.
+
+        Returns:
+            Value returned by ChannelStatsService.reconcile
+        """
+        from utils.database_utils import get_db_handler
+
+        started = time.monotonic()
+        db = get_db_handler().get_session_factory()()
+        try:
+            corrected = ChannelStatsService.reconcile(db)
+        finally:
+            db.close()
+
+        if corrected < 0:
+            self.skipped_runs += 1
+        else:
+            self.runs += 1
+        self.last_run_at = time.time()
+        self.last_run_seconds = round(time.monotonic() - started, 3)
+        return corrected
+
+    def start(self) -> None:
+        """Start the reconciliation thread if it isn't running."""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="channel-stats-reconciler", daemon=True)
+            self._thread.start()
+        logger.info(f"Channel stats reconciler started (every {self.interval_seconds}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the reconciliation thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to exit
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Reconcile until stopped."""
+        while not self._stopping.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.failed_runs += 1
+                logger.error(f"Channel stats reconciliation failed: {e}", exc_info=True)
+
+    def stats(self) -> dict:
+        """Return reconciler state and counters."""
+        return {
+            'running': self.running,
+            'interval_seconds': self.interval_seconds,
+            'runs': self.runs,
+            'skipped_runs': self.skipped_runs,
+            'failed_runs': self.failed_runs,
+            'last_run_at': self.last_run_at,
+            'last_run_seconds': self.last_run_seconds,
+        }
+
+
+channel_stats_reconciler = ChannelStatsReconciler(
+    interval_seconds=env_handler.get_env("CHANNEL_STATS_RECONCILE_SECONDS")
+)
+
+atexit.register(channel_stats_reconciler.stop)
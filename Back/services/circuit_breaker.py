@@ -0,0 +1,180 @@
+"""Circuit breakers guarding calls to market data providers."""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from config.env_handler import EnvHandler
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.circuit_breaker")
+
+env_handler = EnvHandler()
+
+STATE_CLOSED = "CLOSED"
+STATE_OPEN = "OPEN"
+STATE_HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after it keeps failing or responding slowly.
+
+    - CLOSED: calls go through. failure_threshold consecutive failures
+      (errors or calls slower than latency_slo_seconds) open the breaker.
+    - OPEN: calls are rejected immediately for open_seconds.
+    - HALF_OPEN: a single probe call is let through. Its success closes the
+      breaker; its failure opens it again for another open_seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        latency_slo_seconds: float = 2.0,
+        open_seconds: float = 30.0
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            name: Name of the guarded provider
+            failure_threshold: Consecutive failures that open the breaker
+            latency_slo_seconds: Calls slower than this count as failures
+            open_seconds: How long the breaker stays open before probing
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_slo_seconds = latency_slo_seconds
+        self.open_seconds = open_seconds
+        self.state = STATE_CLOSED
+        self._lock = threading.Lock()
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.trips = 0
+        self.rejected = 0
+        self.slow_calls = 0
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, claiming the probe slot when half-open.
+
+        Returns:
+            True if the call may go through; the caller must then report it
+            with record_success, record_failure or release
+        """
+        with self._lock:
+            if self.state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = STATE_HALF_OPEN
+                logger.info(f"Circuit breaker {self.name} half-open, probing provider")
+
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency_seconds: float) -> None:
+        """
+        Report a completed call. Calls slower than the latency SLO count as failures.
+
+        Args:
+            latency_seconds: Duration of the call
+        """
+        if latency_seconds > self.latency_slo_seconds:
+            with self._lock:
+                self.slow_calls += 1
+            self.record_failure(f"call took {latency_seconds:.2f}s (SLO {self.latency_slo_seconds}s)")
+            return
+
+        with self._lock:
+            self._probe_in_flight = False
+            self.consecutive_failures = 0
+            if self.state != STATE_CLOSED:
+                self.state = STATE_CLOSED
+                self._opened_at = None
+                logger.info(f"Circuit breaker {self.name} closed, provider recovered")
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        """
+        Report a failed call.
+
+        Args:
+            error: Description of the failure
+        """
+        with self._lock:
+            self._probe_in_flight = False
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == STATE_HALF_OPEN or (
+                self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = STATE_OPEN
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning(
+                    f"Circuit breaker {self.name} opened after {self.consecutive_failures} "
+                    f"consecutive failure(s): {error}"
+                )
+
+    def release(self) -> None:
+        """Report a call that says nothing about provider health (e.g. rate limited)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        """Return the breaker state, settings and counters."""
+        with self._lock:
+            retry_in = None
+            if self.state == STATE_OPEN:
+                retry_in = round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'latency_slo_seconds': self.latency_slo_seconds,
+                'open_seconds': self.open_seconds,
+                'retry_in_seconds': retry_in,
+                'last_error': self.last_error,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'slow_calls': self.slow_calls,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker of a provider, creating it on first use.
+
+    Args:
+        name: Provider name
+
+    Returns:
+        CircuitBreaker instance
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=env_handler.get_env("MARKET_DATA_BREAKER_FAILURES"),
+                latency_slo_seconds=env_handler.get_env("MARKET_DATA_BREAKER_LATENCY_SLO_SECONDS"),
+                open_seconds=env_handler.get_env("MARKET_DATA_BREAKER_OPEN_SECONDS")
+            )
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, dict]:
+    """Return the stats of every provider's circuit breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,227 @@
+"""Token-bucket scheduler spending the upstream market-data API credit budget by priority."""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from config.env_handler import EnvHandler
+from config.exceptions_handler import RateLimitExceeded
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.credit_scheduler")
+
+env_handler = EnvHandler()
+
+# Priority classes, lowest value is served first
+PRIORITY_OUTCOME = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_TICKER = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_OUTCOME: "outcome",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_TICKER: "ticker",
+}
+
+
+class _Waiter:
+    """A queued request for credits."""
+
+    __slots__ = ("priority", "seq", "credits", "granted", "cancelled")
+
+    def __init__(self, priority: int, seq: int, credits: int):
+        self.priority = priority
+        self.seq = seq
+        self.credits = credits
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class CreditScheduler:
+    """
+    Token bucket holding up to one minute of API credits, refilled continuously.
+
+    Callers acquire the credits a request costs before sending it. When the
+    bucket can't cover a request it is queued; queued requests are granted
+    strictly in (priority, arrival) order, so outcome evaluation of open
+    signals is never starved by ticker refreshes. A request that can't be
+    granted before its deadline fails with RateLimitExceeded instead of
+    waiting, and is rejected up front when the credits needed by it and the
+    requests ahead of it can't refill in time.
+
+    The bucket belongs to one process; several processes each spend their
+    own credits_per_minute.
+    """
+
+    def __init__(self, credits_per_minute: int = 8):
+        """
+        Initialize the scheduler with a full bucket.
+
+        Args:
+            credits_per_minute: Credit budget of the API plan
+        """
+        self.capacity = max(1, credits_per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._spent = deque()
+        self.granted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def acquire(self, credits: int, priority: int = PRIORITY_INTERACTIVE, deadline: Optional[float] = None) -> float:
+        """
+        Wait until credits are available and take them.
+
+        Args:
+            credits: Credits the request costs
+            priority: Priority class (PRIORITY_OUTCOME, PRIORITY_INTERACTIVE or PRIORITY_TICKER)
+            deadline: Optional time.monotonic() value by which the credits must be granted
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the credits can't be granted before the deadline
+        """
+        if credits > self.capacity:
+            raise RateLimitExceeded(
+                f"Request needs {credits} credits, more than the {self.capacity} per minute budget"
+            )
+
+        started = time.monotonic()
+        with self._condition:
+            self._refill(started)
+            self._grant(started)
+            if not self._waiters and self._tokens >= credits:
+                self._take(credits, started)
+                self._record_wait(0.0)
+                return 0.0
+
+            waiter = _Waiter(priority, next(self._seq), credits)
+            ahead = sum(
+                other.credits for other in self._waiters
+                if not other.cancelled and other < waiter
+            )
+            if deadline is not None and started + (ahead + credits - self._tokens) / self.rate > deadline:
+                self.rejected += 1
+                raise RateLimitExceeded("Market data credit budget exhausted, try again shortly")
+
+            heapq.heappush(self._waiters, waiter)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                self._grant(now)
+                if waiter.granted:
+                    waited = now - started
+                    self._record_wait(waited)
+                    return waited
+
+                if deadline is not None and now >= deadline:
+                    waiter.cancelled = True
+                    self.rejected += 1
+                    # The head of the queue may have changed
+                    self._condition.notify_all()
+                    raise RateLimitExceeded("Market data credit budget exhausted, try again shortly")
+
+                head = self._waiters[0]
+                timeout = max(0.0, (head.credits - self._tokens) / self.rate)
+                if deadline is not None:
+                    timeout = min(timeout, deadline - now)
+                self._condition.wait(timeout)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """
+        Empty the bucket after the upstream API reported the budget is spent.
+
+        The bucket goes negative so it refills to zero only after retry_after,
+        which defaults to the start of the next wall-clock minute (the API's
+        accounting period).
+
+        Args:
+            retry_after: Seconds until the API accepts requests again
+        """
+        if retry_after is None:
+            retry_after = 60 - (time.time() % 60)
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -retry_after * self.rate)
+            self.throttled += 1
+        logger.warning(f"Market data API credit limit reached, pausing requests for {retry_after:.0f}s")
+
+    def _refill(self, now: float) -> None:
+        """Add the credits earned since the last refill. Caller must hold the lock."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _grant(self, now: float) -> None:
+        """Grant queued requests in order while the bucket covers them. Caller must hold the lock."""
+        granted = False
+        while self._waiters:
+            head = self._waiters[0]
+            if head.cancelled:
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens < head.credits:
+                break
+            heapq.heappop(self._waiters)
+            self._take(head.credits, now)
+            head.granted = True
+            granted = True
+        if granted:
+            self._condition.notify_all()
+
+    def _take(self, credits: int, now: float) -> None:
+        """Spend credits. Caller must hold the lock."""
+        self._tokens -= credits
+        self._spent.append((now, credits))
+        while self._spent[0][0] <= now - 60:
+            self._spent.popleft()
+        self.granted += 1
+
+    def _record_wait(self, waited: float) -> None:
+        """Update wait time counters. Caller must hold the lock."""
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> dict:
+        """Return the budget, its utilisation over the last minute and queue counters."""
+        now = time.monotonic()
+        with self._condition:
+            self._refill(now)
+            while self._spent and self._spent[0][0] <= now - 60:
+                self._spent.popleft()
+            used = sum(credits for _, credits in self._spent)
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for waiter in self._waiters:
+                if not waiter.cancelled:
+                    name = PRIORITY_NAMES.get(waiter.priority, str(waiter.priority))
+                    queued[name] = queued.get(name, 0) + 1
+            return {
+                'credits_per_minute': self.capacity,
+                'available': round(self._tokens, 2),
+                'used_last_minute': used,
+                'utilisation': round(used / self.capacity, 3),
+                'queued': queued,
+                'granted': self.granted,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+                'avg_wait_ms': round(self.total_wait_seconds / self.granted * 1000, 1) if self.granted else 0.0,
+                'max_wait_ms': round(self.max_wait_seconds * 1000, 1),
+            }
+
+
+credit_scheduler = CreditScheduler(
+    credits_per_minute=env_handler.get_env("TWELVE_DATA_CREDITS_PER_MINUTE")
+)
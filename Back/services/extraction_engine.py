@@ -0,0 +1,280 @@
+"""Fused extraction engine that evaluates all of a channel's templates in one plan."""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+from config.env_handler import EnvHandler
+from config.exceptions_handler import TemplateBudgetExceeded
+from services.template_cache import NO_MATCH, CompiledField, extract_field, template_cache
+from services.template_guard import template_guard
+from utils.logger_utils import get_module_logger
+from utils.regex_utils import LiteralScanner
+
+logger = get_module_logger("services.extraction_engine")
+
+env_handler = EnvHandler()
+
+ENGINE_SEQUENTIAL = "sequential"
+ENGINE_FUSED = "fused"
+
+# Error yielded for templates the literal prefilter skips; not recorded in the extraction history
+PREFILTER_SKIPPED = "Skipped by literal prefilter"
+
+# Marks a field op that raised during extraction (logged once, treated as no match)
+_FAILED = object()
+_UNSET = object()
+
+
+def _field_signature(field: CompiledField) -> tuple:
+    """Identity of a field's extraction work, independent of the key it is stored under."""
+    pattern = field.pattern
+    return (
+        field.method,
+        field.type,
+        pattern.pattern if pattern is not None else None,
+        pattern.flags if pattern is not None else None,
+        field.start_marker,
+        field.end_marker,
+        field.compile_error,
+    )
+
+
+class ChannelExtractionPlan:
+    """
+    Scan plan fusing every active template of a channel.
+
+    Identical field operations (same pattern/marker and type) shared between
+    templates are evaluated at most once per message, lazily, and the results
+    are attributed back to each template. Templates only run their optional
+    fields once their symbol and entry fields have matched, because
+    extraction yields nothing without both. The extracted_data produced for a
+    template is identical to SignalService._extract_with_plan.
+
+    The plan also holds the channel's literal prefilter: one scan of the
+    message finds which required literals/markers it contains, and templates
+    missing any of theirs are skipped without running a regex.
+    """
+
+    def __init__(self, templates: List):
+        """
+        Build the fused plan.
+
+        Args:
+            templates: Template model instances to fuse
+        """
+        ops = []
+        op_index = {}
+        self._templates = {}
+        self._requirements = {}
+        plans = [(template, template_cache.get(template)) for template in templates]
+
+        self._literal_scanner = LiteralScanner(
+            (literal for _, plan in plans for literal in plan.required_literals),
+            re.IGNORECASE
+        )
+        self._marker_scanner = LiteralScanner(
+            marker for _, plan in plans for marker in plan.required_markers
+        )
+
+        for template, plan in plans:
+            self._requirements[(template.id, template.version)] = (
+                frozenset(self._literal_scanner.normalize(literal) for literal in plan.required_literals),
+                plan.required_markers,
+            )
+
+            field_ops = []
+            for field in plan.fields:
+                signature = _field_signature(field)
+                if signature not in op_index:
+                    op_index[signature] = len(ops)
+                    ops.append(field)
+                field_ops.append((op_index[signature], field.key))
+
+            field_ops = tuple(field_ops)
+            symbol_ops = tuple(op for op, key in field_ops if key == 'symbol')
+            entry_ops = tuple(op for op, key in field_ops if key == 'entry')
+            self._templates[(template.id, template.version)] = (field_ops, symbol_ops, entry_ops)
+
+        self._ops = tuple(ops)
+
+    @property
+    def op_count(self) -> int:
+        """Number of distinct field operations in the plan."""
+        return len(self._ops)
+
+    def scan_literals(self, message_text: str) -> Tuple[frozenset, frozenset]:
+        """
+        Find which of the channel's required literals and markers a message contains.
+
+        Args:
+            message_text: Message text to scan
+
+        Returns:
+            Tuple of (literals found, markers found), for use with may_match
+        """
+        return self._literal_scanner.scan(message_text), self._marker_scanner.scan(message_text)
+
+    def may_match(self, template, found: Tuple[frozenset, frozenset]) -> bool:
+        """
+        Check whether a template could match, given the result of scan_literals.
+
+        Args:
+            template: Template model instance (must belong to the plan)
+            found: Result of scan_literals for the message
+
+        Returns:
+            False if the message lacks a token the template requires
+        """
+        literals, markers = self._requirements[(template.id, template.version)]
+        return literals <= found[0] and markers <= found[1]
+
+    def iter_extractions(
+        self,
+        message_text: str,
+        templates: List
+    ) -> Iterator[Tuple[object, Optional[dict], Optional[str]]]:
+        """
+        Lazily extract data for each template, in the given order.
+
+        Each template is charged for the field ops first evaluated on its
+        behalf and fails once that exceeds the template_guard budget.
+
+        Args:
+            message_text: Message text to extract from
+            templates: Templates to evaluate, in priority order (must belong to the plan)
+
+        Yields:
+            Tuples of (template, extracted data dict or None, error message or None);
+            the error is PREFILTER_SKIPPED for templates the prefilter skipped
+        """
+        ops = self._ops
+        values = [_UNSET] * len(ops)
+
+        def value_of(op: int):
+            value = values[op]
+            if value is _UNSET:
+                try:
+                    value = extract_field(message_text, ops[op])
+                except Exception as e:
+                    logger.warning(f"Error extracting field {ops[op].key}: {e}")
+                    value = _FAILED
+                values[op] = value
+            return value
+
+        def matched(op: int) -> bool:
+            value = value_of(op)
+            return value is not NO_MATCH and value is not _FAILED
+
+        found = self.scan_literals(message_text)
+
+        for template in templates:
+            field_ops, symbol_ops, entry_ops = self._templates[(template.id, template.version)]
+
+            quarantine_error = template_guard.quarantine_error(template.id)
+            if quarantine_error:
+                yield template, None, quarantine_error
+                continue
+
+            if not self.may_match(template, found):
+                yield template, None, PREFILTER_SKIPPED
+                continue
+
+            deadline = template_guard.deadline()
+
+            def budgeted_match(op: int) -> bool:
+                result = matched(op)
+                template_guard.check(template.id, deadline)
+                return result
+
+            try:
+                if not any(budgeted_match(op) for op in symbol_ops) or not any(budgeted_match(op) for op in entry_ops):
+                    yield template, None, None
+                    continue
+
+                extracted = {}
+                for op, key in field_ops:
+                    value = value_of(op)
+                    template_guard.check(template.id, deadline)
+                    if value is NO_MATCH or value is _FAILED:
+                        continue
+                    # Array values are shared between templates; hand each its own list
+                    extracted[key] = list(value) if isinstance(value, list) else value
+            except TemplateBudgetExceeded as e:
+                yield template, None, str(e)
+                continue
+
+            yield template, extracted, None
+
+
+class ChannelPlanCache:
+    """Bounded LRU cache of fused plans keyed by the set of (template_id, version) they cover."""
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of fused plans to keep
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, templates: List) -> ChannelExtractionPlan:
+        """
+        Get the fused plan for a set of templates, building it on a miss.
+
+        Args:
+            templates: Template model instances
+
+        Returns:
+            ChannelExtractionPlan covering the templates
+        """
+        key = frozenset((template.id, template.version) for template in templates)
+        with self._lock:
+            plan = self._entries.get(key)
+            if plan is not None:
+                self._entries.move_to_end(key)
+                return plan
+
+        plan = ChannelExtractionPlan(templates)
+
+        with self._lock:
+            self._entries[key] = plan
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        logger.debug(f"Built fused plan for {len(templates)} template(s) with {plan.op_count} field op(s)")
+        return plan
+
+    def invalidate(self, template_id) -> None:
+        """
+        Drop every fused plan that includes a template.
+
+        Args:
+            template_id: Template UUID
+        """
+        with self._lock:
+            stale_keys = [key for key in self._entries if any(entry[0] == template_id for entry in key)]
+            for key in stale_keys:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached plans."""
+        with self._lock:
+            self._entries.clear()
+
+
+channel_plan_cache = ChannelPlanCache(max_size=env_handler.get_env("CHANNEL_PLAN_CACHE_MAX_SIZE"))
+
+
+def get_extraction_engine() -> str:
+    """Return the configured extraction engine (EXTRACTION_ENGINE), defaulting to sequential."""
+    engine = (env_handler.get_env("EXTRACTION_ENGINE") or ENGINE_SEQUENTIAL).lower()
+    if engine not in (ENGINE_SEQUENTIAL, ENGINE_FUSED):
+        logger.warning(f"Unknown EXTRACTION_ENGINE '{engine}', using '{ENGINE_SEQUENTIAL}'")
+        return ENGINE_SEQUENTIAL
+    return engine
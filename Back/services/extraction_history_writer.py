@@ -0,0 +1,226 @@
+"""Background writer that batches ExtractionHistory rows off the request path."""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from config.env_handler import EnvHandler
+from models import ExtractionHistory
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.extraction_history_writer")
+
+env_handler = EnvHandler()
+
+
+class ExtractionHistoryWriter:
+    """
+    Buffers extraction attempts in a bounded in-process queue and writes them
+    with multi-row INSERTs from a daemon thread.
+
+    A batch is flushed when it reaches batch_size rows or flush_interval_seconds
+    after its first row. Above the high-water mark only one in sample_every
+    failed attempts is kept (successes are rarer and always kept while there
+    is room); when the queue is full new attempts are dropped. Nothing here
+    ever blocks the caller.
+    """
+
+    HIGH_WATER_RATIO = 0.75
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 2.0,
+        sample_every: int = 10
+    ):
+        """
+        Initialize the writer. The thread starts on the first submitted attempt.
+
+        Args:
+            max_queue_size: Maximum number of attempts waiting to be written
+            batch_size: Maximum rows per INSERT
+            flush_interval_seconds: Maximum time a row waits before its batch is written
+            sample_every: Keep one in this many failures above the high-water mark
+        """
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.sample_every = max(1, sample_every)
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._high_water = int(max_queue_size * self.HIGH_WATER_RATIO)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._sample_counter = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self.failed_batches = 0
+
+    def submit(
+        self,
+        template_id: Any,
+        was_successful: bool,
+        error_message: Optional[str] = None,
+        extracted_data: Optional[dict] = None,
+        original_message: Optional[str] = None
+    ) -> bool:
+        """
+        Queue an extraction attempt for writing.
+
+        Args:
+            template_id: Template UUID
+            was_successful: Whether the template produced a signal
+            error_message: Optional failure reason
+            extracted_data: Optional extracted field values
+            original_message: Optional message text
+
+        Returns:
+            True if the attempt was queued, False if it was sampled out or dropped
+        """
+        self._ensure_started()
+
+        if not was_successful and self._queue.qsize() >= self._high_water:
+            with self._stats_lock:
+                self._sample_counter += 1
+                if self._sample_counter % self.sample_every:
+                    self.sampled_out += 1
+                    return False
+
+        row = {
+            'id': uuid4(),
+            'template_id': template_id,
+            'was_successful': was_successful,
+            'error_message': error_message,
+            'extracted_data': extracted_data,
+            'original_message': original_message,
+            'created_at': datetime.now(timezone.utc),
+        }
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def stats(self) -> dict:
+        """Return queue depth and write/drop counters."""
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_size': self.max_queue_size,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'sampled_out': self.sampled_out,
+                'failed_batches': self.failed_batches,
+                'running': self._thread is not None and self._thread.is_alive(),
+            }
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the writer thread after flushing what is queued.
+
+        Args:
+            timeout: Maximum seconds to wait for the final flush
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread if it isn't running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="extraction-history-writer",
+                daemon=True
+            )
+            self._thread.start()
+            logger.info("Extraction history writer started")
+
+    def _run(self) -> None:
+        """Collect rows into batches and write them until stopped."""
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = self.flush_interval_seconds if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_seconds
+            except queue.Empty:
+                pass
+
+            # Drain whatever is already waiting, up to a full batch
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or self._stopping.is_set()):
+                self._write(batch)
+                batch = []
+                deadline = None
+
+            if self._stopping.is_set() and self._queue.empty() and not batch:
+                return
+
+    def _write(self, rows: list) -> None:
+        """
+        Write a batch with a single multi-row INSERT.
+
+        Args:
+            rows: ExtractionHistory column dicts
+        """
+        from utils.database_utils import get_db_handler
+
+        db = None
+        try:
+            db = get_db_handler().get_session_factory()()
+            db.execute(insert(ExtractionHistory), rows)
+            db.commit()
+            with self._stats_lock:
+                self.written += len(rows)
+        except Exception as e:
+            if db is not None:
+                db.rollback()
+            with self._stats_lock:
+                self.failed_batches += 1
+                self.dropped += len(rows)
+            logger.error(f"Failed to write {len(rows)} extraction history rows: {e}")
+        finally:
+            if db is not None:
+                db.close()
+
+
+extraction_history_writer = ExtractionHistoryWriter(
+    max_queue_size=env_handler.get_env("EXTRACTION_HISTORY_QUEUE_SIZE"),
+    batch_size=env_handler.get_env("EXTRACTION_HISTORY_BATCH_SIZE"),
+    flush_interval_seconds=env_handler.get_env("EXTRACTION_HISTORY_FLUSH_INTERVAL_SECONDS"),
+    sample_every=env_handler.get_env("EXTRACTION_HISTORY_SAMPLE_EVERY")
+)
+
+atexit.register(extraction_history_writer.stop)
@@ -0,0 +1,354 @@
+"""In-memory index of open signals' trigger levels, sorted per symbol for fast hit detection."""
+
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from models.signal import Signal
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.level_index")
+
+LONG_SIGNAL_TYPES = ("BUY", "LONG")
+
+# Level number of a stop loss; take profits are numbered from 0
+STOP_LOSS_LEVEL = -1
+
+# Entry keys pack the signal slot and level number into one int64
+_LEVEL_BITS = 16
+
+
+def _entry_key(slot: int, level: int) -> int:
+    return (slot << _LEVEL_BITS) | (level + 1)
+
+
+def signal_levels(stop_loss: Optional[dict], take_profits: Optional[List[dict]]) -> List[Tuple[int, float]]:
+    """
+    Get the levels of a signal that can still trigger.
+
+    Args:
+        stop_loss: Signal stop_loss JSON
+        take_profits: Signal take_profits JSON
+
+    Returns:
+        List of (level number, price), STOP_LOSS_LEVEL for the stop loss and
+        the position in take_profits for take profits not hit yet
+    """
+    levels = []
+    if stop_loss and stop_loss.get("price") is not None and not stop_loss.get("hit"):
+        levels.append((STOP_LOSS_LEVEL, float(stop_loss["price"])))
+    for level, take_profit in enumerate(take_profits or []):
+        if take_profit.get("price") is not None and not take_profit.get("hit"):
+            levels.append((level, float(take_profit["price"])))
+    return levels
+
+
+class _LevelBook:
+    """Levels of one kind (e.g. stop losses of BUY signals) as parallel arrays sorted by price."""
+
+    __slots__ = ("prices", "keys")
+
+    def __init__(self):
+        self.prices = np.empty(0, dtype=np.float64)
+        self.keys = np.empty(0, dtype=np.int64)
+
+    def insert(self, prices: List[float], keys: List[int]) -> None:
+        if not prices:
+            return
+        prices = np.asarray(prices, dtype=np.float64)
+        keys = np.asarray(keys, dtype=np.int64)
+        order = np.argsort(prices, kind="stable")
+        positions = np.searchsorted(self.prices, prices[order], side="right")
+        self.prices = np.insert(self.prices, positions, prices[order])
+        self.keys = np.insert(self.keys, positions, keys[order])
+
+    def remove(self, mask: np.ndarray) -> None:
+        if mask.any():
+            self.prices = self.prices[~mask]
+            self.keys = self.keys[~mask]
+
+    def at_least(self, price: float) -> np.ndarray:
+        return self.keys[np.searchsorted(self.prices, price, side="left"):]
+
+    def at_most(self, price: float) -> np.ndarray:
+        return self.keys[:np.searchsorted(self.prices, price, side="right")]
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+class SymbolLevelIndex:
+    """
+    Trigger levels of the open signals of one symbol.
+
+    Stop losses and take profits are kept in four books split by side, each
+    sorted by price, so the levels a price move crosses are found with two
+    binary searches per book instead of a scan of every signal.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._books = {
+            (is_long, is_stop_loss): _LevelBook()
+            for is_long in (True, False)
+            for is_stop_loss in (True, False)
+        }
+        self._slots = {}
+        self._signal_ids = []
+        self._free_slots = []
+
+    def add(self, signals: Iterable[Tuple]) -> None:
+        """
+        Add signals, replacing their levels if they are already indexed.
+
+        Args:
+            signals: (signal_id, signal_type, stop_loss JSON, take_profits JSON) tuples
+        """
+        signals = list(signals)
+        self.remove([signal[0] for signal in signals])
+
+        pending = {book: ([], []) for book in self._books}
+        for signal_id, signal_type, stop_loss, take_profits in signals:
+            levels = signal_levels(stop_loss, take_profits)
+            if not levels:
+                continue
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._signal_ids[slot] = signal_id
+            else:
+                slot = len(self._signal_ids)
+                self._signal_ids.append(signal_id)
+            self._slots[signal_id] = slot
+
+            is_long = signal_type in LONG_SIGNAL_TYPES
+            for level, price in levels:
+                prices, keys = pending[(is_long, level == STOP_LOSS_LEVEL)]
+                prices.append(price)
+                keys.append(_entry_key(slot, level))
+
+        for book, (prices, keys) in pending.items():
+            self._books[book].insert(prices, keys)
+
+    def remove(self, signal_ids: Iterable) -> None:
+        """
+        Remove every level of some signals.
+
+        Args:
+            signal_ids: Signal UUIDs; ids that aren't indexed are ignored
+        """
+        slots = [self._slots.pop(signal_id) for signal_id in signal_ids if signal_id in self._slots]
+        if not slots:
+            return
+        for book in self._books.values():
+            book.remove(np.isin(book.keys >> _LEVEL_BITS, slots))
+        for slot in slots:
+            self._signal_ids[slot] = None
+            self._free_slots.append(slot)
+
+    def remove_levels(self, levels: Iterable[Tuple]) -> None:
+        """
+        Remove single levels, e.g. take profits that were hit.
+
+        Args:
+            levels: (signal_id, level number) tuples
+        """
+        keys = [
+            _entry_key(self._slots[signal_id], level)
+            for signal_id, level in levels
+            if signal_id in self._slots
+        ]
+        if keys:
+            for book in self._books.values():
+                book.remove(np.isin(book.keys, keys))
+
+    def query(self, low: float, high: float) -> List:
+        """
+        Find the signals with a level the price reached while moving within a range.
+
+        Args:
+            low: Lowest price of the move
+            high: Highest price of the move
+
+        Returns:
+            List of signal UUIDs
+        """
+        keys = np.concatenate([
+            self._books[(True, True)].at_least(low),
+            self._books[(True, False)].at_most(high),
+            self._books[(False, True)].at_most(high),
+            self._books[(False, False)].at_least(low),
+        ])
+        return [self._signal_ids[slot] for slot in np.unique(keys >> _LEVEL_BITS)]
+
+    @property
+    def signal_count(self) -> int:
+        return len(self._slots)
+
+    @property
+    def level_count(self) -> int:
+        return sum(len(book) for book in self._books.values())
+
+
+class LevelIndex:
+    """
+    Sorted trigger levels of all open signals, per symbol.
+
+    Built from the database by rebuild() and kept up to date by signal
+    creation and closure in between. Changes made while a rebuild reads the
+    database are replayed on the rebuilt index, so none are lost. Until the
+    first rebuild, changes are ignored.
+    """
+
+    def __init__(self):
+        """Initialize an empty, unbuilt index."""
+        self._symbols = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self.built = False
+        self.rebuilds = 0
+        self.last_rebuild_at = None
+        self.last_rebuild_seconds = None
+        self.queries = 0
+        self.candidates = 0
+
+    def _apply(self, operation: str, symbol: str, argument: list) -> None:
+        """Apply a change to the current index and journal it during a rebuild. Lock must be held."""
+        if self._journal is not None:
+            self._journal.append((operation, symbol, argument))
+        elif not self.built:
+            return
+        symbol_index = self._symbols.get(symbol)
+        if symbol_index is None:
+            if operation != "add":
+                return
+            symbol_index = self._symbols[symbol] = SymbolLevelIndex()
+        getattr(symbol_index, operation)(argument)
+
+    def add_signal(self, signal_id, symbol: str, signal_type: str, stop_loss: Optional[dict], take_profits: Optional[List[dict]]) -> None:
+        """
+        Index the levels of a new or changed open signal.
+
+        Args:
+            signal_id: Signal UUID
+            symbol: Trading symbol
+            signal_type: BUY, SELL, LONG or SHORT
+            stop_loss: Signal stop_loss JSON
+            take_profits: Signal take_profits JSON
+        """
+        with self._lock:
+            self._apply("add", symbol, [(signal_id, signal_type, stop_loss, take_profits)])
+
+    def remove_signals(self, symbol: str, signal_ids: Iterable) -> None:
+        """
+        Drop closed or deleted signals from the index.
+
+        Args:
+            symbol: Trading symbol
+            signal_ids: Signal UUIDs
+        """
+        with self._lock:
+            self._apply("remove", symbol, list(signal_ids))
+
+    def remove_levels(self, symbol: str, levels: Iterable[Tuple]) -> None:
+        """
+        Drop levels that were hit.
+
+        Args:
+            symbol: Trading symbol
+            levels: (signal_id, level number) tuples
+        """
+        with self._lock:
+            self._apply("remove_levels", symbol, list(levels))
+
+    def query(self, symbol: str, price_from: float, price_to: float) -> List:
+        """
+        Find the open signals of a symbol with a level crossed by a price move.
+
+        Args:
+            symbol: Trading symbol
+            price_from: Price before the move
+            price_to: Price after the move
+
+        Returns:
+            List of signal UUIDs
+        """
+        with self._lock:
+            symbol_index = self._symbols.get(symbol)
+            signal_ids = symbol_index.query(min(price_from, price_to), max(price_from, price_to)) if symbol_index else []
+            self.queries += 1
+            self.candidates += len(signal_ids)
+        return signal_ids
+
+    def symbols(self) -> List[str]:
+        """Return the symbols with indexed signals."""
+        with self._lock:
+            return [symbol for symbol, index in self._symbols.items() if index.signal_count]
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Rebuild the index from the pending signals in the database.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of indexed signals
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._journal = []
+        try:
+            rows = db.execute(
+                select(Signal.id, Signal.symbol, Signal.signal_type, Signal.stop_loss, Signal.take_profits)
+                .where(
+                    Signal.closed_at.is_(None),
+                    or_(Signal.performance_outcome.is_(None), Signal.performance_outcome == "PENDING"),
+                )
+            ).all()
+
+            by_symbol = {}
+            for row in rows:
+                by_symbol.setdefault(row.symbol, []).append((row.id, row.signal_type, row.stop_loss, row.take_profits))
+            symbols = {}
+            for symbol, signals in by_symbol.items():
+                symbols[symbol] = SymbolLevelIndex()
+                symbols[symbol].add(signals)
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._symbols = symbols
+            self.built = True
+            for operation, symbol, argument in journal:
+                self._apply(operation, symbol, argument)
+            self.rebuilds += 1
+            self.last_rebuild_at = time.time()
+            self.last_rebuild_seconds = round(time.monotonic() - started, 3)
+
+        logger.info(f"Level index rebuilt with {len(rows)} open signal(s) over {len(symbols)} symbol(s)")
+        return len(rows)
+
+    def stats(self) -> dict:
+        """Return index size and counters."""
+        with self._lock:
+            return {
+                'built': self.built,
+                'symbols': len(self._symbols),
+                'signals': sum(index.signal_count for index in self._symbols.values()),
+                'levels': sum(index.level_count for index in self._symbols.values()),
+                'rebuilds': self.rebuilds,
+                'last_rebuild_at': self.last_rebuild_at,
+                'last_rebuild_seconds': self.last_rebuild_seconds,
+                'queries': self.queries,
+                'candidates': self.candidates,
+            }
+
+
+level_index = LevelIndex()
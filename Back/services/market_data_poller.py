@@ -0,0 +1,385 @@
+"""Background market-data poller and the in-memory store of latest quotes it maintains."""
+
+import atexit
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from config.env_handler import EnvHandler
+from services.credit_scheduler import PRIORITY_OUTCOME, PRIORITY_TICKER, credit_scheduler
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.market_data_poller")
+
+env_handler = EnvHandler()
+
+
+class QuoteStore:
+    """
+    Latest quote per symbol with a version counter that readers can wait on.
+
+    Every update that changes at least one quote bumps the version; each
+    symbol remembers the version it last changed in, so a stream consumer
+    only receives the quotes that changed since its last read.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._quotes = {}
+        self._changed_in = {}
+        self._condition = threading.Condition()
+        self.version = 0
+
+    def update(self, quotes: Dict[str, Dict]) -> int:
+        """
+        Store new quotes and wake up waiting readers if any changed.
+
+        Args:
+            quotes: Dictionary mapping symbols to quotes
+
+        Returns:
+            Number of quotes that changed
+        """
+        with self._condition:
+            changed = [symbol for symbol, quote in quotes.items() if self._quotes.get(symbol) != quote]
+            if not changed:
+                return 0
+            self.version += 1
+            for symbol in changed:
+                self._quotes[symbol] = quotes[symbol]
+                self._changed_in[symbol] = self.version
+            self._condition.notify_all()
+            return len(changed)
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Get the stored quotes of several symbols.
+
+        Args:
+            symbols: Trading symbols
+
+        Returns:
+            Dictionary mapping the symbols that have a quote to it
+        """
+        with self._condition:
+            return {symbol: self._quotes[symbol] for symbol in symbols if symbol in self._quotes}
+
+    def snapshot(self, symbols: Iterable[str]) -> Tuple[int, Dict[str, Dict]]:
+        """
+        Get the current version and quotes of several symbols atomically.
+
+        Args:
+            symbols: Trading symbols
+
+        Returns:
+            Tuple of (version, dictionary of quotes)
+        """
+        with self._condition:
+            return self.version, {symbol: self._quotes[symbol] for symbol in symbols if symbol in self._quotes}
+
+    def wait_for_changes(self, since_version: int, symbols: Iterable[str], timeout: float) -> Tuple[int, Dict[str, Dict]]:
+        """
+        Block until a quote of the given symbols changes after a version, or the timeout passes.
+
+        Args:
+            since_version: Version of the caller's last read
+            symbols: Trading symbols the caller is interested in
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Tuple of (version read, dictionary of quotes changed since since_version)
+        """
+        symbols = list(symbols)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                changed = {
+                    symbol: self._quotes[symbol]
+                    for symbol in symbols
+                    if self._changed_in.get(symbol, 0) > since_version
+                }
+                remaining = deadline - time.monotonic()
+                if changed or remaining <= 0:
+                    return self.version, changed
+                self._condition.wait(remaining)
+
+    def stats(self) -> dict:
+        """Return the number of stored quotes and the current version."""
+        with self._condition:
+            return {
+                'symbols': len(self._quotes),
+                'version': self.version,
+            }
+
+
+class MarketDataPoller:
+    """
+    Refreshes quotes of all subscribed symbols on an interval.
+
+    The symbol set is the union of the ticker symbols, the symbols of open
+    signals (re-read every open_symbols_refresh_seconds) and symbols clients
+    asked for recently (kept for subscription_ttl_seconds after the last
+    request). Upstream calls therefore scale with the number of symbols, not
+    with the number of clients. On a metered provider the interval is
+    stretched so a poll of every symbol fits in credit_share of the credit
+    budget, leaving the rest to interactive requests.
+
+    When the poller isn't started at boot, quote streams start it on demand
+    through attach(); it then stops again once the last stream detaches.
+    """
+
+    def __init__(
+        self,
+        store: QuoteStore,
+        interval_seconds: float = 15.0,
+        ticker_symbols: Iterable[str] = (),
+        open_symbols_refresh_seconds: float = 60.0,
+        subscription_ttl_seconds: float = 600.0,
+        credit_share: float = 0.75
+    ):
+        """
+        Initialize the poller. Call start() to begin polling.
+
+        Args:
+            store: Quote store to write into
+            interval_seconds: Shortest time between polls
+            ticker_symbols: Symbols that are always polled
+            open_symbols_refresh_seconds: Time between reads of open-signal symbols
+            subscription_ttl_seconds: How long a requested symbol keeps being polled
+            credit_share: Share of a metered provider's credit budget polls may spend
+        """
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.ticker_symbols = [symbol.strip().upper() for symbol in ticker_symbols if symbol.strip()]
+        self.open_symbols_refresh_seconds = open_symbols_refresh_seconds
+        self.subscription_ttl_seconds = subscription_ttl_seconds
+        self.credit_share = min(1.0, max(0.01, credit_share))
+        self.current_interval_seconds = interval_seconds
+        self._subscriptions = {}
+        self._open_symbols = []
+        self._open_symbols_read_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._on_demand = False
+        self._consumers = 0
+        self.polls = 0
+        self.failed_polls = 0
+        self.last_poll_at = None
+        self.last_poll_seconds = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the polling thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        """
+        Keep symbols in the polled set for subscription_ttl_seconds.
+
+        Newly subscribed symbols trigger an early poll.
+
+        Args:
+            symbols: Trading symbols
+        """
+        expires_at = time.monotonic() + self.subscription_ttl_seconds
+        new_symbol = False
+        with self._lock:
+            polled = set(self.ticker_symbols) | set(self._open_symbols) | set(self._subscriptions)
+            for symbol in symbols:
+                new_symbol = new_symbol or symbol not in polled
+                self._subscriptions[symbol] = expires_at
+        if new_symbol:
+            self._wakeup.set()
+
+    def attach(self, symbols: Iterable[str]) -> None:
+        """
+        Register a stream consuming quotes of symbols and make sure they are polled.
+
+        Starts the polling thread on demand if it isn't running; pair every
+        call with detach().
+
+        Args:
+            symbols: Trading symbols
+        """
+        self.subscribe(symbols)
+        with self._lock:
+            self._consumers += 1
+            if not self.running:
+                self._on_demand = True
+                self._start_thread()
+                logger.info("Market data poller started on demand")
+
+    def detach(self) -> None:
+        """Unregister a stream registered with attach()."""
+        with self._lock:
+            self._consumers = max(0, self._consumers - 1)
+            if self._on_demand and not self._consumers:
+                self._wakeup.set()
+
+    def symbols(self) -> List[str]:
+        """Return the symbols polled on the next tick."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [symbol for symbol, expires_at in self._subscriptions.items() if expires_at <= now]
+            for symbol in expired:
+                del self._subscriptions[symbol]
+            return list(dict.fromkeys(self.ticker_symbols + self._open_symbols + list(self._subscriptions)))
+
+    def start(self) -> None:
+        """Start the polling thread if it isn't running, and keep it running without streams."""
+        with self._lock:
+            self._on_demand = False
+            if self.running:
+                return
+            self._start_thread()
+        logger.info(f"Market data poller started (every {self.interval_seconds}s)")
+
+    def _start_thread(self) -> None:
+        """Start the polling thread; the caller holds the lock."""
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="market-data-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the polling thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to exit
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Poll until stopped."""
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                self.failed_polls += 1
+                logger.error(f"Market data poll failed: {e}", exc_info=True)
+            self._wakeup.wait(max(0.0, self.current_interval_seconds - (time.monotonic() - started)))
+            self._wakeup.clear()
+            with self._lock:
+                if self._on_demand and not self._consumers:
+                    # Cleared under the lock so a concurrent attach() starts a new thread
+                    self._thread = None
+                    logger.info("Market data poller stopped, no streams left")
+                    return
+
+    def poll_once(self) -> int:
+        """
+        Fetch quotes of all polled symbols and store them.
+
+        Returns:
+            Number of quotes that changed
+        """
+        from services.market_data_service import MarketDataService
+
+        self._refresh_open_symbols()
+        symbols = self.symbols()
+        self.current_interval_seconds = self.poll_interval(len(symbols))
+        if not symbols:
+            return 0
+
+        # Open-signal symbols feed outcome evaluation, so they are fetched at a higher priority
+        with self._lock:
+            open_symbols = [symbol for symbol in symbols if symbol in self._open_symbols]
+        other_symbols = [symbol for symbol in symbols if symbol not in open_symbols]
+
+        started = time.monotonic()
+        results = {}
+        if open_symbols:
+            results.update(MarketDataService.fetch_quotes(open_symbols, priority=PRIORITY_OUTCOME))
+        if other_symbols:
+            results.update(MarketDataService.fetch_quotes(other_symbols, priority=PRIORITY_TICKER))
+        quotes = {symbol: quote for symbol, quote in results.items() if not isinstance(quote, Exception)}
+        failed = [symbol for symbol, quote in results.items() if isinstance(quote, Exception)]
+        if failed:
+            logger.warning(f"Market data poll could not refresh {len(failed)} symbol(s): {failed}")
+            # Keep serving the last good quotes, flagged stale until a fetch succeeds again
+            quotes.update({
+                symbol: {**quote, 'stale': True}
+                for symbol, quote in self.store.get_many(failed).items()
+                if not quote.get('stale')
+            })
+
+        changed = self.store.update(quotes)
+        self.polls += 1
+        self.last_poll_at = time.time()
+        self.last_poll_seconds = round(time.monotonic() - started, 3)
+        return changed
+
+    def poll_interval(self, symbol_count: int) -> float:
+        """
+        Get the time between polls of a number of symbols.
+
+        Args:
+            symbol_count: Number of polled symbols
+
+        Returns:
+            interval_seconds, or longer when polling every symbol that often
+            would spend more than credit_share of a metered provider's budget
+        """
+        from services.market_data_service import MarketDataService
+
+        if not symbol_count or not MarketDataService.get_provider().metered:
+            return self.interval_seconds
+        credits_per_minute = credit_scheduler.capacity * self.credit_share
+        return max(self.interval_seconds, 60.0 * symbol_count / credits_per_minute)
+
+    def _refresh_open_symbols(self) -> None:
+        """Re-read the symbols of open signals when the refresh interval has elapsed."""
+        now = time.monotonic()
+        if self._open_symbols_read_at is not None and now - self._open_symbols_read_at < self.open_symbols_refresh_seconds:
+            return
+
+        from services.signal_service import SignalService
+        from utils.database_utils import get_db_handler
+
+        self._open_symbols_read_at = now
+        db = None
+        try:
+            db = get_db_handler().get_session_factory()()
+            open_symbols = [symbol.upper() for symbol in SignalService.get_open_signal_symbols(db)]
+            with self._lock:
+                self._open_symbols = open_symbols
+        except Exception as e:
+            logger.warning(f"Could not read open signal symbols: {e}")
+        finally:
+            if db is not None:
+                db.close()
+
+    def stats(self) -> dict:
+        """Return poller state and counters."""
+        return {
+            'running': self.running,
+            'on_demand': self._on_demand,
+            'streams': self._consumers,
+            'interval_seconds': self.interval_seconds,
+            'current_interval_seconds': round(self.current_interval_seconds, 3),
+            'credit_share': self.credit_share,
+            'symbols': self.symbols(),
+            'polls': self.polls,
+            'failed_polls': self.failed_polls,
+            'last_poll_at': self.last_poll_at,
+            'last_poll_seconds': self.last_poll_seconds,
+            'store': self.store.stats(),
+        }
+
+
+quote_store = QuoteStore()
+
+market_data_poller = MarketDataPoller(
+    quote_store,
+    interval_seconds=env_handler.get_env("MARKET_DATA_POLL_INTERVAL_SECONDS"),
+    ticker_symbols=(env_handler.get_env("MARKET_DATA_TICKER_SYMBOLS") or "").split(","),
+    credit_share=env_handler.get_env("MARKET_DATA_POLL_CREDIT_SHARE")
+)
+
+atexit.register(market_data_poller.stop)
@@ -0,0 +1,756 @@
+"""Market data providers: Twelve Data, a recorded-file replay and a synthetic random walk."""
+
+import bisect
+import csv
+import json
+import math
+import os
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.env_handler import EnvHandler
+from config.exceptions_handler import ValidationError, RateLimitExceeded, ProviderUnavailable, ConfigurationError
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.market_data_providers")
+
+env_handler = EnvHandler()
+
+# Candle intervals in Twelve Data notation and their length in seconds
+INTERVAL_SECONDS = {
+    "1min": 60,
+    "5min": 300,
+    "15min": 900,
+    "30min": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1day": 86400,
+}
+
+
+def interval_seconds(interval: str) -> int:
+    """
+    Get the length of a candle interval.
+
+    Args:
+        interval: Interval such as 1min, 1h or 1day
+
+    Returns:
+        Interval length in seconds
+
+    Raises:
+        ValidationError: If the interval is not supported
+    """
+    seconds = INTERVAL_SECONDS.get(interval)
+    if seconds is None:
+        raise ValidationError(
+            f"Invalid interval '{interval}'. Must be one of: {', '.join(INTERVAL_SECONDS)}",
+            field="interval"
+        )
+    return seconds
+
+
+def build_quote(symbol: str, price: float, previous_close: float, timestamp: Optional[int], source: str) -> Dict:
+    """
+    Build price data with percentage change, in the shape all providers return.
+
+    Args:
+        symbol: Trading symbol
+        price: Latest price
+        previous_close: Previous close the change is measured against
+        timestamp: Unix timestamp of the price
+        source: Provider name
+
+    Returns:
+        Dictionary with price and percentage change
+    """
+    change = price - previous_close
+    change_percent = (change / previous_close * 100) if previous_close > 0 else 0.0
+    return {
+        "symbol": symbol,
+        "price": price,
+        "change": change,
+        "change_percent": round(change_percent, 2),
+        "previous_close": previous_close,
+        "timestamp": timestamp,
+        "source": source
+    }
+
+
+def aggregate_candles(rows: List[Dict], interval: str) -> List[Dict]:
+    """
+    Aggregate time-ordered ticks or finer candles into candles of an interval.
+
+    Args:
+        rows: Dictionaries with time (Unix seconds), open, high, low, close and volume
+        interval: Target candle interval
+
+    Returns:
+        List of candles ordered by time
+    """
+    step = interval_seconds(interval)
+    candles = []
+    for row in rows:
+        bucket = int(row["time"]) // step * step
+        if candles and candles[-1]["time"] == bucket:
+            candle = candles[-1]
+            candle["high"] = max(candle["high"], row["high"])
+            candle["low"] = min(candle["low"], row["low"])
+            candle["close"] = row["close"]
+            candle["volume"] += row.get("volume") or 0.0
+        else:
+            candles.append({
+                "time": bucket,
+                "open": row["open"],
+                "high": row["high"],
+                "low": row["low"],
+                "close": row["close"],
+                "volume": row.get("volume") or 0.0,
+            })
+    return candles
+
+
+class MarketDataProvider:
+    """
+    Source of quotes and candles.
+
+    Subclasses implement fetch_quotes and fetch_candles. Per-symbol failures
+    are returned as ValidationError values so one bad symbol doesn't fail a
+    batch; failures of a whole request are raised. Failures of the provider
+    itself (timeouts, unreachable, malformed responses) are raised as
+    ProviderUnavailable, which is what trips its circuit breaker.
+    """
+
+    name = "base"
+
+    # Largest number of symbols fetch_quotes accepts in one call
+    max_batch_size = 50
+
+    # Largest number of candles fetch_candles returns for one call
+    max_candles = 5000
+
+    # Whether requests spend upstream API credits (and go through the credit scheduler)
+    metered = False
+
+    def check_configured(self) -> None:
+        """
+        Check the provider can serve requests.
+
+        Raises:
+            ValidationError: If required configuration is missing
+        """
+
+    def fetch_quotes(
+        self,
+        symbols: List[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Union[Dict, ValidationError]]:
+        """
+        Fetch quotes for a batch of symbols.
+
+        Args:
+            symbols: Trading symbols (at most max_batch_size)
+            timeout: Optional request timeout in seconds
+
+        Returns:
+            Dictionary mapping each symbol to its quote or to a ValidationError
+
+        Raises:
+            ValidationError: If the whole request fails
+        """
+        raise NotImplementedError
+
+    def fetch_price(self, symbol: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Fetch the latest price of one symbol.
+
+        Args:
+            symbol: Trading symbol
+            timeout: Optional request timeout in seconds
+
+        Returns:
+            Dictionary with symbol, price, timestamp and source
+
+        Raises:
+            ValidationError: If the price can't be fetched
+        """
+        quote = self.fetch_quotes([symbol], timeout=timeout)[symbol]
+        if isinstance(quote, Exception):
+            raise quote
+        return {
+            "symbol": symbol,
+            "price": quote["price"],
+            "timestamp": quote.get("timestamp"),
+            "source": self.name
+        }
+
+    def fetch_candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Fetch OHLC candles of a symbol.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval (see INTERVAL_SECONDS)
+            start: Start of the range (inclusive)
+            end: End of the range (inclusive)
+            timeout: Optional request timeout in seconds
+
+        Returns:
+            List of dictionaries with time (Unix seconds), open, high, low,
+            close and volume, ordered by time
+
+        Raises:
+            ValidationError: If the candles can't be fetched
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Return the provider name and settings."""
+        return {'name': self.name}
+
+
+class TwelveDataProvider(MarketDataProvider):
+    """Quotes and candles from the Twelve Data REST API."""
+
+    name = "twelve_data"
+    max_batch_size = 50
+    metered = True
+
+    BASE_URL = "https://api.twelvedata.com"
+
+    # Upper bound on a single upstream request
+    REQUEST_TIMEOUT_SECONDS = 10
+
+    # Symbol mapping to Twelve Data notation
+    SYMBOL_MAPPING = {
+        "XAUUSD": "XAU/USD",  # Gold
+        "BTCUSD": "BTC/USD",   # Bitcoin
+        "EURUSD": "EUR/USD",   # Euro
+        "US30": "US30",        # Dow Jones
+    }
+
+    def __init__(self, api_key: Optional[str] = None, pool_size: int = 10, on_rate_limited=None):
+        """
+        Initialize the provider.
+
+        Args:
+            api_key: Twelve Data API key
+            pool_size: Number of keep-alive connections kept to the API
+            on_rate_limited: Optional callable invoked when the API reports the credit budget is spent
+        """
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.on_rate_limited = on_rate_limited
+        self._session = None
+        self._lock = threading.Lock()
+
+    def get_http_session(self) -> requests.Session:
+        """
+        Get the provider's HTTP session.
+
+        The session keeps up to pool_size connections alive, so upstream calls
+        reuse TCP/TLS connections instead of opening one each.
+
+        Returns:
+            requests.Session instance
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size,
+                        pool_block=True
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def check_configured(self) -> None:
+        if not self.api_key:
+            raise ValidationError("Twelve Data API key is not configured")
+
+    def _get(self, path: str, params: dict, timeout: Optional[float], description: str) -> dict:
+        """
+        Send a GET request to the API and decode the JSON response.
+
+        Raises:
+            RateLimitExceeded: If the API reports the credit budget is spent
+            ProviderUnavailable: If the request fails, the response isn't JSON
+                or its body reports a server-side error (code 500 or above)
+        """
+        self.check_configured()
+        try:
+            logger.debug(f"Fetching {description} from Twelve Data")
+            response = self.get_http_session().get(
+                f"{self.BASE_URL}/{path}",
+                params={**params, "apikey": self.api_key},
+                timeout=min(timeout or self.REQUEST_TIMEOUT_SECONDS, self.REQUEST_TIMEOUT_SECONDS)
+            )
+            self._check_rate_limit(response.status_code)
+            response.raise_for_status()
+            data = response.json()
+
+        except requests.exceptions.Timeout:
+            logger.error(f"Timeout fetching {description}")
+            raise ProviderUnavailable("Request timeout while fetching market data")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching {description}: {e}")
+            raise ProviderUnavailable(f"Failed to fetch market data: {str(e)}")
+        except ValueError as e:
+            logger.error(f"Error parsing response for {description}: {e}")
+            raise ProviderUnavailable("Invalid response from market data API")
+
+        if isinstance(data, dict):
+            self._check_rate_limit(data.get("code"))
+            # Server-side failures must count against the circuit breaker, unlike request errors
+            if isinstance(data.get("code"), int) and data["code"] >= 500:
+                logger.error(f"Twelve Data server error fetching {description}: {data.get('message')}")
+                raise ProviderUnavailable(f"Twelve Data API server error: {data.get('message', 'Unknown error')}")
+        return data
+
+    def _check_rate_limit(self, code) -> None:
+        """
+        Report a spent credit budget, which Twelve Data signals with HTTP 429 or code 429 in the JSON body.
+
+        Raises:
+            RateLimitExceeded: If code is 429
+        """
+        if code == 429:
+            if self.on_rate_limited is not None:
+                self.on_rate_limited()
+            raise RateLimitExceeded("Twelve Data API credit limit reached, try again shortly")
+
+    @staticmethod
+    def _is_error(data: dict) -> bool:
+        """Whether a Twelve Data payload is an error object."""
+        return data.get("status") == "error" or ("code" in data and data["code"] != 200)
+
+    def fetch_price(self, symbol: str, timeout: Optional[float] = None) -> Dict:
+        mapped_symbol = self.SYMBOL_MAPPING.get(symbol, symbol)
+        data = self._get("price", {"symbol": mapped_symbol}, timeout, f"price for {symbol} (mapped: {mapped_symbol})")
+
+        if "code" in data and data["code"] != 200:
+            error_msg = data.get("message", "Unknown error from Twelve Data API")
+            raise ValidationError(f"Twelve Data API error: {error_msg}")
+
+        try:
+            price = float(data.get("price", 0))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error parsing market data response for {symbol}: {e}")
+            raise ValidationError("Invalid response from market data API")
+
+        return {
+            "symbol": symbol,
+            "price": price,
+            "timestamp": data.get("timestamp"),
+            "source": self.name
+        }
+
+    def fetch_quotes(
+        self,
+        symbols: List[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Union[Dict, ValidationError]]:
+        mapped = {self.SYMBOL_MAPPING.get(symbol, symbol): symbol for symbol in symbols}
+        data = self._get("quote", {"symbol": ",".join(mapped)}, timeout, f"quotes for {symbols}")
+
+        # A single symbol comes back as one object, several as an object keyed by symbol
+        if len(mapped) == 1 or data.get("status") == "error":
+            if self._is_error(data):
+                error_msg = data.get("message", "Unknown error from Twelve Data API")
+                raise ValidationError(f"Twelve Data API error: {error_msg}")
+            data = {next(iter(mapped)): data}
+
+        results = {}
+        for mapped_symbol, symbol in mapped.items():
+            quote_data = data.get(mapped_symbol)
+            if not isinstance(quote_data, dict):
+                results[symbol] = ValidationError("Invalid response from market data API")
+            elif self._is_error(quote_data):
+                error_msg = quote_data.get("message", "Unknown error")
+                results[symbol] = ValidationError(f"Twelve Data API error: {error_msg}")
+            else:
+                try:
+                    current_price = float(quote_data["close"])
+                    previous_close = float(quote_data.get("previous_close") or current_price)
+                    results[symbol] = build_quote(
+                        symbol, current_price, previous_close, quote_data.get("timestamp"), self.name
+                    )
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Error parsing market data response for {symbol}: {e}")
+                    results[symbol] = ValidationError("Invalid response from market data API")
+        return results
+
+    def fetch_candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        interval_seconds(interval)
+        mapped_symbol = self.SYMBOL_MAPPING.get(symbol, symbol)
+        data = self._get(
+            "time_series",
+            {
+                "symbol": mapped_symbol,
+                "interval": interval,
+                "start_date": start.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "end_date": end.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "timezone": "UTC",
+                "order": "ASC",
+                "outputsize": self.max_candles,
+            },
+            timeout,
+            f"{interval} candles for {symbol}"
+        )
+
+        if self._is_error(data):
+            # Twelve Data reports an empty range as an error
+            if data.get("code") == 400 and "no data" in str(data.get("message", "")).lower():
+                return []
+            error_msg = data.get("message", "Unknown error from Twelve Data API")
+            raise ValidationError(f"Twelve Data API error: {error_msg}")
+
+        candles = []
+        try:
+            for value in data.get("values") or []:
+                # Daily candles carry a date only
+                raw = value["datetime"]
+                opened_at = datetime.strptime(raw, "%Y-%m-%d %H:%M:%S" if len(raw) > 10 else "%Y-%m-%d")
+                candles.append({
+                    "time": int(opened_at.replace(tzinfo=timezone.utc).timestamp()),
+                    "open": float(value["open"]),
+                    "high": float(value["high"]),
+                    "low": float(value["low"]),
+                    "close": float(value["close"]),
+                    "volume": float(value.get("volume") or 0.0),
+                })
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error parsing candles for {symbol}: {e}")
+            raise ValidationError("Invalid response from market data API")
+        return candles
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'configured': bool(self.api_key),
+            'pool_size': self.pool_size,
+        }
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Replays quotes or candles recorded in a CSV or NDJSON file.
+
+    Each record has symbol, timestamp (Unix seconds or ISO 8601) and either
+    price or open/high/low/close (plus optional volume). With speed > 0 the
+    recording is played back against the wall clock, speed times faster than
+    real time and looping at the end. With speed 0 every quote request
+    advances each requested symbol by exactly one record, so a benchmark run
+    sees the same price sequence every time.
+    """
+
+    name = "replay"
+    max_batch_size = 500
+
+    def __init__(self, path: str, speed: float = 1.0):
+        """
+        Load the recording.
+
+        Args:
+            path: CSV (.csv) or NDJSON file with the recorded records
+            speed: Playback speed multiplier, or 0 to step one record per request
+
+        Raises:
+            ConfigurationError: If the file can't be read or holds no records
+        """
+        self.path = path
+        self.speed = speed
+        self._series = self._load(path)
+        if not self._series:
+            raise ConfigurationError(f"Market data replay file {path} holds no records")
+        self._times = {symbol: [row["time"] for row in rows] for symbol, rows in self._series.items()}
+        self.recording_start = min(rows[0]["time"] for rows in self._series.values())
+        self.recording_end = max(rows[-1]["time"] for rows in self._series.values())
+        self._started = time.monotonic()
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(path: str) -> Dict[str, List[Dict]]:
+        """Read the recording into time-ordered rows per symbol."""
+        if not path or not os.path.exists(path):
+            raise ConfigurationError(f"Market data replay file {path} does not exist")
+
+        with open(path, newline="") as file:
+            if path.lower().endswith(".csv"):
+                records = list(csv.DictReader(file))
+            else:
+                records = [json.loads(line) for line in file if line.strip()]
+
+        series = {}
+        for number, record in enumerate(records, start=1):
+            try:
+                timestamp = record["timestamp"]
+                try:
+                    record_time = float(timestamp)
+                except (TypeError, ValueError):
+                    parsed = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+                    if parsed.tzinfo is None:
+                        parsed = parsed.replace(tzinfo=timezone.utc)
+                    record_time = parsed.timestamp()
+                close = float(record.get("close") or record["price"])
+                series.setdefault(str(record["symbol"]).upper(), []).append({
+                    "time": int(record_time),
+                    "open": float(record.get("open") or close),
+                    "high": float(record.get("high") or close),
+                    "low": float(record.get("low") or close),
+                    "close": close,
+                    "volume": float(record.get("volume") or 0.0),
+                })
+            except (KeyError, TypeError, ValueError) as e:
+                raise ConfigurationError(f"Invalid record {number} in market data replay file {path}: {e}")
+
+        for rows in series.values():
+            rows.sort(key=lambda row: row["time"])
+        return series
+
+    def _position(self) -> float:
+        """Recording time the wall clock currently maps to."""
+        length = max(1, self.recording_end - self.recording_start + 1)
+        elapsed = (time.monotonic() - self._started) * self.speed
+        return self.recording_start + elapsed % length
+
+    def fetch_quotes(
+        self,
+        symbols: List[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Union[Dict, ValidationError]]:
+        results = {}
+        position = self._position() if self.speed > 0 else None
+        with self._lock:
+            for symbol in symbols:
+                rows = self._series.get(symbol)
+                if not rows:
+                    results[symbol] = ValidationError(f"No recorded market data for {symbol}")
+                    continue
+                if position is None:
+                    index = self._cursors.get(symbol, -1) + 1
+                    if index >= len(rows):
+                        index = 0
+                    self._cursors[symbol] = index
+                else:
+                    index = max(0, bisect.bisect_right(self._times[symbol], position) - 1)
+                row = rows[index]
+                results[symbol] = build_quote(symbol, row["close"], rows[0]["open"], row["time"], self.name)
+        return results
+
+    def fetch_candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        rows = self._series.get(symbol)
+        if not rows:
+            return []
+        times = self._times[symbol]
+        low = bisect.bisect_left(times, int(start.timestamp()))
+        high = bisect.bisect_right(times, int(end.timestamp()))
+        return aggregate_candles(rows[low:high], interval)
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'path': self.path,
+            'speed': self.speed,
+            'symbols': sorted(self._series),
+            'records': sum(len(rows) for rows in self._series.values()),
+        }
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Generates prices as a seeded geometric random walk per symbol and UTC day.
+
+    Each day's walk opens at a price drawn around the symbol's base price and
+    advances one step every tick_seconds. Both depend only on the seed, the
+    symbol and the day, so quotes and candles are reproducible across
+    processes. Candles are available from the start of the previous UTC day.
+    Only the MAX_CACHED_PATHS most recently used day walks are kept; evicted
+    ones are regenerated identically.
+    """
+
+    name = "synthetic"
+    max_batch_size = 500
+
+    # Starting prices of the walk; other symbols start at DEFAULT_BASE_PRICE
+    BASE_PRICES = {
+        "XAUUSD": 2000.0,
+        "XAGUSD": 25.0,
+        "BTCUSD": 60000.0,
+        "ETHUSD": 3000.0,
+        "EURUSD": 1.08,
+        "GBPUSD": 1.27,
+        "GBPJPY": 190.0,
+        "USDJPY": 150.0,
+        "US30": 38000.0,
+        "NAS100": 17000.0,
+    }
+    DEFAULT_BASE_PRICE = 100.0
+
+    # Day walks kept in memory, each up to 86400 / tick_seconds prices
+    MAX_CACHED_PATHS = 32
+
+    def __init__(self, seed: int = 42, tick_seconds: float = 1.0, volatility: float = 0.0002):
+        """
+        Initialize the generator.
+
+        Args:
+            seed: Random seed shared by all symbols
+            tick_seconds: Time between two steps of the walk
+            volatility: Standard deviation of the log return of one step
+        """
+        self.seed = seed
+        self.tick_seconds = tick_seconds
+        self.volatility = volatility
+        # (symbol, UTC day number) -> (prices so far, generator of the next steps), least recently used first
+        self._paths = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _price_at(self, symbol: str, timestamp: float) -> float:
+        """Price of the walk at a time, extending the day's path as needed."""
+        day = int(timestamp // 86400)
+        step = max(0, int((timestamp - day * 86400) // self.tick_seconds))
+        with self._lock:
+            key = (symbol, day)
+            entry = self._paths.get(key)
+            if entry is None:
+                rng = random.Random(f"{self.seed}:{symbol}:{day}")
+                # The open is spread like a full day of steps around the base price
+                day_volatility = self.volatility * math.sqrt(86400 / self.tick_seconds)
+                open_price = self.BASE_PRICES.get(symbol, self.DEFAULT_BASE_PRICE) * math.exp(rng.gauss(0.0, day_volatility))
+                entry = self._paths[key] = (array("d", [open_price]), rng)
+                while len(self._paths) > self.MAX_CACHED_PATHS:
+                    self._paths.popitem(last=False)
+            else:
+                self._paths.move_to_end(key)
+            path, rng = entry
+            while len(path) <= step:
+                path.append(path[-1] * math.exp(rng.gauss(0.0, self.volatility)))
+            return path[step]
+
+    def fetch_quotes(
+        self,
+        symbols: List[str],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Union[Dict, ValidationError]]:
+        now = time.time()
+        previous_close_at = int(now) // 86400 * 86400 - self.tick_seconds
+        return {
+            symbol: build_quote(
+                symbol,
+                self._price_at(symbol, now),
+                self._price_at(symbol, previous_close_at),
+                int(now),
+                self.name
+            )
+            for symbol in symbols
+        }
+
+    def fetch_candles(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
+        now = time.time()
+        first = max(start.timestamp(), (int(now) // 86400 - 1) * 86400)
+        last = min(end.timestamp(), now)
+        ticks = []
+        # Ticks are aligned to the start of each UTC day
+        day_start = int(first) // 86400 * 86400
+        tick_time = day_start + math.ceil((first - day_start) / self.tick_seconds) * self.tick_seconds
+        while tick_time <= last:
+            if tick_time >= day_start + 86400:
+                day_start += 86400
+                tick_time = day_start
+                continue
+            price = self._price_at(symbol, tick_time)
+            ticks.append({"time": tick_time, "open": price, "high": price, "low": price, "close": price})
+            tick_time += self.tick_seconds
+        return aggregate_candles(ticks, interval)
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'seed': self.seed,
+            'tick_seconds': self.tick_seconds,
+            'volatility': self.volatility,
+            'symbols': sorted({symbol for symbol, _ in self._paths}),
+            'cached_paths': len(self._paths),
+        }
+
+
+def create_provider(name: Optional[str] = None, on_rate_limited=None) -> MarketDataProvider:
+    """
+    Create the market data provider selected by MARKET_DATA_PROVIDER.
+
+    Args:
+        name: Provider name overriding MARKET_DATA_PROVIDER (twelve_data, replay or synthetic)
+        on_rate_limited: Callable invoked when a metered provider reports its credit budget is spent
+
+    Returns:
+        MarketDataProvider instance
+
+    Raises:
+        ConfigurationError: If the provider name is unknown or its configuration is invalid
+    """
+    name = (name or env_handler.get_env("MARKET_DATA_PROVIDER") or TwelveDataProvider.name).lower()
+
+    if name == TwelveDataProvider.name:
+        return TwelveDataProvider(
+            api_key=env_handler.get_env("TWELVE_DATA_API_KEY", convert_type=False),
+            pool_size=env_handler.get_env("MARKET_DATA_POOL_SIZE"),
+            on_rate_limited=on_rate_limited
+        )
+    if name == ReplayProvider.name:
+        return ReplayProvider(
+            path=env_handler.get_env("MARKET_DATA_REPLAY_FILE"),
+            speed=env_handler.get_env("MARKET_DATA_REPLAY_SPEED")
+        )
+    if name == SyntheticProvider.name:
+        return SyntheticProvider(
+            seed=env_handler.get_env("MARKET_DATA_SYNTHETIC_SEED"),
+            tick_seconds=env_handler.get_env("MARKET_DATA_SYNTHETIC_TICK_SECONDS"),
+            volatility=env_handler.get_env("MARKET_DATA_SYNTHETIC_VOLATILITY")
+        )
+
+    raise ConfigurationError(
+        f"Unknown market data provider '{name}'. Must be one of: "
+        f"{TwelveDataProvider.name}, {ReplayProvider.name}, {SyntheticProvider.name}"
+    )
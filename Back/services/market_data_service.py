@@ -1,191 +1,454 @@
 """Market data service for fetching external market data."""
 
-import requests
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+from sqlalchemy.orm import Session
+
 from config.env_handler import EnvHandler
-from config.exceptions_handler import ValidationError
+from config.exceptions_handler import ValidationError, RateLimitExceeded, ProviderUnavailable
+from services.candle_service import CandleService
+from services.circuit_breaker import get_circuit_breaker
+from services.credit_scheduler import credit_scheduler, PRIORITY_INTERACTIVE
+from services.market_data_providers import MarketDataProvider, create_provider, interval_seconds
+from services.quote_cache import quote_cache
 from utils.logger_utils import get_module_logger
 
 logger = get_module_logger("services.market_data_service")
 
 env_handler = EnvHandler()
 
+# Candles closed less than this long ago may not be published yet; they are
+# only recorded as covered once the provider returns them
+CANDLE_SETTLE_SECONDS = 3600
+
 
 class MarketDataService:
-    """Service for fetching market data from external APIs."""
+    """Service for fetching market data from the configured provider."""
+    
+    # Provider selected by MARKET_DATA_PROVIDER and shared worker pool, created on first use
+    _provider = None
+    _executor = None
+    _init_lock = threading.Lock()
+    
+    @staticmethod
+    def get_provider() -> MarketDataProvider:
+        """
+        Get the market data provider selected by MARKET_DATA_PROVIDER.
+        
+        Returns:
+            MarketDataProvider instance
+        
+        Raises:
+            ConfigurationError: If the provider is unknown or misconfigured
+        """
+        if MarketDataService._provider is None:
+            with MarketDataService._init_lock:
+                if MarketDataService._provider is None:
+                    provider = create_provider(on_rate_limited=credit_scheduler.penalize)
+                    logger.info(f"Using market data provider: {provider.name}")
+                    MarketDataService._provider = provider
+        return MarketDataService._provider
     
-    # Symbol mapping for different APIs
-    SYMBOL_MAPPING = {
-        "XAUUSD": "XAU/USD",  # Gold
-        "BTCUSD": "BTC/USD",   # Bitcoin
-        "EURUSD": "EUR/USD",   # Euro
-        "US30": "US30",        # Dow Jones
+    @staticmethod
+    def set_provider(provider: Optional[MarketDataProvider]) -> None:
+        """
+        Replace the market data provider (None selects MARKET_DATA_PROVIDER again on next use).
+        
+        Args:
+            provider: MarketDataProvider instance
+        """
+        with MarketDataService._init_lock:
+            MarketDataService._provider = provider
+        quote_cache.clear()
+    
+    @staticmethod
+    def get_executor() -> ThreadPoolExecutor:
+        """Get the shared worker pool for concurrent upstream requests."""
+        if MarketDataService._executor is None:
+            with MarketDataService._init_lock:
+                if MarketDataService._executor is None:
+                    MarketDataService._executor = ThreadPoolExecutor(
+                        max_workers=env_handler.get_env("MARKET_DATA_MAX_WORKERS"),
+                        thread_name_prefix="market-data"
+                    )
+        return MarketDataService._executor
+    
+    # Symbol classes select the quote cache TTL (QUOTE_CACHE_TTLS)
+    SYMBOL_CLASSES = {
+        "XAUUSD": "metal",
+        "XAGUSD": "metal",
+        "BTCUSD": "crypto",
+        "ETHUSD": "crypto",
+        "US30": "index",
+        "NAS100": "index",
+        "SPX500": "index",
     }
     
     @staticmethod
-    def get_twelve_data_api_key() -> Optional[str]:
-        """Get Twelve Data API key from environment."""
-        return env_handler.get_env("TWELVE_DATA_API_KEY", convert_type=False)
+    def get_symbol_class(symbol: str) -> str:
+        """
+        Get the class of a symbol (crypto, forex, metal, index or default).
+        
+        Args:
+            symbol: Trading symbol
+        
+        Returns:
+            Symbol class name
+        """
+        symbol_class = MarketDataService.SYMBOL_CLASSES.get(symbol)
+        if symbol_class:
+            return symbol_class
+        # Six-letter symbols such as EURUSD or GBPJPY are currency pairs
+        if len(symbol) == 6 and symbol.isalpha():
+            return "forex"
+        return "default"
     
     @staticmethod
-    def fetch_price_twelve_data(symbol: str) -> Dict:
+    def get_quote(symbol: str) -> Dict:
         """
-        Fetch price data from Twelve Data API.
+        Get price data with percentage change, served from the quote cache.
+        
+        Concurrent requests for the same symbol share one upstream call, and an
+        expired quote is served while it is refreshed in the background. If
+        fetching fails, the last known quote is served flagged stale.
         
         Args:
-            symbol: Trading symbol (e.g., XAUUSD, BTCUSD, EURUSD, US30)
-            
+            symbol: Trading symbol
+        
         Returns:
-            Dictionary with price data
-            
+            Dictionary with price and percentage change
+        
         Raises:
-            ValidationError: If API key is missing or request fails
+            ValidationError: If fetching fails and no quote of the symbol is known
+        """
+        try:
+            return quote_cache.get(
+                symbol,
+                lambda: MarketDataService.fetch_price_with_change(symbol),
+                symbol_class=MarketDataService.get_symbol_class(symbol)
+            )
+        except ValidationError:
+            stale_quote = MarketDataService.get_last_known_quote(symbol)
+            if stale_quote is None:
+                raise
+            return stale_quote
+    
+    @staticmethod
+    def get_last_known_quote(symbol: str) -> Optional[Dict]:
+        """
+        Get the last quote of a symbol seen by the quote cache or the poller, flagged stale.
+        
+        Args:
+            symbol: Trading symbol
+        
+        Returns:
+            Quote with stale set to True, or None if the symbol was never quoted
+        """
+        from services.market_data_poller import quote_store
+        
+        quote = quote_cache.peek(symbol) or quote_store.get_many([symbol]).get(symbol)
+        if quote is None:
+            return None
+        return {**quote, "stale": True}
+    
+    @staticmethod
+    def _call_provider(
+        provider: MarketDataProvider,
+        credits: int,
+        priority: int,
+        deadline: float,
+        call: Callable[[], Any]
+    ) -> Any:
         """
-        api_key = MarketDataService.get_twelve_data_api_key()
-        if not api_key:
-            raise ValidationError("Twelve Data API key is not configured")
+        Call the provider through its circuit breaker, spending credits when it is metered.
+        
+        Only ProviderUnavailable (timeouts, unreachable provider, malformed
+        responses) and calls slower than the latency SLO count against the
+        breaker; errors about the request itself, such as an unknown symbol,
+        don't.
+        
+        Args:
+            provider: Market data provider
+            credits: Credits the call costs on a metered provider
+            priority: Credit scheduler priority class of the call
+            deadline: time.monotonic() value by which credits must be granted
+            call: Callable performing the provider call
         
-        # Map symbol to Twelve Data format
-        mapped_symbol = MarketDataService.SYMBOL_MAPPING.get(symbol, symbol)
+        Returns:
+            Result of call
         
+        Raises:
+            ProviderUnavailable: If the breaker is open or the provider failed
+            RateLimitExceeded: If the credits can't be granted before the deadline
+            ValidationError: If the provider rejected the request
+        """
+        breaker = get_circuit_breaker(provider.name)
+        if not breaker.allow():
+            raise ProviderUnavailable(f"Market data provider {provider.name} is unavailable, try again shortly")
+        
+        started = time.monotonic()
         try:
-            url = "https://api.twelvedata.com/price"
-            params = {
-                "symbol": mapped_symbol,
-                "apikey": api_key
-            }
-            
-            logger.debug(f"Fetching price for {symbol} (mapped: {mapped_symbol}) from Twelve Data")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if "code" in data and data["code"] != 200:
-                error_msg = data.get("message", "Unknown error from Twelve Data API")
-                raise ValidationError(f"Twelve Data API error: {error_msg}")
-            
-            price = float(data.get("price", 0))
-            
-            return {
-                "symbol": symbol,
-                "price": price,
-                "timestamp": data.get("timestamp"),
-                "source": "twelve_data"
-            }
-            
-        except requests.exceptions.Timeout:
-            logger.error(f"Timeout fetching market data for {symbol}")
-            raise ValidationError("Request timeout while fetching market data")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching market data for {symbol}: {e}")
-            raise ValidationError(f"Failed to fetch market data: {str(e)}")
-        except (ValueError, KeyError) as e:
-            logger.error(f"Error parsing market data response for {symbol}: {e}")
-            raise ValidationError("Invalid response from market data API")
+            if provider.metered:
+                credit_scheduler.acquire(credits, priority, deadline=deadline)
+                started = time.monotonic()
+            result = call()
+        except RateLimitExceeded:
+            breaker.release()
+            raise
+        except ProviderUnavailable as e:
+            breaker.record_failure(str(e))
+            raise
+        except ValidationError:
+            breaker.record_success(time.monotonic() - started)
+            raise
+        except Exception as e:
+            breaker.record_failure(str(e))
+            raise
+        
+        breaker.record_success(time.monotonic() - started)
+        return result
+    
+    @staticmethod
+    def fetch_price(symbol: str, priority: int = PRIORITY_INTERACTIVE) -> Dict:
+        """
+        Fetch the latest price of a symbol.
+        
+        Args:
+            symbol: Trading symbol (e.g., XAUUSD, BTCUSD, EURUSD, US30)
+            priority: Credit scheduler priority class of the request
+        
+        Returns:
+            Dictionary with price data
+        
+        Raises:
+            ValidationError: If the provider isn't configured or the request fails
+        """
+        provider = MarketDataService.get_provider()
+        provider.check_configured()
+        deadline = time.monotonic() + env_handler.get_env("MARKET_DATA_DEADLINE_SECONDS")
+        return MarketDataService._call_provider(
+            provider, 1, priority, deadline,
+            lambda: provider.fetch_price(symbol, timeout=max(0.1, deadline - time.monotonic()))
+        )
     
     @staticmethod
     def fetch_price_with_change(symbol: str) -> Dict:
         """
         Fetch price data with percentage change.
-        Uses Twelve Data for price and calculates change from previous close.
+        Uses a single quote request, which carries both the latest price and
+        the previous close.
         
         Args:
             symbol: Trading symbol
-            
+        
         Returns:
             Dictionary with price and percentage change
+        
+        Raises:
+            ValidationError: If the provider isn't configured or the request fails
+        """
+        quote = MarketDataService.fetch_quotes([symbol])[symbol]
+        if isinstance(quote, Exception):
+            raise quote
+        return quote
+    
+    @staticmethod
+    def fetch_quotes(
+        symbols: List[str],
+        deadline_seconds: Optional[float] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict[str, Union[Dict, ValidationError]]:
         """
-        api_key = MarketDataService.get_twelve_data_api_key()
-        if not api_key:
-            raise ValidationError("Twelve Data API key is not configured")
+        Fetch quotes for several symbols with one batch request per chunk of symbols.
         
-        mapped_symbol = MarketDataService.SYMBOL_MAPPING.get(symbol, symbol)
+        Chunks are requested concurrently on the shared worker pool. For a
+        metered provider each chunk first acquires its credits (one per symbol)
+        from the credit scheduler. Symbols whose chunk hasn't completed when
+        the deadline passes get a timeout or rate limit error, so callers
+        always get partial results in time.
         
-        try:
-            # Fetch real-time price
-            price_url = "https://api.twelvedata.com/price"
-            price_params = {
-                "symbol": mapped_symbol,
-                "apikey": api_key
-            }
-            
-            price_response = requests.get(price_url, params=price_params, timeout=10)
-            price_response.raise_for_status()
-            price_data = price_response.json()
-            
-            if "code" in price_data and price_data["code"] != 200:
-                error_msg = price_data.get("message", "Unknown error")
-                raise ValidationError(f"Twelve Data API error: {error_msg}")
-            
-            current_price = float(price_data.get("price", 0))
-            
-            # Fetch quote data for previous close and change
-            quote_url = "https://api.twelvedata.com/quote"
-            quote_params = {
-                "symbol": mapped_symbol,
-                "apikey": api_key
-            }
-            
-            quote_response = requests.get(quote_url, params=quote_params, timeout=10)
-            quote_response.raise_for_status()
-            quote_data = quote_response.json()
-            
-            if "code" in quote_data and quote_data["code"] != 200:
-                # If quote fails, return price without change
-                logger.warning(f"Quote data unavailable for {symbol}, returning price only")
-                return {
-                    "symbol": symbol,
-                    "price": current_price,
-                    "change_percent": 0.0,
-                    "timestamp": price_data.get("timestamp"),
-                    "source": "twelve_data"
-                }
-            
-            # Calculate percentage change
-            previous_close = float(quote_data.get("previous_close", current_price))
-            change = current_price - previous_close
-            change_percent = (change / previous_close * 100) if previous_close > 0 else 0.0
-            
-            return {
-                "symbol": symbol,
-                "price": current_price,
-                "change": change,
-                "change_percent": round(change_percent, 2),
-                "previous_close": previous_close,
-                "timestamp": price_data.get("timestamp"),
-                "source": "twelve_data"
-            }
-            
-        except requests.exceptions.Timeout:
-            logger.error(f"Timeout fetching market data for {symbol}")
-            raise ValidationError("Request timeout while fetching market data")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching market data for {symbol}: {e}")
-            raise ValidationError(f"Failed to fetch market data: {str(e)}")
-        except (ValueError, KeyError) as e:
-            logger.error(f"Error parsing market data response for {symbol}: {e}")
-            raise ValidationError("Invalid response from market data API")
+        Args:
+            symbols: Trading symbols
+            deadline_seconds: Overall time limit (defaults to MARKET_DATA_DEADLINE_SECONDS)
+            priority: Credit scheduler priority class of the request
+        
+        Returns:
+            Dictionary mapping each symbol to its quote, or to the ValidationError
+            explaining why it couldn't be fetched
+        
+        Raises:
+            ValidationError: If the provider isn't configured
+        """
+        provider = MarketDataService.get_provider()
+        provider.check_configured()
+        
+        if deadline_seconds is None:
+            deadline_seconds = env_handler.get_env("MARKET_DATA_DEADLINE_SECONDS")
+        deadline = time.monotonic() + deadline_seconds
+        
+        symbols = list(dict.fromkeys(symbols))
+        chunk_size = provider.max_batch_size
+        if provider.metered:
+            # A chunk can't cost more credits than the whole per-minute budget
+            chunk_size = min(chunk_size, credit_scheduler.capacity)
+        chunks = [symbols[start:start + chunk_size] for start in range(0, len(symbols), chunk_size)]
+        
+        def fetch_chunk(chunk: List[str]) -> Dict[str, Union[Dict, ValidationError]]:
+            try:
+                return MarketDataService._call_provider(
+                    provider, len(chunk), priority, deadline,
+                    lambda: provider.fetch_quotes(chunk, timeout=max(0.1, deadline - time.monotonic()))
+                )
+            except ValidationError as e:
+                return {symbol: e for symbol in chunk}
+        
+        if len(chunks) <= 1:
+            return fetch_chunk(chunks[0]) if chunks else {}
+        
+        executor = MarketDataService.get_executor()
+        futures = {executor.submit(fetch_chunk, chunk): chunk for chunk in chunks}
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        
+        results = {}
+        for future in done:
+            results.update(future.result())
+        for future in not_done:
+            future.cancel()
+            chunk = futures[future]
+            logger.warning(f"Deadline exceeded fetching quotes for {chunk}")
+            results.update({
+                symbol: ProviderUnavailable("Request timeout while fetching market data")
+                for symbol in chunk
+            })
+        return results
+    
+    @staticmethod
+    def fetch_candles(
+        symbol: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> List[Dict]:
+        """
+        Fetch OHLC candles of a symbol from the provider.
+        
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval (e.g. 1min, 1h, 1day)
+            start: Start of the range (inclusive)
+            end: End of the range (inclusive)
+            priority: Credit scheduler priority class of the request
+        
+        Returns:
+            List of dictionaries with time (Unix seconds), open, high, low,
+            close and volume, ordered by time
+        
+        Raises:
+            ValidationError: If the provider isn't configured or the request fails
+        """
+        provider = MarketDataService.get_provider()
+        provider.check_configured()
+        interval_seconds(interval)
+        deadline = time.monotonic() + env_handler.get_env("MARKET_DATA_DEADLINE_SECONDS")
+        return MarketDataService._call_provider(
+            provider, 1, priority, deadline,
+            lambda: provider.fetch_candles(symbol, interval, start, end, timeout=max(0.1, deadline - time.monotonic()))
+        )
+    
+    @staticmethod
+    def get_candles(
+        db: Session,
+        symbol: str,
+        interval: str,
+        start: datetime,
+        end: datetime,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get OHLC candles of a range from the local candle store, fetching only what it lacks.
+        
+        Only closed candles are stored, so the range is cut off at the last
+        candle that closed before now. Missing parts are fetched from the
+        provider in requests of at most max_candles candles each. Recent
+        candles the provider didn't return are asked for again on the next
+        call (see CANDLE_SETTLE_SECONDS).
+        
+        Args:
+            db: Database session
+            symbol: Trading symbol
+            interval: Candle interval (e.g. 1min, 1h, 1day)
+            start: Start of the range (inclusive)
+            end: End of the range (inclusive)
+            priority: Credit scheduler priority class of provider requests
+        
+        Returns:
+            Dictionary with time (int64 Unix seconds of candle open) and open,
+            high, low, close and volume (float64) arrays, ordered by time
+        
+        Raises:
+            ValidationError: If the interval is invalid or fetching a missing range fails
+            DatabaseError: If storing fetched candles fails
+        """
+        step = interval_seconds(interval)
+        last_closed = int(time.time()) // step * step - step
+        first = int(start.timestamp()) // step * step
+        last = min(int(end.timestamp()) // step * step, last_closed)
+        settled_before = (int(time.time()) - CANDLE_SETTLE_SECONDS) // step * step
+        
+        missing = CandleService.get_missing_ranges(db, symbol, interval, first, last, step)
+        if missing:
+            max_span = MarketDataService.get_provider().max_candles * step
+            for range_start, range_end in missing:
+                for chunk_start in range(range_start, range_end + 1, max_span):
+                    chunk_end = min(chunk_start + max_span - step, range_end)
+                    logger.debug(f"Fetching {interval} candles for {symbol} from {chunk_start} to {chunk_end}")
+                    candles = MarketDataService.fetch_candles(
+                        symbol,
+                        interval,
+                        datetime.fromtimestamp(chunk_start, timezone.utc),
+                        datetime.fromtimestamp(chunk_end, timezone.utc),
+                        priority=priority
+                    )
+                    CandleService.store_candles(db, symbol, interval, candles, chunk_start, chunk_end, step, settled_before)
+        
+        return CandleService.read_candles(db, symbol, interval, first, last)
     
     @staticmethod
     def fetch_multiple_prices(symbols: list) -> Dict[str, Dict]:
         """
         Fetch price data for multiple symbols.
         
+        Cached quotes are served from the quote cache; all missing symbols are
+        fetched together in batch requests. Symbols that fail to fetch get
+        their last known quote flagged stale, if there is one.
+        
         Args:
             symbols: List of trading symbols
-            
+        
         Returns:
             Dictionary mapping symbols to their price data
         """
+        quotes = quote_cache.get_many(
+            symbols,
+            MarketDataService.fetch_quotes,
+            MarketDataService.get_symbol_class
+        )
+        
         results = {}
         for symbol in symbols:
-            try:
-                results[symbol] = MarketDataService.fetch_price_with_change(symbol)
-            except Exception as e:
-                logger.error(f"Failed to fetch data for {symbol}: {e}")
-                results[symbol] = {
+            quote = quotes[symbol]
+            if isinstance(quote, Exception):
+                logger.error(f"Failed to fetch data for {symbol}: {quote}")
+                results[symbol] = MarketDataService.get_last_known_quote(symbol) or {
                     "symbol": symbol,
-                    "error": str(e)
+                    "error": str(quote)
                 }
+            else:
+                results[symbol] = quote
         return results
-
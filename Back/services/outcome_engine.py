@@ -0,0 +1,531 @@
+"""Vectorised evaluation of open signals' take-profit and stop-loss levels against prices."""
+
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.signal import Signal
+from services.level_index import LONG_SIGNAL_TYPES, level_index
+from services.channel_stats_service import ChannelStatsService, counters_delta, stats_counters
+from services.credit_scheduler import PRIORITY_OUTCOME
+from config.env_handler import EnvHandler
+from config.exceptions_handler import DatabaseError
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.outcome_engine")
+
+env_handler = EnvHandler()
+
+# Arbitrary key of the advisory lock that lets one process evaluate per cycle
+EVALUATOR_LOCK_KEY = 7302
+
+_PENDING = (Signal.closed_at.is_(None), or_(Signal.performance_outcome.is_(None), Signal.performance_outcome == "PENDING"))
+
+
+class SignalLevels:
+    """
+    Trigger levels of a set of signals of one symbol as NumPy arrays.
+
+    Take profits are stored in an (n, k) matrix padded with NaN, k being the
+    largest number of take profits of any signal; a missing stop loss is NaN.
+    The original JSON values are kept to write hits back.
+    """
+
+    __slots__ = (
+        "ids", "channel_ids", "is_long", "entry", "stop_loss", "take_profits", "tp_hit",
+        "created_at", "stop_loss_json", "take_profits_json",
+    )
+
+    def __init__(self, rows: List) -> None:
+        """
+        Build the arrays.
+
+        Args:
+            rows: Rows with id, channel_id, signal_type, entry_price, stop_loss, take_profits and created_at
+        """
+        count = len(rows)
+        width = max([len(row.take_profits or []) for row in rows] + [1])
+
+        self.ids = [row.id for row in rows]
+        self.channel_ids = [row.channel_id for row in rows]
+        self.is_long = np.fromiter((row.signal_type in LONG_SIGNAL_TYPES for row in rows), dtype=bool, count=count)
+        self.entry = np.fromiter((float(row.entry_price) for row in rows), dtype=np.float64, count=count)
+        self.stop_loss = np.full(count, np.nan)
+        self.take_profits = np.full((count, width), np.nan)
+        self.tp_hit = np.zeros((count, width), dtype=bool)
+        self.created_at = np.fromiter(
+            (row.created_at.timestamp() if row.created_at else 0.0 for row in rows),
+            dtype=np.float64,
+            count=count
+        )
+        self.stop_loss_json = [row.stop_loss for row in rows]
+        self.take_profits_json = [row.take_profits or [] for row in rows]
+
+        for index, row in enumerate(rows):
+            if row.stop_loss and row.stop_loss.get("price") is not None:
+                self.stop_loss[index] = float(row.stop_loss["price"])
+            for level, take_profit in enumerate(row.take_profits or []):
+                if take_profit.get("price") is not None:
+                    self.take_profits[index, level] = float(take_profit["price"])
+                    self.tp_hit[index, level] = bool(take_profit.get("hit"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def evaluate_levels(
+    is_long: np.ndarray,
+    entry: np.ndarray,
+    stop_loss: np.ndarray,
+    take_profits: np.ndarray,
+    tp_hit: np.ndarray,
+    low: np.ndarray,
+    high: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Check which levels a price range reached, for all signals at once.
+
+    A signal closes at its stop loss, or at its farthest take profit once
+    every take profit has been reached. When one range reaches both a stop
+    loss and a take profit, the order within the range is unknown and the
+    stop loss is assumed to come first.
+
+    Args:
+        is_long: (n,) True for BUY/LONG signals
+        entry: (n,) entry prices
+        stop_loss: (n,) stop loss prices, NaN if none
+        take_profits: (n, k) take profit prices, NaN padded
+        tp_hit: (n, k) take profits already hit
+        low: (n,) lowest price each signal saw in the range
+        high: (n,) highest price each signal saw in the range
+
+    Returns:
+        Dictionary of arrays: sl_hit (n,), new_tp_hit (n, k), closed (n,),
+        close_price (n,), pnl (n,) and pnl_percent (n,), the last three NaN
+        for signals that stay open
+    """
+    has_tp = ~np.isnan(take_profits)
+    with np.errstate(invalid="ignore"):
+        sl_hit = np.where(is_long, low <= stop_loss, high >= stop_loss)
+        tp_reached = np.where(is_long[:, None], high[:, None] >= take_profits, low[:, None] <= take_profits)
+
+    new_tp_hit = tp_reached & ~tp_hit & ~sl_hit[:, None]
+    all_tp_hit = has_tp.any(axis=1) & ((tp_hit | new_tp_hit) | ~has_tp).all(axis=1)
+    closed_on_tp = all_tp_hit & ~sl_hit
+
+    final_tp = np.where(
+        is_long,
+        np.where(has_tp, take_profits, -np.inf).max(axis=1),
+        np.where(has_tp, take_profits, np.inf).min(axis=1)
+    )
+    close_price = np.where(sl_hit, stop_loss, np.where(closed_on_tp, final_tp, np.nan))
+    pnl = np.where(is_long, close_price - entry, entry - close_price)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_percent = np.where(entry > 0, pnl / entry * 100, np.nan)
+
+    return {
+        "sl_hit": sl_hit,
+        "new_tp_hit": new_tp_hit,
+        "closed": sl_hit | closed_on_tp,
+        "close_price": close_price,
+        "pnl": pnl,
+        "pnl_percent": pnl_percent,
+    }
+
+
+def build_updates(levels: SignalLevels, result: Dict[str, np.ndarray], hit_at: datetime) -> List[dict]:
+    """
+    Turn an evaluation result into Signal column updates for the signals that changed.
+
+    Args:
+        levels: Evaluated signals
+        result: Value returned by evaluate_levels
+        hit_at: Time the levels were hit
+
+    Returns:
+        List of dictionaries with id and changed columns; closed signals carry
+        every outcome column, others only take_profits
+    """
+    new_tp_hit = result["new_tp_hit"]
+    closed = result["closed"]
+    changed = np.flatnonzero(new_tp_hit.any(axis=1) | closed)
+    hit_at_text = hit_at.isoformat()
+
+    updates = []
+    for index in changed:
+        take_profits = [dict(take_profit) for take_profit in levels.take_profits_json[index]]
+        for level in np.flatnonzero(new_tp_hit[index]):
+            take_profits[level]["hit"] = True
+            take_profits[level]["hit_at"] = hit_at_text
+        values = {"id": levels.ids[index], "take_profits": take_profits}
+
+        if closed[index]:
+            stop_loss = levels.stop_loss_json[index]
+            if result["sl_hit"][index]:
+                stop_loss = {**stop_loss, "hit": True, "hit_at": hit_at_text}
+            values.update({
+                "stop_loss": stop_loss,
+                "performance_outcome": "WIN" if result["pnl"][index] > 0 else "LOSS",
+                "close_price": round(float(result["close_price"][index]), 8),
+                "pnl": round(float(result["pnl"][index]), 8),
+                "pnl_percent": round(float(result["pnl_percent"][index]), 2),
+                # closed_at has no time zone; it is stored as UTC
+                "closed_at": hit_at.replace(tzinfo=None),
+            })
+        updates.append(values)
+    return updates
+
+
+def load_pending_levels(db: Session, signal_ids: Iterable) -> Dict[str, SignalLevels]:
+    """
+    Load and lock the levels of some signals that are still pending.
+
+    The rows stay locked until the caller's transaction ends, so they can't
+    be closed or edited elsewhere before the evaluation is written. Rows
+    locked by another transaction are skipped.
+
+    Args:
+        db: Database session
+        signal_ids: Signal UUIDs
+
+    Returns:
+        Dictionary mapping symbols to the levels of their pending signals
+    """
+    rows = db.execute(
+        select(
+            Signal.id,
+            Signal.channel_id,
+            Signal.symbol,
+            Signal.signal_type,
+            Signal.entry_price,
+            Signal.stop_loss,
+            Signal.take_profits,
+            Signal.created_at,
+        )
+        .where(Signal.id.in_(list(signal_ids)), *_PENDING)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    by_symbol = {}
+    for row in rows:
+        by_symbol.setdefault(row.symbol, []).append(row)
+    return {symbol: SignalLevels(symbol_rows) for symbol, symbol_rows in by_symbol.items()}
+
+
+def still_pending(db: Session, signal_ids: Iterable) -> set:
+    """Get which of some signals are still pending, without locking them."""
+    return set(db.execute(select(Signal.id).where(Signal.id.in_(list(signal_ids)), *_PENDING)).scalars())
+
+
+def apply_updates(db: Session, updates: List[dict], stats_deltas: Optional[List] = None) -> None:
+    """
+    Write signal updates with bulk UPDATE statements by primary key.
+
+    The rows must have been locked with load_pending_levels in the same
+    transaction, so they are still pending and stats deltas apply once.
+
+    Args:
+        db: Database session
+        updates: Values returned by build_updates
+        stats_deltas: Channel stats deltas of the updates, written in the same transaction
+
+    Raises:
+        DatabaseError: If the update fails
+    """
+    # Rows with the same columns are sent as one executemany batch
+    progressed = [values for values in updates if "performance_outcome" not in values]
+    closed = [values for values in updates if "performance_outcome" in values]
+    try:
+        if progressed:
+            db.execute(update(Signal), progressed)
+        if closed:
+            db.execute(update(Signal), closed)
+        if stats_deltas:
+            ChannelStatsService.apply_deltas(db, stats_deltas)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise DatabaseError(f"Failed to update signal outcomes: {e}") from e
+
+
+class OutcomeEvaluator:
+    """
+    Periodically evaluates pending signals against the latest quotes.
+
+    Each cycle takes the price of every symbol with pending signals from the
+    poller's quote store, or fetches it from the provider while the poller
+    isn't running, and treats the move since the previous cycle as a
+    continuous range, so levels crossed between two cycles are not missed.
+    The level index narrows each move down to the signals it crossed; only
+    those are loaded and evaluated. Signals created after the previous cycle
+    only see the latest price. When several processes run an evaluator, an
+    advisory lock lets only one of them evaluate each cycle.
+    """
+
+    def __init__(self, interval_seconds: float = 5.0, rebuild_seconds: float = 300.0):
+        """
+        Initialize the evaluator. Call start() to begin evaluating.
+
+        Args:
+            interval_seconds: Time between cycles
+            rebuild_seconds: Time between full rebuilds of the level index,
+                which pick up signals changed by other processes
+        """
+        self.interval_seconds = interval_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._last_prices = {}
+        self._last_rebuild = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.cycles = 0
+        self.skipped_cycles = 0
+        self.failed_cycles = 0
+        self.evaluated = 0
+        self.tp_hits = 0
+        self.closed = 0
+        self.last_cycle_at = None
+        self.last_cycle_seconds = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the evaluation thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def evaluate(self, db: Session, prices: Dict[str, float], now: Optional[datetime] = None) -> int:
+        """
+        Evaluate pending signals of the given symbols against new prices and store the changes.
+
+        The candidate signals stay locked until the changes are committed,
+        or the transaction is rolled back when there are none.
+
+        Args:
+            db: Database session
+            prices: Dictionary mapping symbols to their latest price
+            now: Evaluation time (defaults to the current time)
+
+        Returns:
+            Number of signals closed
+
+        Raises:
+            DatabaseError: If storing the changes fails
+        """
+        if not prices:
+            return 0
+
+        now = now or datetime.now(timezone.utc)
+        now_ts = now.timestamp()
+        with self._lock:
+            previous = {symbol: self._last_prices.get(symbol) for symbol in prices}
+
+        candidates = {}
+        for symbol, price in prices.items():
+            last_price, _ = previous[symbol] or (price, now_ts)
+            candidates[symbol] = level_index.query(symbol, last_price, price)
+        pending = load_pending_levels(
+            db, [signal_id for signal_ids in candidates.values() for signal_id in signal_ids]
+        ) if any(candidates.values()) else {}
+
+        updates = []
+        stats_deltas = []
+        evaluated = 0
+        tp_hits = 0
+        closed = 0
+        index_changes = []
+        for symbol, levels in pending.items():
+            price = prices[symbol]
+            last_price, last_at = previous[symbol] or (price, now_ts)
+
+            count = len(levels)
+            low = np.full(count, min(last_price, price))
+            high = np.full(count, max(last_price, price))
+            fresh = levels.created_at >= last_at
+            low[fresh] = price
+            high[fresh] = price
+
+            result = evaluate_levels(
+                levels.is_long, levels.entry, levels.stop_loss,
+                levels.take_profits, levels.tp_hit, low, high
+            )
+            symbol_updates = build_updates(levels, result, now)
+            updates.extend(symbol_updates)
+            channel_ids = dict(zip(levels.ids, levels.channel_ids))
+            stats_deltas.extend(
+                (channel_ids[values["id"]], symbol, counters_delta(
+                    stats_counters(values["performance_outcome"], values["take_profits"], values["pnl_percent"]),
+                    stats_counters("PENDING", values["take_profits"])
+                ))
+                for values in symbol_updates
+                if "performance_outcome" in values
+            )
+            evaluated += count
+            tp_hits += int(result["new_tp_hit"].sum())
+            closed += int(result["closed"].sum())
+
+            closed_ids = [levels.ids[index] for index in np.flatnonzero(result["closed"])]
+            hit_levels = [
+                (levels.ids[index], int(level))
+                for index, level in zip(*np.nonzero(result["new_tp_hit"]))
+                if not result["closed"][index]
+            ]
+            index_changes.append((symbol, closed_ids, hit_levels))
+
+        # Candidates missing from the pending rows were closed or deleted elsewhere, or are
+        # locked by another transaction and evaluated next cycle
+        loaded = {signal_id for levels in pending.values() for signal_id in levels.ids}
+        missing = [
+            (symbol, signal_id)
+            for symbol, signal_ids in candidates.items()
+            for signal_id in signal_ids
+            if signal_id not in loaded
+        ]
+        if missing:
+            locked = still_pending(db, [signal_id for _, signal_id in missing])
+            gone = {}
+            for symbol, signal_id in missing:
+                if signal_id not in locked:
+                    gone.setdefault(symbol, []).append(signal_id)
+            index_changes.extend((symbol, signal_ids, []) for symbol, signal_ids in gone.items())
+
+        if updates:
+            apply_updates(db, updates, stats_deltas)
+        else:
+            # Releases the row locks
+            db.rollback()
+
+        for symbol, removed_ids, hit_levels in index_changes:
+            level_index.remove_signals(symbol, removed_ids)
+            level_index.remove_levels(symbol, hit_levels)
+
+        self.remember_prices(prices, now_ts)
+        with self._lock:
+            self.evaluated += evaluated
+            self.tp_hits += tp_hits
+            self.closed += closed
+
+        if closed:
+            logger.info(f"Closed {closed} signal(s) after evaluating {evaluated} pending signal(s)")
+        return closed
+
+    def remember_prices(self, prices: Dict[str, float], at: Optional[float] = None) -> None:
+        """
+        Record prices as the start of the next cycle's ranges.
+
+        Args:
+            prices: Dictionary mapping symbols to their latest price
+            at: Unix time of the prices (defaults to now)
+        """
+        at = time.time() if at is None else at
+        with self._lock:
+            for symbol, price in prices.items():
+                self._last_prices[symbol] = (price, at)
+
+    def run_once(self) -> int:
+        """
+        Run one cycle against the latest quotes of symbols with pending signals.
+
+        Returns:
+            Number of signals closed
+        """
+        from services.market_data_poller import market_data_poller, quote_store
+        from services.market_data_service import MarketDataService
+        from utils.database_utils import get_db_handler
+
+        started = time.monotonic()
+        db = get_db_handler().get_session_factory()()
+        try:
+            if self._last_rebuild is None or started - self._last_rebuild >= self.rebuild_seconds:
+                level_index.rebuild(db)
+                self._last_rebuild = started
+
+            symbols = level_index.symbols()
+            if market_data_poller.running:
+                quotes = quote_store.get_many(symbols)
+            elif symbols:
+                # Don't keep the rebuild's transaction open across provider calls
+                db.rollback()
+                quotes = MarketDataService.fetch_quotes(symbols, priority=PRIORITY_OUTCOME)
+            else:
+                quotes = {}
+            prices = {
+                symbol: float(quote["price"])
+                for symbol, quote in quotes.items()
+                if not isinstance(quote, Exception) and quote.get("price") and not quote.get("stale")
+            }
+            # Held until the cycle's transaction ends; another process is evaluating otherwise
+            if db.execute(select(func.pg_try_advisory_xact_lock(EVALUATOR_LOCK_KEY))).scalar():
+                closed = self.evaluate(db, prices)
+            else:
+                db.rollback()
+                self.remember_prices(prices)
+                self.skipped_cycles += 1
+                closed = 0
+        finally:
+            db.close()
+
+        self.cycles += 1
+        self.last_cycle_at = time.time()
+        self.last_cycle_seconds = round(time.monotonic() - started, 3)
+        return closed
+
+    def start(self) -> None:
+        """Start the evaluation thread if it isn't running."""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="outcome-evaluator", daemon=True)
+            self._thread.start()
+        logger.info(f"Outcome evaluator started (every {self.interval_seconds}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the evaluation thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to exit
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Evaluate until stopped."""
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                self.failed_cycles += 1
+                logger.error(f"Outcome evaluation failed: {e}", exc_info=True)
+            self._stopping.wait(max(0.0, self.interval_seconds - (time.monotonic() - started)))
+
+    def stats(self) -> dict:
+        """Return evaluator state and counters."""
+        return {
+            'running': self.running,
+            'interval_seconds': self.interval_seconds,
+            'rebuild_seconds': self.rebuild_seconds,
+            'cycles': self.cycles,
+            'skipped_cycles': self.skipped_cycles,
+            'failed_cycles': self.failed_cycles,
+            'evaluated': self.evaluated,
+            'tp_hits': self.tp_hits,
+            'closed': self.closed,
+            'last_cycle_at': self.last_cycle_at,
+            'last_cycle_seconds': self.last_cycle_seconds,
+        }
+
+
+outcome_evaluator = OutcomeEvaluator(
+    interval_seconds=env_handler.get_env("OUTCOME_EVAL_INTERVAL_SECONDS"),
+    rebuild_seconds=env_handler.get_env("OUTCOME_INDEX_REBUILD_SECONDS")
+)
+
+atexit.register(outcome_evaluator.stop)
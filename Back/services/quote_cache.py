@@ -0,0 +1,262 @@
+"""In-process market quote cache with single-flight loading and stale-while-revalidate."""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.env_handler import EnvHandler
+from config.exceptions_handler import ProviderUnavailable
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.quote_cache")
+
+env_handler = EnvHandler()
+
+
+def parse_ttls(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a TTL specification such as "crypto:5,forex:10,default:15".
+
+    Args:
+        spec: Comma-separated class:seconds pairs
+
+    Returns:
+        Dictionary mapping symbol class to TTL in seconds
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    ttls = {}
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, seconds = entry.partition(':')
+        if not seconds:
+            raise ValueError(f"Invalid quote TTL entry '{entry}', expected class:seconds")
+        ttls[name.strip().lower()] = float(seconds)
+    return ttls
+
+
+class _Entry:
+    """A cached quote and when it stops being fresh."""
+
+    __slots__ = ("value", "fetched_at", "expires_at")
+
+    def __init__(self, value: Any, fetched_at: float, expires_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+
+class _Flight:
+    """An upstream load in progress that concurrent callers wait on."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QuoteCache:
+    """
+    Quote cache keyed by symbol with a TTL per symbol class.
+
+    - Fresh entries are served directly.
+    - Expired entries younger than stale_seconds past expiry are served as
+      they are while one background refresh reloads them.
+    - Otherwise the caller loads the quote. Concurrent callers for the same
+      symbol wait for that single load instead of issuing their own
+      (single-flight).
+    """
+
+    def __init__(self, ttls: Dict[str, float], stale_seconds: float = 300, load_timeout_seconds: float = 30):
+        """
+        Initialize the cache.
+
+        Args:
+            ttls: TTL in seconds per symbol class; the 'default' entry applies to other classes
+            stale_seconds: How long after expiry a quote may still be served while revalidating
+            load_timeout_seconds: Maximum time a caller waits for another caller's load
+        """
+        self.ttls = ttls
+        self.default_ttl = ttls.get('default', 15.0)
+        self.stale_seconds = stale_seconds
+        self.load_timeout_seconds = load_timeout_seconds
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def ttl_for(self, symbol_class: Optional[str]) -> float:
+        """Return the TTL of a symbol class."""
+        return self.ttls.get((symbol_class or 'default').lower(), self.default_ttl)
+
+    def get(self, symbol: str, loader: Callable[[], Any], symbol_class: Optional[str] = None) -> Any:
+        """
+        Get a quote, loading it through loader when it isn't cached.
+
+        Args:
+            symbol: Symbol the quote is cached under
+            loader: Callable fetching the quote from upstream
+            symbol_class: Symbol class selecting the TTL
+
+        Returns:
+            Quote as returned by loader
+
+        Raises:
+            Exception: Whatever loader raised, when no usable cached quote exists
+        """
+        result = self.get_many(
+            [symbol],
+            lambda symbols: {symbol: loader()},
+            lambda _: symbol_class
+        )[symbol]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get_many(
+        self,
+        symbols: Iterable[str],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        symbol_class_of: Optional[Callable[[str], Optional[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get quotes for several symbols, loading all missing ones with one loader call.
+
+        Args:
+            symbols: Symbols to get
+            loader: Callable taking a list of symbols and returning a dict of
+                symbol to quote, or to the Exception that prevented loading it
+            symbol_class_of: Callable returning the class of a symbol, selecting its TTL
+
+        Returns:
+            Dictionary mapping each symbol to its quote or to an Exception
+        """
+        symbol_class_of = symbol_class_of or (lambda _: None)
+        results = {}
+        to_load = {}
+        to_refresh = {}
+        to_wait = {}
+
+        now = time.monotonic()
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                entry = self._entries.get(symbol)
+                if entry is not None and now < entry.expires_at:
+                    self.hits += 1
+                    results[symbol] = entry.value
+                    continue
+
+                if entry is not None and now < entry.expires_at + self.stale_seconds:
+                    self.stale += 1
+                    results[symbol] = entry.value
+                    if symbol not in self._flights:
+                        self._flights[symbol] = to_refresh[symbol] = _Flight()
+                        self.refreshes += 1
+                    continue
+
+                self.misses += 1
+                flight = self._flights.get(symbol)
+                if flight is not None:
+                    self.coalesced += 1
+                    to_wait[symbol] = flight
+                else:
+                    self._flights[symbol] = to_load[symbol] = _Flight()
+
+        if to_refresh:
+            threading.Thread(
+                target=self._load,
+                args=(to_refresh, loader, symbol_class_of),
+                name="quote-refresh",
+                daemon=True
+            ).start()
+
+        if to_load:
+            self._load(to_load, loader, symbol_class_of)
+
+        for symbol, flight in {**to_load, **to_wait}.items():
+            if not flight.done.wait(self.load_timeout_seconds):
+                results[symbol] = ProviderUnavailable(f"Timed out waiting for quote of {symbol}")
+            elif flight.error is not None:
+                results[symbol] = flight.error
+            else:
+                results[symbol] = flight.value
+
+        return results
+
+    def _load(
+        self,
+        flights: Dict[str, _Flight],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        symbol_class_of: Callable[[str], Optional[str]]
+    ) -> None:
+        """Run one load for several symbols, store the results and release everyone waiting on them."""
+        try:
+            try:
+                values = loader(list(flights))
+            except Exception as e:
+                values = {symbol: e for symbol in flights}
+
+            now = time.monotonic()
+            with self._lock:
+                for symbol, flight in flights.items():
+                    value = values.get(symbol)
+                    if value is None:
+                        value = ProviderUnavailable(f"No quote returned for {symbol}")
+                    if isinstance(value, Exception):
+                        self.errors += 1
+                        flight.error = value
+                        continue
+                    ttl = self.ttl_for(symbol_class_of(symbol))
+                    self._entries[symbol] = _Entry(value, now, now + ttl)
+                    flight.value = value
+        finally:
+            with self._lock:
+                for symbol in flights:
+                    self._flights.pop(symbol, None)
+            for symbol, flight in flights.items():
+                if flight.error is not None:
+                    logger.warning(f"Failed to load quote for {symbol}: {flight.error}")
+                flight.done.set()
+
+    def peek(self, symbol: str) -> Optional[Any]:
+        """Return the cached quote of a symbol, fresh or not, without loading."""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            return entry.value if entry is not None else None
+
+    def clear(self) -> None:
+        """Drop all cached quotes."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return cache size and hit/miss/stale counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'in_flight': len(self._flights),
+                'ttls': dict(self.ttls),
+                'stale_seconds': self.stale_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'coalesced': self.coalesced,
+                'refreshes': self.refreshes,
+                'errors': self.errors,
+            }
+
+
+quote_cache = QuoteCache(
+    ttls=parse_ttls(env_handler.get_env("QUOTE_CACHE_TTLS")),
+    stale_seconds=env_handler.get_env("QUOTE_CACHE_STALE_SECONDS")
+)
@@ -0,0 +1,121 @@
+"""Recently ingested (channel_id, original_message_id) keys, to short-circuit retried messages."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config.env_handler import EnvHandler
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.signal_dedup")
+
+env_handler = EnvHandler()
+
+
+class RecentMessageKeys:
+    """
+    Bounded TTL map of (channel_id, original_message_id) to the ID of the signal created for it.
+
+    This is only a fast path for retries arriving shortly after the original;
+    the unique partial index on signals(channel_id, original_message_id) is
+    what guarantees a message is stored once across workers and restarts.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, max_size: int = 100000):
+        """
+        Initialize the key set.
+
+        Args:
+            ttl_seconds: How long a key is remembered after it was added
+            max_size: Maximum number of keys kept (oldest are evicted first)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, channel_id: Any, original_message_id: Optional[int]) -> Optional[Any]:
+        """
+        Look up the signal created for a message.
+
+        Args:
+            channel_id: Channel UUID
+            original_message_id: Message ID within the channel
+
+        Returns:
+            Signal UUID, or None if the message hasn't been seen recently
+        """
+        if original_message_id is None:
+            return None
+
+        key = (channel_id, original_message_id)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def add(self, channel_id: Any, original_message_id: Optional[int], signal_id: Any) -> None:
+        """
+        Remember the signal created for a message.
+
+        Args:
+            channel_id: Channel UUID
+            original_message_id: Message ID within the channel
+            signal_id: Signal UUID
+        """
+        if original_message_id is None:
+            return
+
+        key = (channel_id, original_message_id)
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (signal_id, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            self._evict_expired(now)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, channel_id: Any, original_message_id: Optional[int]) -> None:
+        """
+        Forget a message (e.g. after its signal is deleted).
+
+        Args:
+            channel_id: Channel UUID
+            original_message_id: Message ID within the channel
+        """
+        with self._lock:
+            self._entries.pop((channel_id, original_message_id), None)
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop expired keys from the front. Caller must hold the lock."""
+        # Entries are kept in insertion order and share one TTL, so expired ones are at the front
+        while self._entries:
+            key, (_, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        """Return key count and hit/miss counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+recent_message_keys = RecentMessageKeys(
+    ttl_seconds=env_handler.get_env("SIGNAL_DEDUP_TTL_SECONDS"),
+    max_size=env_handler.get_env("SIGNAL_DEDUP_MAX_SIZE")
+)
@@ -1,19 +1,37 @@
 """Signal service for business logic."""
 
-from typing import List, Optional
-from uuid import UUID
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from uuid import UUID, uuid4
 from decimal import Decimal
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import desc
+from sqlalchemy import case, desc, func, insert, or_, tuple_, update
 
 from models import Signal, Channel, Template
-from config.exceptions_handler import DatabaseError, ValidationError
+from services.template_cache import (
+    NO_MATCH,
+    CompiledTemplate,
+    compile_extraction_config,
+    extract_field,
+    template_cache,
+)
+from services.extraction_engine import ENGINE_FUSED, PREFILTER_SKIPPED, channel_plan_cache, get_extraction_engine
+from services.template_stats import template_stats
+from services.template_guard import template_guard
+from services.extraction_history_writer import extraction_history_writer
+from services.signal_dedup import recent_message_keys
+from services.level_index import level_index
+from services.channel_stats_service import ChannelStatsService, counters_delta, signal_counters, stats_counters
+from config.exceptions_handler import DatabaseError, TemplateBudgetExceeded, ValidationError
 from utils.logger_utils import get_module_logger
 
 logger = get_module_logger("services.signal_service")
 
+EXTRACTION_ENGINE = get_extraction_engine()
+
 
 class SignalService:
     """Service for signal business logic."""
@@ -43,9 +61,7 @@ class SignalService:
             ValidationError: If channel not found, no active templates, or extraction fails
             DatabaseError: If creation fails
         """
-        import re
         from services.template_service import TemplateService
-        from datetime import datetime, timezone
         
         # Verify channel exists
         channel = db.query(Channel).filter(Channel.id == channel_id).first()
@@ -60,135 +76,548 @@ class SignalService:
             raise ValidationError("No active templates found for this channel")
         
         logger.info(f"Templates found: {len(templates)}")
-        # Try each template until one succeeds
-        extraction_errors = []
-        for template in templates:
+        template, signal_data = SignalService._match_templates(original_message_text, templates)
+        
+        try:
+            signal = Signal(
+                channel_id=channel_id,
+                user_id=user_id,
+                original_message_text=original_message_text,
+                original_message_id=original_message_id,
+                **signal_data
+            )
+            
+            db.add(signal)
+            
+            # Update channel signal count
+            channel.signal_count = (channel.signal_count or 0) + 1
+            ChannelStatsService.apply_deltas(db, [(channel_id, signal.symbol, signal_counters(signal))])
+            
+            db.commit()
+            db.refresh(signal)
+            
+        except IntegrityError as e:
+            db.rollback()
+            # A concurrent delivery of the same message won the insert
+            existing = SignalService.get_signal_by_original_message(db, channel_id, original_message_id)
+            if existing is None:
+                logger.error(f"Failed to create extracted signal: {e}", exc_info=True)
+                raise DatabaseError(f"Failed to create signal: {e}") from e
+            logger.info(f"Message {original_message_id} of channel {channel_id} already stored as signal {existing.id}")
+            recent_message_keys.add(channel_id, original_message_id, existing.id)
+            return existing
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to create extracted signal: {e}", exc_info=True)
+            raise DatabaseError(f"Failed to create signal: {e}") from e
+        
+        recent_message_keys.add(channel_id, original_message_id, signal.id)
+        SignalService._index_signal(signal)
+        
+        # Template success rate and last_used_at are written periodically, not per message
+        template_stats.maybe_flush(db)
+        
+        logger.info(f"Signal extracted and created successfully: {signal.id} (symbol: {signal.symbol}, type: {signal.signal_type})")
+        return signal
+    
+    @staticmethod
+    def get_duplicate_signal(
+        db: Session,
+        channel_id: UUID,
+        original_message_id: Optional[int]
+    ) -> Optional[Signal]:
+        """
+        Get the signal already created for a recently seen message.
+        
+        Only the in-memory recent-keys set is consulted, so this is cheap enough
+        to call before every extraction; older duplicates are caught by the
+        unique index when the insert is attempted.
+        
+        Args:
+            db: Database session
+            channel_id: Channel UUID
+            original_message_id: Optional original message ID
+            
+        Returns:
+            Existing Signal, or None if the message wasn't seen recently
+        """
+        signal_id = recent_message_keys.get(channel_id, original_message_id)
+        if signal_id is None:
+            return None
+        
+        signal = db.get(Signal, signal_id)
+        if signal is None:
+            # Deleted since it was remembered
+            recent_message_keys.discard(channel_id, original_message_id)
+        return signal
+    
+    @staticmethod
+    def get_signal_by_original_message(
+        db: Session,
+        channel_id: UUID,
+        original_message_id: Optional[int]
+    ) -> Optional[Signal]:
+        """
+        Get the signal stored for a channel message.
+        
+        Args:
+            db: Database session
+            channel_id: Channel UUID
+            original_message_id: Optional original message ID
+            
+        Returns:
+            Signal object or None if not found
+        """
+        if original_message_id is None:
+            return None
+        return db.query(Signal).filter(
+            Signal.channel_id == channel_id,
+            Signal.original_message_id == original_message_id
+        ).first()
+    
+    @staticmethod
+    def extract_signals_batch(
+        db: Session,
+        messages: List[dict],
+        user_id: str
+    ) -> List[dict]:
+        """
+        Extract and create signals for a batch of messages in one transaction.
+        
+        Each channel and its active templates are resolved once, all signals are
+        written with a single bulk INSERT and channel counters with a single UPDATE.
+        A message that fails extraction is reported in its result without
+        affecting the rest of the batch. Messages whose (channel_id,
+        original_message_id) is already stored, or repeated within the batch,
+        are not extracted again; their result points at the existing signal
+        with duplicate set.
+        
+        Args:
+            db: Database session
+            messages: List of dicts with channel_id (UUID), original_message_text
+                and optional original_message_id
+            user_id: User ID string
+            
+        Returns:
+            List of per-message result dicts, in the same order as messages
+            
+        Raises:
+            DatabaseError: If the batch cannot be written
+        """
+        from services.template_service import TemplateService
+        
+        channel_ids = {message['channel_id'] for message in messages}
+        channels = {
+            channel.id: channel
+            for channel in db.query(Channel).filter(Channel.id.in_(channel_ids)).all()
+        } if channel_ids else {}
+        templates_by_channel = {
+            channel_id: TemplateService.get_channel_templates(db, channel_id, active_only=True)
+            for channel_id in channels
+        }
+        
+        existing = SignalService._find_existing_signals(db, messages)
+        
+        results = []
+        rows = []
+        first_positions = {}
+        repeats = []
+        for message in messages:
+            channel_id = message['channel_id']
+            key = (channel_id, message.get('original_message_id'))
+            if key[1] is not None and key in existing:
+                results.append({'success': True, 'duplicate': True, **existing[key]})
+                continue
+            if key[1] is not None and key in first_positions:
+                repeats.append((len(results), first_positions[key]))
+                results.append(None)
+                continue
+            
+            if channel_id not in channels:
+                results.append({'success': False, 'error': 'Channel not found'})
+                continue
+            
+            templates = templates_by_channel[channel_id]
+            if not templates:
+                results.append({'success': False, 'error': 'No active templates found for this channel'})
+                continue
+            
             try:
-                logger.info(f"Extracting with template: {template.id}")
-                extracted_data = SignalService._extract_with_template(
-                    original_message_text,
-                    template.extraction_config
+                template, signal_data = SignalService._match_templates(
+                    message['original_message_text'],
+                    templates
                 )
-
-                logger.info(f"Extracted data: {extracted_data}")
+            except ValidationError as e:
+                results.append({'success': False, 'error': str(e)})
+                continue
+            
+            row = {
+                'id': uuid4(),
+                'channel_id': channel_id,
+                'user_id': user_id,
+                'original_message_text': message['original_message_text'],
+                'original_message_id': message.get('original_message_id'),
+                **signal_data
+            }
+            if key[1] is not None:
+                first_positions[key] = len(results)
+            rows.append((len(results), row))
+            results.append({
+                'success': True,
+                'duplicate': False,
+                'signal_id': str(row['id']),
+                'channel_id': str(channel_id),
+                'template_id': str(template.id),
+                'symbol': row['symbol'],
+                'signal_type': row['signal_type'],
+            })
+        
+        if not rows:
+            return SignalService._resolve_repeats(results, repeats)
+        
+        try:
+            failed = SignalService._insert_signal_rows(db, [row for _, row in rows])
+            for position, row in rows:
+                if row['id'] in failed:
+                    results[position] = {'success': False, 'error': failed[row['id']]}
+            
+            inserted = [row for _, row in rows if row['id'] not in failed]
+            if inserted:
+                # One UPDATE for all channel counters
+                counts = Counter(row['channel_id'] for row in inserted)
+                db.execute(
+                    update(Channel)
+                    .where(Channel.id.in_(list(counts)))
+                    .values(signal_count=func.coalesce(Channel.signal_count, 0) + case(dict(counts), value=Channel.id, else_=0))
+                )
+                ChannelStatsService.apply_deltas(db, [
+                    (row['channel_id'], row['symbol'], stats_counters(row.get('performance_outcome'), row.get('take_profits')))
+                    for row in inserted
+                ])
+            
+            db.commit()
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write signal batch: {e}", exc_info=True)
+            raise DatabaseError(f"Failed to create signals: {e}") from e
+        
+        for row in inserted:
+            recent_message_keys.add(row['channel_id'], row['original_message_id'], row['id'])
+            level_index.add_signal(row['id'], row['symbol'], row['signal_type'], row.get('stop_loss'), row.get('take_profits'))
+        
+        template_stats.maybe_flush(db)
+        
+        logger.info(f"Signal batch processed: {len(inserted)} created, {len(results) - len(inserted)} not created")
+        return SignalService._resolve_repeats(results, repeats)
+    
+    @staticmethod
+    def _find_existing_signals(db: Session, messages: List[dict]) -> dict:
+        """
+        Look up signals already stored for the messages of a batch with one query.
+        
+        Args:
+            db: Database session
+            messages: Batch messages with channel_id and optional original_message_id
+            
+        Returns:
+            Dictionary mapping (channel_id, original_message_id) to a batch result fragment
+        """
+        keys = {
+            (message['channel_id'], message['original_message_id'])
+            for message in messages
+            if message.get('original_message_id') is not None
+        }
+        if not keys:
+            return {}
+        
+        rows = db.query(
+            Signal.id,
+            Signal.channel_id,
+            Signal.original_message_id,
+            Signal.template_id,
+            Signal.symbol,
+            Signal.signal_type
+        ).filter(
+            tuple_(Signal.channel_id, Signal.original_message_id).in_(list(keys))
+        ).all()
+        
+        existing = {}
+        for row in rows:
+            recent_message_keys.add(row.channel_id, row.original_message_id, row.id)
+            existing[(row.channel_id, row.original_message_id)] = {
+                'signal_id': str(row.id),
+                'channel_id': str(row.channel_id),
+                'template_id': str(row.template_id),
+                'symbol': row.symbol,
+                'signal_type': row.signal_type,
+            }
+        return existing
+    
+    @staticmethod
+    def _resolve_repeats(results: List[Optional[dict]], repeats: List[Tuple[int, int]]) -> List[dict]:
+        """Fill results of messages repeated within a batch from their first occurrence."""
+        for position, first_position in repeats:
+            first = results[first_position]
+            results[position] = {**first, 'duplicate': True} if first['success'] else dict(first)
+        return results
+    
+    @staticmethod
+    def _insert_signal_rows(db: Session, rows: List[dict]) -> dict:
+        """
+        Bulk insert signal rows, isolating rows that violate constraints.
+        
+        The whole list goes out as one INSERT. If that hits a constraint, rows
+        are retried one by one inside savepoints so only the offending rows fail.
+        
+        Args:
+            db: Database session
+            rows: Signal column dicts, each with a pre-generated id
+            
+        Returns:
+            Dictionary mapping ids of rows that could not be inserted to an error message
+        """
+        try:
+            with db.begin_nested():
+                db.execute(insert(Signal), rows)
+            return {}
+        except IntegrityError as e:
+            logger.warning(f"Bulk signal insert hit a constraint, retrying row by row: {e}")
+        
+        failed = {}
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Signal), [row])
+            except IntegrityError as e:
+                logger.warning(f"Integrity error creating signal {row['id']}: {e}")
+                failed[row['id']] = "Failed to create signal due to database constraint"
+        return failed
+    
+    @staticmethod
+    def _match_templates(original_message_text: str, templates: List[Template]) -> Tuple[Template, dict]:
+        """
+        Try templates in order and build signal fields from the first that matches.
+        
+        Args:
+            original_message_text: Message text to extract from
+            templates: Active templates to try (reordered by recent hit rate)
+            
+        Returns:
+            Tuple of (matching Template, dict of Signal column values)
+            
+        Raises:
+            ValidationError: If no template produced a valid signal
+        """
+        # Try the templates that have been matching recent traffic first
+        templates = template_stats.order(templates)
+        
+        extraction_errors = []
+        attempted = []
+        for template, extracted_data, error in SignalService._iter_extractions(original_message_text, templates):
+            attempted.append(template)
+            if error == PREFILTER_SKIPPED:
+                # Not recorded: most chatter misses every template's literals
+                continue
+            if error:
+                extraction_errors.append(f"Template {template.id}: {error}")
+                extraction_history_writer.submit(
+                    template.id,
+                    was_successful=False,
+                    error_message=error,
+                    original_message=original_message_text
+                )
+                continue
+            
+            try:
+                logger.info(f"Extracted data with template {template.id}: {extracted_data}")
                 
                 if extracted_data:
-                    # Extract required fields
-                    symbol = extracted_data.get('symbol')
-                    entry_price = extracted_data.get('entry')
-                    signal_type = extracted_data.get('signal_type', 'BUY')
-                    
-                    if not symbol:
-                        raise ValidationError("Could not extract symbol from message")
-                    if not entry_price:
-                        raise ValidationError("Could not extract entry price from message")
-                    
-                    # Handle entry price (can be array for ranges)
-                    if isinstance(entry_price, list):
-                        entry_price = Decimal(str(entry_price[0]))  # Use first price in range
-                    else:
-                        entry_price = Decimal(str(entry_price))
-                    
-                    # Normalize signal type
-                    signal_type_upper = signal_type.upper()
-                    if signal_type_upper in ['BUY', 'LONG']:
-                        signal_type = 'BUY'
-                    elif signal_type_upper in ['SELL', 'SHORT']:
-                        signal_type = 'SELL'
-                    else:
-                        signal_type = 'BUY'  # Default
-                    
-                    # Extract stop loss first (needed for R:R calculation)
-                    stop_loss = None
-                    sl_keys = ['sl', 'stop_loss', 'stop']
-                    for sl_key in sl_keys:
-                        if sl_key in extracted_data:
-                            sl_value = extracted_data[sl_key]
-                            if sl_value:
-                                stop_loss = {
-                                    'price': float(sl_value),
-                                    'hit': False,
-                                    'hit_at': None
-                                }
-                            break
-                    
-                    # Extract take profits and calculate risk/reward ratio for each
-                    take_profits = []
-                    tp_keys = ['tp', 'tp1', 'tp2', 'tp3', 'take_profit', 'take_profits']
-                    for tp_key in tp_keys:
-                        if tp_key in extracted_data:
-                            tp_value = extracted_data[tp_key]
-                            if isinstance(tp_value, list):
-                                for idx, tp_price in enumerate(tp_value):
-                                    tp_price_float = float(tp_price)
-                                    risk_reward_ratio = SignalService._calculate_risk_reward_ratio(
-                                        entry_price=entry_price,
-                                        stop_loss_price=Decimal(str(stop_loss['price'])) if stop_loss else None,
-                                        take_profit_price=Decimal(str(tp_price_float)),
-                                        signal_type=signal_type
-                                    )
-                                    take_profits.append({
-                                        'level': f'TP{idx + 1}',
-                                        'price': tp_price_float,
-                                        'hit': False,
-                                        'risk_reward_ratio': float(risk_reward_ratio) if risk_reward_ratio else None
-                                    })
-                            elif tp_value:
-                                tp_price_float = float(tp_value)
-                                risk_reward_ratio = SignalService._calculate_risk_reward_ratio(
-                                    entry_price=entry_price,
-                                    stop_loss_price=Decimal(str(stop_loss['price'])) if stop_loss else None,
-                                    take_profit_price=Decimal(str(tp_price_float)),
-                                    signal_type=signal_type
-                                )
-                                take_profits.append({
-                                    'level': 'TP1',
-                                    'price': tp_price_float,
-                                    'hit': False,
-                                    'risk_reward_ratio': float(risk_reward_ratio) if risk_reward_ratio else None
-                                })
-                    
-                    # Create signal with extracted data
-                    signal = Signal(
-                        channel_id=channel_id,
-                        template_id=template.id,
-                        user_id=user_id,
-                        symbol=str(symbol),
-                        entry_price=entry_price,
-                        signal_type=signal_type,
-                        original_message_text=original_message_text,
-                        original_message_id=original_message_id,
-                        take_profits=take_profits if take_profits else [],
-                        stop_loss=stop_loss,
-                        timeframe=extracted_data.get('timeframe'),
-                        confidence_score=Decimal("1.0"),
-                        extraction_metadata=extracted_data,
-                        performance_outcome="PENDING"
+                    signal_data = SignalService._build_signal_data(template, extracted_data)
+                    template_stats.record(misses=attempted[:-1], hit=template)
+                    extraction_history_writer.submit(
+                        template.id,
+                        was_successful=True,
+                        extracted_data=extracted_data,
+                        original_message=original_message_text
                     )
-                    
-                    db.add(signal)
-                    
-                    # Update channel signal count
-                    channel.signal_count = (channel.signal_count or 0) + 1
-                    
-                    # Update template metrics
-                    template.last_used_at = datetime.now(timezone.utc)
-                    
-                    db.commit()
-                    db.refresh(signal)
-                    
-                    logger.info(f"Signal extracted and created successfully: {signal.id} (symbol: {symbol}, type: {signal_type})")
-                    return signal
+                    return template, signal_data
+                
+                extraction_history_writer.submit(
+                    template.id,
+                    was_successful=False,
+                    error_message="Symbol or entry not found",
+                    original_message=original_message_text
+                )
                     
             except Exception as e:
                 extraction_errors.append(f"Template {template.id}: {str(e)}")
                 logger.warning(f"Template {template.id} extraction failed: {e}")
+                extraction_history_writer.submit(
+                    template.id,
+                    was_successful=False,
+                    error_message=str(e),
+                    extracted_data=extracted_data,
+                    original_message=original_message_text
+                )
                 continue
         
+        template_stats.record(misses=attempted)
         logger.warning(f"All templates failed: {extraction_errors}")
         # If all templates failed
         raise ValidationError(f"Could not extract signal from message. Errors: {'; '.join(extraction_errors)}")
     
+    @staticmethod
+    def _iter_extractions(original_message_text: str, templates: List[Template]):
+        """
+        Lazily extract data from a message with each template, in order.
+        
+        Uses the fused per-channel plan when EXTRACTION_ENGINE is 'fused',
+        otherwise runs each template's compiled plan on its own. Either way the
+        channel's literal prefilter skips templates that cannot match, and
+        each template runs under the template_guard time budget.
+        
+        Args:
+            original_message_text: Message text to extract from
+            templates: Templates to try, in priority order
+            
+        Yields:
+            Tuples of (template, extracted data dict or None, error message or None);
+            the error is PREFILTER_SKIPPED for templates the prefilter skipped
+        """
+        plan = channel_plan_cache.get(templates)
+        if EXTRACTION_ENGINE == ENGINE_FUSED:
+            yield from plan.iter_extractions(original_message_text, templates)
+            return
+        
+        # Skip templates whose required literals are missing without running any regex
+        found = plan.scan_literals(original_message_text)
+        for template in templates:
+            quarantine_error = template_guard.quarantine_error(template.id)
+            if quarantine_error:
+                yield template, None, quarantine_error
+                continue
+            
+            if not plan.may_match(template, found):
+                logger.debug(f"Template {template.id} skipped by literal prefilter")
+                yield template, None, PREFILTER_SKIPPED
+                continue
+            
+            logger.info(f"Extracting with template: {template.id}")
+            try:
+                extracted_data = SignalService._extract_with_plan(
+                    original_message_text,
+                    template_cache.get(template),
+                    deadline=template_guard.deadline()
+                )
+            except TemplateBudgetExceeded as e:
+                yield template, None, str(e)
+                continue
+            yield template, extracted_data, None
+    
+    @staticmethod
+    def _build_signal_data(template: Template, extracted_data: dict) -> dict:
+        """
+        Normalize extracted template data into Signal column values.
+        
+        Args:
+            template: Template that produced the data
+            extracted_data: Raw extracted field values
+            
+        Returns:
+            Dictionary of Signal column values (without channel, user or message fields)
+            
+        Raises:
+            ValidationError: If symbol or entry price is missing
+        """
+        # Extract required fields
+        symbol = extracted_data.get('symbol')
+        entry_price = extracted_data.get('entry')
+        signal_type = extracted_data.get('signal_type', 'BUY')
+        
+        if not symbol:
+            raise ValidationError("Could not extract symbol from message")
+        if not entry_price:
+            raise ValidationError("Could not extract entry price from message")
+        
+        # Handle entry price (can be array for ranges)
+        if isinstance(entry_price, list):
+            entry_price = Decimal(str(entry_price[0]))  # Use first price in range
+        else:
+            entry_price = Decimal(str(entry_price))
+        
+        # Normalize signal type
+        signal_type_upper = signal_type.upper()
+        if signal_type_upper in ['BUY', 'LONG']:
+            signal_type = 'BUY'
+        elif signal_type_upper in ['SELL', 'SHORT']:
+            signal_type = 'SELL'
+        else:
+            signal_type = 'BUY'  # Default
+        
+        # Extract stop loss first (needed for R:R calculation)
+        stop_loss = None
+        sl_keys = ['sl', 'stop_loss', 'stop']
+        for sl_key in sl_keys:
+            if sl_key in extracted_data:
+                sl_value = extracted_data[sl_key]
+                if sl_value:
+                    stop_loss = {
+                        'price': float(sl_value),
+                        'hit': False,
+                        'hit_at': None
+                    }
+                break
+        
+        # Extract take profits and calculate risk/reward ratio for each
+        take_profits = []
+        tp_keys = ['tp', 'tp1', 'tp2', 'tp3', 'take_profit', 'take_profits']
+        for tp_key in tp_keys:
+            if tp_key in extracted_data:
+                tp_value = extracted_data[tp_key]
+                if isinstance(tp_value, list):
+                    for idx, tp_price in enumerate(tp_value):
+                        tp_price_float = float(tp_price)
+                        risk_reward_ratio = SignalService._calculate_risk_reward_ratio(
+                            entry_price=entry_price,
+                            stop_loss_price=Decimal(str(stop_loss['price'])) if stop_loss else None,
+                            take_profit_price=Decimal(str(tp_price_float)),
+                            signal_type=signal_type
+                        )
+                        take_profits.append({
+                            'level': f'TP{idx + 1}',
+                            'price': tp_price_float,
+                            'hit': False,
+                            'risk_reward_ratio': float(risk_reward_ratio) if risk_reward_ratio else None
+                        })
+                elif tp_value:
+                    tp_price_float = float(tp_value)
+                    risk_reward_ratio = SignalService._calculate_risk_reward_ratio(
+                        entry_price=entry_price,
+                        stop_loss_price=Decimal(str(stop_loss['price'])) if stop_loss else None,
+                        take_profit_price=Decimal(str(tp_price_float)),
+                        signal_type=signal_type
+                    )
+                    take_profits.append({
+                        'level': 'TP1',
+                        'price': tp_price_float,
+                        'hit': False,
+                        'risk_reward_ratio': float(risk_reward_ratio) if risk_reward_ratio else None
+                    })
+        
+        return {
+            'template_id': template.id,
+            'symbol': str(symbol),
+            'entry_price': entry_price,
+            'signal_type': signal_type,
+            'take_profits': take_profits if take_profits else [],
+            'stop_loss': stop_loss,
+            'timeframe': extracted_data.get('timeframe'),
+            'confidence_score': Decimal("1.0"),
+            'extraction_metadata': extracted_data,
+            'performance_outcome': "PENDING",
+        }
+    
     @staticmethod
     def _calculate_risk_reward_ratio(
         entry_price: Decimal,
@@ -246,102 +675,55 @@ class SignalService:
         Returns:
             Dictionary with extracted data or None if extraction fails
         """
-        import re
+        plan = compile_extraction_config(extraction_config or {})
+        return SignalService._extract_with_plan(message_text, plan)
+    
+    @staticmethod
+    def _extract_with_plan(
+        message_text: str,
+        plan: CompiledTemplate,
+        deadline: Optional[float] = None,
+        field_hook: Optional[Callable[[int, object, float, Optional[str]], None]] = None
+    ) -> Optional[dict]:
+        """
+        Extract signal data from message using a compiled template plan.
         
-        extracted = {}
-        fields = extraction_config.get('fields', [])
-
-        logger.info(f"Message text: {message_text}")
-
-        for field in fields:
-            field_key = field.get('key')
-            field_method = field.get('method', 'regex')
-            field_regex = field.get('regex')
-            field_type = field.get('type', 'string')
+        Args:
+            message_text: Message text to extract from
+            plan: Compiled template plan (see services.template_cache)
+            deadline: Optional template_guard deadline, checked after each field
+            field_hook: Optional callback run after each field with its index in
+                plan.fields, its value (NO_MATCH if none), the seconds it took
+                and its error message or None; used to benchmark templates
             
-            if not field_key:
-                continue
+        Returns:
+            Dictionary with extracted data or None if extraction fails
             
-            logger.info(f"Extracting field: {field_key} with method: {field_method}")
-
+        Raises:
+            TemplateBudgetExceeded: If the deadline passes before all fields are extracted
+        """
+        extracted = {}
+        
+        logger.debug(f"Message text: {message_text}")
+        
+        for index, field in enumerate(plan.fields):
+            started = time.perf_counter() if field_hook is not None else None
+            error = None
             try:
-                if field_method == 'regex' and field_regex:
-                    if field_type == 'array':
-                        # For array types, find all matches (e.g., TP1, TP2, TP3)
-                        matches = list(re.finditer(field_regex, message_text, re.IGNORECASE))
-                        if matches:
-                            values = []
-                            for match in matches:
-                                # Extract the price value (usually group 1, but could be group 2 for numbered TP)
-                                # For patterns like "TP1. 4100.00" or "TP1: 4100.00", we want the price
-                                # Check if there are multiple groups and use the last numeric group
-                                groups = [g for g in match.groups() if g]
-                                if groups:
-                                    # For TP patterns, the price is usually the last group
-                                    # Handle patterns like: TP\d?\s*[.:]?\s*([0-9]+\.?[0-9]*)
-                                    # or TP(\d+)\s*[.:]?\s*([0-9]+\.?[0-9]*) where group 2 is the price
-                                    price_value = groups[-1]  # Last group is typically the price
-                                    try:
-                                        # Try to parse as float to validate it's a number
-                                        float_val = float(price_value)
-                                        # Only add if it's a reasonable price (not just a single digit like 1 or 2)
-                                        if float_val > 10 or '.' in price_value:  # Price should be > 10 or have decimal
-                                            values.append(float_val)
-                                    except ValueError:
-                                        # If parsing fails, check if it's a valid number string
-                                        if price_value.replace('.', '').isdigit():
-                                            values.append(float(price_value))
-                            if values:
-                                extracted[field_key] = values
-                                logger.info(f"Extracted array {field_key}: {values}")
-                    else:
-                        # Try regex extraction for single values
-                        match = re.search(field_regex, message_text, re.IGNORECASE)
-                        if match:
-                            logger.info(f"Match found: {match.group(0)}")
-                            # Extract first group
-                            value = match.group(1) if match.groups() else match.group(0)
-                            if field_type == 'number':
-                                try:
-                                    extracted[field_key] = float(value)
-                                except ValueError:
-                                    extracted[field_key] = value
-                            else:
-                                extracted[field_key] = value
-                
-                elif field_method == 'marker':
-                    # Marker-based extraction
-                    start_marker = field.get('startMarker')
-                    end_marker = field.get('endMarker')
-                    
-                    if start_marker:
-                        start_idx = message_text.find(start_marker)
-                        if start_idx != -1:
-                            start_idx += len(start_marker)
-                            if end_marker:
-                                end_idx = message_text.find(end_marker, start_idx)
-                                if end_idx != -1:
-                                    value = message_text[start_idx:end_idx].strip()
-                                else:
-                                    value = message_text[start_idx:].strip()
-                            else:
-                                # Extract until end of line or next marker
-                                remaining = message_text[start_idx:]
-                                lines = remaining.split('\n')
-                                value = lines[0].strip() if lines else remaining.strip()
-                            
-                            if value:
-                                if field_type == 'number':
-                                    try:
-                                        extracted[field_key] = float(value)
-                                    except ValueError:
-                                        extracted[field_key] = value
-                                else:
-                                    extracted[field_key] = value
-                                    
+                value = extract_field(message_text, field)
             except Exception as e:
-                logger.warning(f"Error extracting field {field_key}: {e}")
-                continue
+                logger.warning(f"Error extracting field {field.key}: {e}")
+                error = str(e)
+                value = NO_MATCH
+            
+            if field_hook is not None:
+                field_hook(index, value, time.perf_counter() - started, error)
+            
+            if value is not NO_MATCH:
+                extracted[field.key] = value
+            
+            if deadline is not None:
+                template_guard.check(plan.template_id, deadline)
         
         # Return extracted data if we got at least symbol and entry
         if 'symbol' in extracted and 'entry' in extracted:
@@ -435,9 +817,11 @@ class SignalService:
             
             # Update channel signal count
             channel.signal_count = (channel.signal_count or 0) + 1
+            ChannelStatsService.apply_deltas(db, [(channel_id, symbol, signal_counters(signal))])
             
             db.commit()
             db.refresh(signal)
+            SignalService._index_signal(signal)
             
             logger.info(f"Signal created successfully: {signal.id} (symbol: {symbol}, type: {signal_type})")
             return signal
@@ -451,6 +835,14 @@ class SignalService:
             logger.error(f"Failed to create signal: {e}", exc_info=True)
             raise DatabaseError(f"Failed to create signal: {e}") from e
     
+    @staticmethod
+    def _index_signal(signal: Signal) -> None:
+        """Add an open signal's levels to the level index, or drop a closed signal from it."""
+        if signal.closed_at is None and signal.performance_outcome in (None, 'PENDING'):
+            level_index.add_signal(signal.id, signal.symbol, signal.signal_type, signal.stop_loss, signal.take_profits)
+        else:
+            level_index.remove_signals(signal.symbol, [signal.id])
+    
     @staticmethod
     def get_signal_by_id(db: Session, signal_id: UUID) -> Optional[Signal]:
         """
@@ -465,6 +857,80 @@ class SignalService:
         """
         return db.query(Signal).filter(Signal.id == signal_id).first()
     
+    @staticmethod
+    def _lock_signal(db: Session, signal_id: UUID) -> Optional[Signal]:
+        """
+        Load a signal's current row and lock it until the transaction ends.
+        
+        Writers that derive channel stats deltas from the row use this, so an
+        outcome evaluator closing the signal concurrently can't make the same
+        change count twice.
+        """
+        return (
+            db.query(Signal)
+            .filter(Signal.id == signal_id)
+            .populate_existing()
+            .with_for_update()
+            .first()
+        )
+    
+    @staticmethod
+    def get_open_signal_symbols(db: Session) -> List[str]:
+        """
+        Get the distinct symbols of signals that are still open.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            List of symbols
+        """
+        rows = db.query(Signal.symbol).filter(
+            Signal.closed_at.is_(None),
+            or_(Signal.performance_outcome.is_(None), Signal.performance_outcome == 'PENDING')
+        ).distinct().all()
+        return [row.symbol for row in rows]
+    
+    @staticmethod
+    def get_import_checkpoint(db: Session, channel_id: UUID) -> Optional[int]:
+        """
+        Get the last message ID processed by a channel's history import.
+        
+        Args:
+            db: Database session
+            channel_id: Channel UUID
+            
+        Returns:
+            Message ID saved by save_import_checkpoint, or None if no import has run
+        """
+        return db.query(Channel.history_import_message_id).filter(
+            Channel.id == channel_id
+        ).scalar()
+    
+    @staticmethod
+    def save_import_checkpoint(db: Session, channel_id: UUID, message_id: int) -> None:
+        """
+        Save the last message ID processed by a channel's history import.
+        
+        Args:
+            db: Database session
+            channel_id: Channel UUID
+            message_id: original_message_id of the last processed message
+            
+        Raises:
+            DatabaseError: If the checkpoint cannot be saved
+        """
+        try:
+            db.execute(
+                update(Channel)
+                .where(Channel.id == channel_id)
+                .values(history_import_message_id=message_id)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise DatabaseError(f"Failed to save import checkpoint: {e}") from e
+    
     @staticmethod
     def get_channel_signals(
         db: Session,
@@ -473,10 +939,12 @@ class SignalService:
         offset: Optional[int] = None,
         symbol: Optional[str] = None,
         signal_type: Optional[str] = None,
-        performance_outcome: Optional[str] = None
+        performance_outcome: Optional[str] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        columns: Optional[List[str]] = None
     ) -> List[Signal]:
         """
-        Get all signals for a specific channel.
+        Get all signals for a specific channel, newest first.
         
         Args:
             db: Database session
@@ -486,11 +954,13 @@ class SignalService:
             symbol: Optional filter by symbol
             signal_type: Optional filter by signal type
             performance_outcome: Optional filter by performance outcome
+            after: Optional (created_at, id) of the last signal of the previous page
+            columns: Optional Signal columns to load (defaults to all)
             
         Returns:
             List of Signal objects
         """
-        query = db.query(Signal).filter(Signal.channel_id == channel_id)
+        query = SignalService._select_columns(db.query(Signal), columns).filter(Signal.channel_id == channel_id)
         
         if symbol:
             query = query.filter(Signal.symbol == symbol)
@@ -501,7 +971,7 @@ class SignalService:
         if performance_outcome:
             query = query.filter(Signal.performance_outcome == performance_outcome)
         
-        query = query.order_by(desc(Signal.created_at))
+        query = SignalService._order_newest_first(query, after)
         
         if offset:
             query = query.offset(offset)
@@ -516,22 +986,26 @@ class SignalService:
         db: Session,
         user_id: str,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        columns: Optional[List[str]] = None
     ) -> List[Signal]:
         """
-        Get all signals for a specific user.
+        Get all signals for a specific user, newest first.
         
         Args:
             db: Database session
             user_id: User ID string
             limit: Optional limit on number of results
             offset: Optional offset for pagination
+            after: Optional (created_at, id) of the last signal of the previous page
+            columns: Optional Signal columns to load (defaults to all)
             
         Returns:
             List of Signal objects
         """
-        query = db.query(Signal).filter(Signal.user_id == user_id)
-        query = query.order_by(desc(Signal.created_at))
+        query = SignalService._select_columns(db.query(Signal), columns).filter(Signal.user_id == user_id)
+        query = SignalService._order_newest_first(query, after)
         
         if offset:
             query = query.offset(offset)
@@ -541,6 +1015,26 @@ class SignalService:
         
         return query.all()
     
+    @staticmethod
+    def _select_columns(query, columns: Optional[List[str]]):
+        """Load only some Signal columns; the others stay unloaded instead of being fetched and hydrated."""
+        if columns is None:
+            return query
+        return query.options(load_only(*[getattr(Signal, column) for column in columns]))
+    
+    @staticmethod
+    def _order_newest_first(query, after: Optional[Tuple[datetime, UUID]]):
+        """
+        Order a signal query newest first, starting after a keyset position.
+        
+        The (created_at, id) row comparison matches the (..., created_at DESC,
+        id DESC) list indexes, so any page is an index range scan instead of
+        skipping OFFSET rows.
+        """
+        if after is not None:
+            query = query.filter(tuple_(Signal.created_at, Signal.id) < tuple_(*after))
+        return query.order_by(desc(Signal.created_at), desc(Signal.id))
+    
     @staticmethod
     def update_signal(
         db: Session,
@@ -562,7 +1056,7 @@ class SignalService:
             ValidationError: If signal not found
             DatabaseError: If update fails
         """
-        signal = SignalService.get_signal_by_id(db, signal_id)
+        signal = SignalService._lock_signal(db, signal_id)
         if not signal:
             raise ValidationError("Signal not found")
         
@@ -571,13 +1065,18 @@ class SignalService:
             'pnl', 'pnl_percent', 'closed_at'
         ]
         
+        counters_before = signal_counters(signal)
         for field, value in update_data.items():
             if field in allowed_fields:
                 setattr(signal, field, value)
         
         try:
+            ChannelStatsService.apply_deltas(db, [
+                (signal.channel_id, signal.symbol, counters_delta(signal_counters(signal), counters_before))
+            ])
             db.commit()
             db.refresh(signal)
+            SignalService._index_signal(signal)
             
             logger.info(f"Signal updated successfully: {signal_id}")
             return signal
@@ -600,13 +1099,16 @@ class SignalService:
             ValidationError: If signal not found
             DatabaseError: If deletion fails
         """
-        signal = SignalService.get_signal_by_id(db, signal_id)
+        signal = SignalService._lock_signal(db, signal_id)
         if not signal:
             raise ValidationError("Signal not found")
         
         channel_id = signal.channel_id
+        original_message_id = signal.original_message_id
+        symbol = signal.symbol
         
         try:
+            ChannelStatsService.apply_deltas(db, [(channel_id, symbol, counters_delta(None, signal_counters(signal)))])
             db.delete(signal)
             
             # Update channel signal count
@@ -615,6 +1117,8 @@ class SignalService:
                 channel.signal_count = max(0, channel.signal_count - 1)
             
             db.commit()
+            recent_message_keys.discard(channel_id, original_message_id)
+            level_index.remove_signals(symbol, [signal_id])
             
             logger.info(f"Signal deleted successfully: {signal_id}")
             
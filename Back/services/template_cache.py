@@ -0,0 +1,359 @@
+"""Process-wide cache of compiled extraction templates."""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, FrozenSet, Optional, Pattern, Tuple
+
+from config.env_handler import EnvHandler
+from utils.logger_utils import get_module_logger
+from utils.regex_utils import required_literals
+
+logger = get_module_logger("services.template_cache")
+
+env_handler = EnvHandler()
+
+# Returned by field extraction when a field did not match (None is a valid captured value)
+NO_MATCH = object()
+
+
+@dataclass(frozen=True)
+class CompiledField:
+    """A single extraction field with its pattern compiled ahead of time."""
+
+    key: str
+    method: str
+    type: str
+    pattern: Optional[Pattern] = None
+    start_marker: Optional[str] = None
+    end_marker: Optional[str] = None
+    start_offset: int = 0
+    compile_error: Optional[str] = None
+    # Literals any match must contain (matched case-insensitively)
+    literals: Tuple[str, ...] = ()
+
+    @property
+    def can_match(self) -> bool:
+        """Whether the field is able to produce a value at all."""
+        if self.method == 'regex':
+            return self.pattern is not None
+        if self.method == 'marker':
+            return bool(self.start_marker)
+        return False
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Immutable extraction plan built from a template's extraction_config."""
+
+    template_id: Any
+    version: int
+    fields: Tuple[CompiledField, ...]
+    # Tokens a message must contain for the template to extract anything
+    required_literals: FrozenSet[str] = frozenset()
+    required_markers: FrozenSet[str] = frozenset()
+
+
+def compile_field(field: dict) -> Optional[CompiledField]:
+    """
+    Compile a single field definition from an extraction config.
+
+    Args:
+        field: Field definition dictionary
+
+    Returns:
+        CompiledField, or None if the field has no key and would be skipped
+    """
+    field_key = field.get('key')
+    if not field_key:
+        return None
+
+    field_method = field.get('method', 'regex')
+    field_type = field.get('type', 'string')
+
+    if field_method == 'regex':
+        field_regex = field.get('regex')
+        if not field_regex:
+            return CompiledField(key=field_key, method=field_method, type=field_type)
+        try:
+            pattern = re.compile(field_regex, re.IGNORECASE)
+        except (re.error, TypeError) as e:
+            # Keep the field so extraction logs the failure the same way it always has
+            return CompiledField(
+                key=field_key,
+                method=field_method,
+                type=field_type,
+                compile_error=str(e)
+            )
+        return CompiledField(
+            key=field_key,
+            method=field_method,
+            type=field_type,
+            pattern=pattern,
+            literals=tuple(required_literals(field_regex, re.IGNORECASE))
+        )
+
+    if field_method == 'marker':
+        start_marker = field.get('startMarker')
+        return CompiledField(
+            key=field_key,
+            method=field_method,
+            type=field_type,
+            start_marker=start_marker,
+            end_marker=field.get('endMarker'),
+            start_offset=len(start_marker) if start_marker else 0
+        )
+
+    return CompiledField(key=field_key, method=field_method, type=field_type)
+
+
+def compile_extraction_config(
+    extraction_config: dict,
+    template_id: Any = None,
+    version: int = 0
+) -> CompiledTemplate:
+    """
+    Compile an extraction config into an immutable extraction plan.
+
+    Args:
+        extraction_config: Template extraction configuration
+        template_id: Optional template ID the plan belongs to
+        version: Optional template version the plan was built from
+
+    Returns:
+        CompiledTemplate plan
+    """
+    fields = []
+    for field in extraction_config.get('fields', []) or []:
+        compiled = compile_field(field)
+        if compiled is not None:
+            fields.append(compiled)
+
+    literals, markers = _required_tokens(fields)
+    return CompiledTemplate(
+        template_id=template_id,
+        version=version,
+        fields=tuple(fields),
+        required_literals=literals,
+        required_markers=markers
+    )
+
+
+def _required_tokens(fields) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Derive the literals and markers a message needs for a template to match.
+
+    Extraction only succeeds when both 'symbol' and 'entry' are found, so the
+    tokens required by those fields are required by the template. When several
+    fields provide the same key, only tokens common to all of them count.
+
+    Args:
+        fields: Compiled fields of the template
+
+    Returns:
+        Tuple of (case-insensitive regex literals, case-sensitive marker strings)
+    """
+    literals = set()
+    markers = set()
+
+    for key in ('symbol', 'entry'):
+        literal_sets = []
+        marker_sets = []
+        for field in fields:
+            if field.key != key or not field.can_match:
+                continue
+            if field.method == 'regex':
+                # Skip literals whose lowercase form changes length (e.g. 'İ'); they can't be scanned safely
+                literal_sets.append({
+                    literal.lower() for literal in field.literals
+                    if len(literal.lower()) == len(literal)
+                })
+                marker_sets.append(set())
+            else:
+                literal_sets.append(set())
+                marker_sets.append({field.start_marker})
+
+        # No field can provide this key; extraction will simply fail
+        if not literal_sets:
+            continue
+
+        literals |= set.intersection(*literal_sets)
+        markers |= set.intersection(*marker_sets)
+
+    return frozenset(literals), frozenset(markers)
+
+
+def extract_field(message_text: str, field: CompiledField):
+    """
+    Extract a single field value from message text.
+
+    Args:
+        message_text: Message text to extract from
+        field: Compiled field definition
+
+    Returns:
+        Extracted value, or NO_MATCH if the field did not match
+
+    Raises:
+        ValueError: If the field's regex failed to compile
+    """
+    if field.method == 'regex':
+        if field.compile_error:
+            raise ValueError(f"Invalid regex: {field.compile_error}")
+        if field.pattern is None:
+            return NO_MATCH
+
+        if field.type == 'array':
+            # For array types, find all matches (e.g., TP1, TP2, TP3)
+            values = []
+            for match in field.pattern.finditer(message_text):
+                # For patterns like "TP1. 4100.00" or TP(\d+)\s*[.:]?\s*([0-9]+\.?[0-9]*),
+                # the price is the last non-empty group
+                groups = [g for g in match.groups() if g]
+                if not groups:
+                    continue
+                price_value = groups[-1]
+                try:
+                    float_val = float(price_value)
+                    # Only add if it's a reasonable price (not just a single digit like 1 or 2)
+                    if float_val > 10 or '.' in price_value:
+                        values.append(float_val)
+                except ValueError:
+                    if price_value.replace('.', '').isdigit():
+                        values.append(float(price_value))
+            return values or NO_MATCH
+
+        # Single values use the first group, or the whole match without groups
+        match = field.pattern.search(message_text)
+        if not match:
+            return NO_MATCH
+        value = match.group(1) if match.groups() else match.group(0)
+        return _coerce_field_value(value, field.type)
+
+    if field.method == 'marker':
+        if not field.start_marker:
+            return NO_MATCH
+        start_idx = message_text.find(field.start_marker)
+        if start_idx == -1:
+            return NO_MATCH
+        start_idx += field.start_offset
+
+        if field.end_marker:
+            end_idx = message_text.find(field.end_marker, start_idx)
+            if end_idx != -1:
+                value = message_text[start_idx:end_idx].strip()
+            else:
+                value = message_text[start_idx:].strip()
+        else:
+            # Extract until end of line
+            value = message_text[start_idx:].split('\n', 1)[0].strip()
+
+        if not value:
+            return NO_MATCH
+        return _coerce_field_value(value, field.type)
+
+    return NO_MATCH
+
+
+def _coerce_field_value(value: str, field_type: str):
+    """Convert an extracted string to a float for number fields, leaving it as-is otherwise."""
+    if field_type == 'number':
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+class TemplateCache:
+    """
+    Bounded LRU cache of compiled templates keyed by (template_id, version).
+
+    Updating a template's extraction_config bumps its version, so stale plans
+    are never served; explicit invalidation just frees the old entries early.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of compiled templates to keep
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, template) -> CompiledTemplate:
+        """
+        Get the compiled plan for a template, compiling it on a miss.
+
+        Args:
+            template: Template model instance
+
+        Returns:
+            CompiledTemplate plan
+        """
+        key = (template.id, template.version)
+        with self._lock:
+            plan = self._entries.get(key)
+            if plan is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        # Compile outside the lock; a concurrent miss just compiles twice
+        plan = compile_extraction_config(
+            template.extraction_config or {},
+            template_id=template.id,
+            version=template.version
+        )
+
+        with self._lock:
+            self._entries[key] = plan
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        logger.debug(f"Compiled template {template.id} (version {template.version})")
+        return plan
+
+    def invalidate(self, template_id: Any) -> None:
+        """
+        Drop every cached version of a template.
+
+        Args:
+            template_id: Template UUID
+        """
+        with self._lock:
+            stale_keys = [key for key in self._entries if key[0] == template_id]
+            for key in stale_keys:
+                del self._entries[key]
+
+        if stale_keys:
+            logger.debug(f"Invalidated {len(stale_keys)} compiled plan(s) for template {template_id}")
+
+    def clear(self) -> None:
+        """Drop all cached plans."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+template_cache = TemplateCache(max_size=env_handler.get_env("TEMPLATE_CACHE_MAX_SIZE"))
@@ -0,0 +1,128 @@
+"""Per-template extraction time budget and quarantine of templates that overrun it."""
+
+import threading
+import time
+from typing import Any, Optional
+
+from config.env_handler import EnvHandler
+from config.exceptions_handler import TemplateBudgetExceeded
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.template_guard")
+
+env_handler = EnvHandler()
+
+
+class TemplateGuard:
+    """
+    Enforces a wall-clock budget on each template's extraction of a message.
+
+    Python's re module can't be interrupted once a search starts, so the
+    budget is checked between field operations: a template that runs past it
+    is failed for that message and quarantined for quarantine_seconds, so a
+    pathological pattern costs at most one slow search per quarantine period
+    instead of one per message. Updating a template releases it early.
+    """
+
+    def __init__(self, budget_ms: int = 50, quarantine_seconds: int = 600):
+        """
+        Initialize the guard.
+
+        Args:
+            budget_ms: Maximum time one template may spend on one message
+            quarantine_seconds: How long a template that overran is skipped
+        """
+        self.budget_seconds = budget_ms / 1000.0
+        self.quarantine_seconds = quarantine_seconds
+        self._quarantined = {}
+        self._lock = threading.Lock()
+        self.overruns = 0
+        self.skipped = 0
+
+    def deadline(self, started: Optional[float] = None) -> float:
+        """
+        Return the perf_counter() value at which a template's budget runs out.
+
+        Args:
+            started: Optional perf_counter() value the extraction started at
+        """
+        return (time.perf_counter() if started is None else started) + self.budget_seconds
+
+    def check(self, template_id: Any, deadline: float) -> None:
+        """
+        Fail a template that has run past its deadline.
+
+        Args:
+            template_id: Template UUID
+            deadline: Value returned by deadline()
+
+        Raises:
+            TemplateBudgetExceeded: If the deadline has passed (the template is quarantined)
+        """
+        overrun = time.perf_counter() - deadline
+        if overrun <= 0:
+            return
+
+        elapsed_ms = (self.budget_seconds + overrun) * 1000
+        with self._lock:
+            self._quarantined[template_id] = time.monotonic() + self.quarantine_seconds
+            self.overruns += 1
+
+        logger.warning(
+            f"Template {template_id} took {elapsed_ms:.1f} ms (budget {self.budget_seconds * 1000:.0f} ms), "
+            f"quarantined for {self.quarantine_seconds}s"
+        )
+        raise TemplateBudgetExceeded(
+            f"Extraction exceeded the {self.budget_seconds * 1000:.0f} ms time budget ({elapsed_ms:.1f} ms)"
+        )
+
+    def quarantine_error(self, template_id: Any) -> Optional[str]:
+        """
+        Check whether a template is quarantined.
+
+        Args:
+            template_id: Template UUID
+
+        Returns:
+            Error message if the template must be skipped, None otherwise
+        """
+        with self._lock:
+            until = self._quarantined.get(template_id)
+            if until is None:
+                return None
+            if time.monotonic() >= until:
+                del self._quarantined[template_id]
+                return None
+            self.skipped += 1
+
+        return "Template is quarantined after exceeding its extraction time budget"
+
+    def release(self, template_id: Any) -> None:
+        """
+        Lift the quarantine of a template (e.g. after its patterns are edited).
+
+        Args:
+            template_id: Template UUID
+        """
+        with self._lock:
+            self._quarantined.pop(template_id, None)
+
+    def stats(self) -> dict:
+        """Return the budget, quarantined templates and overrun counters."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'budget_ms': round(self.budget_seconds * 1000),
+                'quarantine_seconds': self.quarantine_seconds,
+                'quarantined': [
+                    str(template_id) for template_id, until in self._quarantined.items() if until > now
+                ],
+                'overruns': self.overruns,
+                'skipped': self.skipped,
+            }
+
+
+template_guard = TemplateGuard(
+    budget_ms=env_handler.get_env("TEMPLATE_TIME_BUDGET_MS"),
+    quarantine_seconds=env_handler.get_env("TEMPLATE_QUARANTINE_SECONDS")
+)
@@ -1,13 +1,21 @@
 """Template service for business logic."""
 
+import math
+import re
+import time
 from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from models import Template, Channel
+from models import Template, Channel, ExtractionHistory, Signal
 from config.exceptions_handler import DatabaseError, ValidationError
+from services.template_cache import NO_MATCH, compile_extraction_config, template_cache
+from services.extraction_engine import channel_plan_cache
+from services.template_stats import template_stats
+from services.template_guard import template_guard
 from utils.logger_utils import get_module_logger
+from utils.regex_utils import find_unsafe_construct
 
 logger = get_module_logger("services.template_service")
 
@@ -61,6 +69,9 @@ class TemplateService:
             db.commit()
             db.refresh(template)
             
+            # Compile on save so required literals are derived before the first message
+            template_cache.get(template)
+            
             logger.info(f"Template created successfully: {template.id} (channel: {channel_id})")
             return template
             
@@ -148,6 +159,13 @@ class TemplateService:
             db.commit()
             db.refresh(template)
             
+            template_cache.invalidate(template_id)
+            channel_plan_cache.invalidate(template_id)
+            if 'extraction_config' in update_data:
+                # New patterns get a fresh chance under the time budget
+                template_guard.release(template_id)
+            template_cache.get(template)
+            
             logger.info(f"Template updated successfully: {template_id}")
             return template
             
@@ -174,9 +192,18 @@ class TemplateService:
             raise ValidationError("Template not found")
         
         try:
+            # History rows reference the template; remove them in one statement
+            db.query(ExtractionHistory).filter(
+                ExtractionHistory.template_id == template_id
+            ).delete(synchronize_session=False)
             db.delete(template)
             db.commit()
             
+            template_cache.invalidate(template_id)
+            channel_plan_cache.invalidate(template_id)
+            template_stats.forget(template_id)
+            template_guard.release(template_id)
+            
             logger.info(f"Template deleted successfully: {template_id}")
             
         except Exception as e:
@@ -207,6 +234,161 @@ class TemplateService:
         db.commit()
         db.refresh(template)
         
+        template_cache.invalidate(template_id)
+        channel_plan_cache.invalidate(template_id)
+        
         logger.info(f"Template {template_id} active status toggled to {template.is_active}")
         return template
+    
+    @staticmethod
+    def benchmark_template(
+        db: Session,
+        template_id: UUID,
+        sample_size: int = 200,
+        slowest_count: int = 5,
+        max_seconds: float = 5.0
+    ) -> dict:
+        """
+        Dry-run a template against its test message and a sample of its channel's messages.
+        
+        The extraction config is compiled and run through
+        SignalService._extract_with_plan, the real extraction path, timing each
+        field. Nothing is written: no signals, extraction history, hit
+        statistics or quarantine.
+        
+        Args:
+            db: Database session
+            template_id: Template UUID
+            sample_size: Number of recent channel messages to run against
+            slowest_count: Number of slowest messages to report
+            max_seconds: Stop sampling once the benchmark has run this long
+            
+        Returns:
+            Dictionary with match rate, per-field and total timings and the slowest messages
+            
+        Raises:
+            ValidationError: If template not found
+        """
+        from services.signal_service import SignalService
+        
+        template = TemplateService.get_template_by_id(db, template_id)
+        if not template:
+            raise ValidationError("Template not found")
+        
+        plan = compile_extraction_config(template.extraction_config or {})
+        rows = (
+            db.query(Signal.id, Signal.original_message_text)
+            .filter(Signal.channel_id == template.channel_id)
+            .order_by(Signal.created_at.desc())
+            .limit(sample_size)
+            .all()
+        )
+        
+        field_times = [[] for _ in plan.fields]
+        field_matches = [0] * len(plan.fields)
+        # First error of each field over the sample, and how many messages raised one
+        field_errors = [None] * len(plan.fields)
+        field_error_counts = [0] * len(plan.fields)
+        
+        def record_field(index: int, value, seconds: float, error: Optional[str]) -> None:
+            field_times[index].append(seconds)
+            if value is not NO_MATCH:
+                field_matches[index] += 1
+            if error is not None:
+                field_error_counts[index] += 1
+                if field_errors[index] is None:
+                    field_errors[index] = error
+        
+        def run(message_text: str, field_hook) -> tuple:
+            started = time.perf_counter()
+            extracted = SignalService._extract_with_plan(message_text, plan, field_hook=field_hook)
+            return extracted is not None, extracted, time.perf_counter() - started
+        
+        test_result = None
+        if template.test_message:
+            test_errors = {}
+            
+            def record_test_error(index: int, value, seconds: float, error: Optional[str]) -> None:
+                if error is not None:
+                    test_errors[plan.fields[index].key] = error
+            
+            matched, extracted, elapsed = run(template.test_message, record_test_error)
+            test_result = {
+                'matched': matched,
+                'extracted': extracted,
+                'total_ms': round(elapsed * 1000, 3),
+                'errors': test_errors,
+            }
+        
+        deadline = time.perf_counter() + max_seconds
+        timings = []
+        matched_count = 0
+        truncated = False
+        for signal_id, message_text in rows:
+            if time.perf_counter() > deadline:
+                truncated = True
+                break
+            matched, _, elapsed = run(message_text, record_field)
+            matched_count += matched
+            timings.append((elapsed, matched, signal_id, message_text))
+        
+        budget_seconds = template_guard.budget_seconds
+        totals = sorted(elapsed for elapsed, _, _, _ in timings)
+        slowest = sorted(timings, key=lambda timing: timing[0], reverse=True)[:slowest_count]
+        
+        fields = []
+        for index, field in enumerate(plan.fields):
+            times = field_times[index]
+            unsafe = None
+            if field.pattern is not None:
+                unsafe = find_unsafe_construct(field.pattern.pattern, re.IGNORECASE)
+            fields.append({
+                'key': field.key,
+                'method': field.method,
+                'matches': field_matches[index],
+                'match_rate': round(field_matches[index] / len(timings), 4) if timings else None,
+                'mean_ms': round(1000 * sum(times) / len(times), 3) if times else None,
+                'max_ms': round(1000 * max(times), 3) if times else None,
+                'unsafe': unsafe,
+                'error': field.compile_error or field_errors[index],
+                'error_count': field_error_counts[index],
+            })
+        
+        logger.info(f"Template {template_id} benchmarked against {len(timings)} message(s)")
+        return {
+            'template_id': str(template.id),
+            'version': template.version,
+            'test_message': test_result,
+            'messages': len(timings),
+            'matched': matched_count,
+            'match_rate': round(matched_count / len(timings), 4) if timings else None,
+            'total_ms': {
+                'mean': round(1000 * sum(totals) / len(totals), 3) if totals else None,
+                'p50': _percentile_ms(totals, 50),
+                'p90': _percentile_ms(totals, 90),
+                'p99': _percentile_ms(totals, 99),
+                'max': _percentile_ms(totals, 100),
+            },
+            'budget_ms': round(budget_seconds * 1000),
+            'over_budget': sum(1 for elapsed in totals if elapsed > budget_seconds),
+            'fields': fields,
+            'slowest': [
+                {
+                    'signal_id': str(signal_id),
+                    'total_ms': round(elapsed * 1000, 3),
+                    'matched': matched,
+                    'length': len(message_text),
+                    'preview': message_text[:200],
+                }
+                for elapsed, matched, signal_id, message_text in slowest
+            ],
+            'truncated': truncated,
+        }
+
 
+def _percentile_ms(sorted_seconds: List[float], percentile: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted durations in seconds, in milliseconds."""
+    if not sorted_seconds:
+        return None
+    rank = max(1, math.ceil(len(sorted_seconds) * percentile / 100))
+    return round(1000 * sorted_seconds[rank - 1], 3)
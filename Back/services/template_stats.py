@@ -0,0 +1,203 @@
+"""In-memory template hit statistics used to order extraction attempts."""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from config.env_handler import EnvHandler
+from models import Template
+from utils.logger_utils import get_module_logger
+
+logger = get_module_logger("services.template_stats")
+
+env_handler = EnvHandler()
+
+
+class _Counter:
+    """Decayed hit/attempt counts for one template."""
+
+    __slots__ = ("hits", "attempts", "updated_at", "last_hit_at", "dirty")
+
+    def __init__(self):
+        self.hits = 0.0
+        self.attempts = 0.0
+        self.updated_at = time.monotonic()
+        self.last_hit_at = None
+        self.dirty = False
+
+
+class TemplateStats:
+    """
+    Per-template hit/miss counters kept in memory and flushed periodically.
+
+    Templates are ranked by a decayed hit rate with a neutral prior, so a new
+    template starts in the middle of the list (ahead of templates that keep
+    missing) and old history fades with the configured half-life. Counters are
+    seeded from the persisted extraction_success_rate after a restart.
+    """
+
+    # Weight of the prior (in attempts) pulling every template towards PRIOR_RATE
+    PRIOR_ATTEMPTS = 2.0
+    PRIOR_RATE = 0.5
+    # Weight (in attempts) given to a persisted success rate when seeding counters
+    SEED_ATTEMPTS = 20.0
+
+    def __init__(self, half_life_seconds: float = 86400, flush_interval_seconds: float = 60):
+        """
+        Initialize the statistics store.
+
+        Args:
+            half_life_seconds: Time for the weight of past attempts to halve
+            flush_interval_seconds: Minimum time between flushes to the database
+        """
+        self.half_life_seconds = half_life_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _get_counter(self, template) -> _Counter:
+        """Get or seed the counter for a template. Caller must hold the lock."""
+        counter = self._counters.get(template.id)
+        if counter is None:
+            counter = _Counter()
+            # Seed from the persisted rate only if it was ever computed
+            if template.last_used_at is not None and template.extraction_success_rate is not None:
+                rate = template.extraction_success_rate / 100.0
+                counter.hits = rate * self.SEED_ATTEMPTS
+                counter.attempts = self.SEED_ATTEMPTS
+            self._counters[template.id] = counter
+        return counter
+
+    def _decay(self, counter: _Counter, now: float) -> None:
+        """Apply exponential decay to a counter's recent counts. Caller must hold the lock."""
+        elapsed = now - counter.updated_at
+        if elapsed > 0 and self.half_life_seconds > 0:
+            factor = 0.5 ** (elapsed / self.half_life_seconds)
+            counter.hits *= factor
+            counter.attempts *= factor
+        counter.updated_at = now
+
+    def _score(self, counter: _Counter) -> float:
+        """Smoothed recent hit rate. Caller must hold the lock."""
+        return (counter.hits + self.PRIOR_RATE * self.PRIOR_ATTEMPTS) / (counter.attempts + self.PRIOR_ATTEMPTS)
+
+    def order(self, templates: List) -> List:
+        """
+        Order templates by descending recent hit rate.
+
+        Ties keep the incoming order (newest first from get_channel_templates).
+
+        Args:
+            templates: Template model instances
+
+        Returns:
+            New list of templates in the order they should be tried
+        """
+        if len(templates) < 2:
+            return list(templates)
+
+        now = time.monotonic()
+        with self._lock:
+            scores = {}
+            for template in templates:
+                counter = self._get_counter(template)
+                self._decay(counter, now)
+                scores[template.id] = self._score(counter)
+
+        return sorted(templates, key=lambda template: -scores[template.id])
+
+    def record(self, misses: Iterable = (), hit=None) -> None:
+        """
+        Record the outcome of trying templates against one message.
+
+        Args:
+            misses: Templates that were tried and did not produce a signal
+            hit: Template that produced the signal, if any
+        """
+        now = time.monotonic()
+        with self._lock:
+            for template in misses:
+                counter = self._get_counter(template)
+                self._decay(counter, now)
+                counter.attempts += 1
+                counter.dirty = True
+
+            if hit is not None:
+                counter = self._get_counter(hit)
+                self._decay(counter, now)
+                counter.hits += 1
+                counter.attempts += 1
+                counter.last_hit_at = datetime.now(timezone.utc)
+                counter.dirty = True
+
+    def maybe_flush(self, db: Session) -> None:
+        """
+        Flush counters if the flush interval has elapsed.
+
+        Args:
+            db: Database session
+        """
+        if time.monotonic() - self._last_flush >= self.flush_interval_seconds:
+            self.flush(db)
+
+    def flush(self, db: Session) -> None:
+        """
+        Write success rates and last-used timestamps of changed templates.
+
+        Failures are logged and the counters stay dirty for the next flush.
+
+        Args:
+            db: Database session
+        """
+        with self._lock:
+            self._last_flush = time.monotonic()
+            rows = []
+            for template_id, counter in self._counters.items():
+                if not counter.dirty or counter.attempts <= 0:
+                    continue
+                row = {
+                    'id': template_id,
+                    'extraction_success_rate': round(100 * counter.hits / counter.attempts),
+                }
+                if counter.last_hit_at is not None:
+                    row['last_used_at'] = counter.last_hit_at
+                rows.append(row)
+                counter.dirty = False
+
+        if not rows:
+            return
+
+        try:
+            # ORM bulk UPDATE by primary key (one executemany per column set)
+            db.execute(update(Template), rows)
+            db.commit()
+            logger.debug(f"Flushed extraction stats for {len(rows)} template(s)")
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to flush template extraction stats: {e}")
+            with self._lock:
+                for row in rows:
+                    counter = self._counters.get(row['id'])
+                    if counter is not None:
+                        counter.dirty = True
+
+    def forget(self, template_id) -> None:
+        """
+        Drop the counters of a template (e.g. after it is deleted).
+
+        Args:
+            template_id: Template UUID
+        """
+        with self._lock:
+            self._counters.pop(template_id, None)
+
+
+template_stats = TemplateStats(
+    half_life_seconds=env_handler.get_env("TEMPLATE_STATS_HALF_LIFE_SECONDS"),
+    flush_interval_seconds=env_handler.get_env("TEMPLATE_STATS_FLUSH_INTERVAL_SECONDS")
+)
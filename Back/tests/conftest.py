@@ -0,0 +1,6 @@
+"""Test configuration: makes the Back directory importable when pytest runs from elsewhere."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
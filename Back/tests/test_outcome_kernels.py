@@ -0,0 +1,132 @@
+"""Tests of the level evaluation kernels shared by the outcome evaluator and the backtester."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.backtest_service import replay_levels
+from services.outcome_engine import SignalLevels, evaluate_levels
+
+
+def _row(signal_id, signal_type, entry, stop_loss=None, take_profits=(), created_at=0):
+    return SimpleNamespace(
+        id=signal_id,
+        channel_id=None,
+        signal_type=signal_type,
+        entry_price=entry,
+        stop_loss={"price": stop_loss} if stop_loss is not None else None,
+        take_profits=[{"price": price, "hit": False} for price in take_profits],
+        created_at=datetime.fromtimestamp(created_at, timezone.utc),
+    )
+
+
+def _evaluate(levels, low, high, tp_hit=None):
+    count = len(levels)
+    return evaluate_levels(
+        levels.is_long, levels.entry, levels.stop_loss, levels.take_profits,
+        levels.tp_hit if tp_hit is None else tp_hit,
+        np.full(count, low, dtype=float), np.full(count, high, dtype=float)
+    )
+
+
+def test_take_profits_hit_in_turn_then_close_at_the_farthest():
+    levels = SignalLevels([_row(1, "BUY", 100, 95, [105, 110])])
+
+    first = _evaluate(levels, 100, 106)
+    assert first["new_tp_hit"].tolist() == [[True, False]]
+    assert not first["closed"][0]
+
+    second = _evaluate(levels, 104, 111, tp_hit=first["new_tp_hit"])
+    assert second["closed"][0] and not second["sl_hit"][0]
+    assert second["close_price"][0] == 110
+    assert second["pnl"][0] == 10
+    assert second["pnl_percent"][0] == 10
+
+
+def test_stop_loss_wins_when_a_range_reaches_both():
+    levels = SignalLevels([_row(1, "BUY", 100, 95, [105]), _row(2, "SELL", 100, 105, [95])])
+
+    result = _evaluate(levels, 94, 106)
+
+    assert result["sl_hit"].tolist() == [True, True]
+    assert not result["new_tp_hit"].any()
+    assert result["close_price"].tolist() == [95, 105]
+    assert result["pnl"].tolist() == [-5, -5]
+
+
+def test_short_signals_trigger_on_the_opposite_side():
+    levels = SignalLevels([_row(1, "SELL", 100, 105, [95, 90])])
+
+    assert not _evaluate(levels, 96, 104)["closed"][0]
+    assert _evaluate(levels, 94, 99)["new_tp_hit"].tolist() == [[True, False]]
+    assert _evaluate(levels, 100, 106)["sl_hit"][0]
+
+
+def test_missing_levels_never_trigger():
+    levels = SignalLevels([_row(1, "BUY", 100), _row(2, "BUY", 100, None, [105])])
+
+    result = _evaluate(levels, 1, 1000)
+
+    assert not result["sl_hit"].any()
+    assert result["closed"].tolist() == [False, True]
+    assert np.isnan(result["close_price"][0])
+
+
+def test_hit_take_profits_are_not_reported_again():
+    levels = SignalLevels([_row(1, "BUY", 100, 95, [105, 110])])
+
+    result = _evaluate(levels, 100, 106, tp_hit=np.array([[True, False]]))
+
+    assert not result["new_tp_hit"].any()
+    assert not result["closed"][0]
+
+
+def _per_bar_replay(levels, low, high, starts):
+    """Reference replay feeding evaluate_levels one candle at a time, like the live evaluator."""
+    count = len(levels)
+    tp_hit = levels.tp_hit.copy()
+    close_bar = np.full(count, -1)
+    close_price = np.full(count, np.nan)
+    for bar in range(len(low)):
+        active = np.flatnonzero((starts <= bar) & (close_bar < 0))
+        if not len(active):
+            continue
+        result = evaluate_levels(
+            levels.is_long[active], levels.entry[active], levels.stop_loss[active],
+            levels.take_profits[active], tp_hit[active],
+            np.full(len(active), low[bar]), np.full(len(active), high[bar])
+        )
+        tp_hit[active] |= result["new_tp_hit"]
+        closed = active[result["closed"]]
+        close_bar[closed] = bar
+        close_price[closed] = result["close_price"][result["closed"]]
+    return close_bar, close_price
+
+
+def test_replay_matches_the_per_bar_kernel():
+    rng = np.random.default_rng(7)
+    bars = 2000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    high = close * (1 + rng.uniform(0, 0.002, bars))
+    low = close * (1 - rng.uniform(0, 0.002, bars))
+    candles = {"time": np.arange(bars) * 3600, "low": low, "high": high}
+
+    rows = []
+    for signal_id in range(3000):
+        bar = int(rng.integers(0, bars))
+        entry = close[bar]
+        is_long = rng.random() < 0.5
+        distance = entry * rng.uniform(0.002, 0.03) * (1 if is_long else -1)
+        take_profits = [entry + (level + 1) * distance for level in range(int(rng.integers(0, 4)))]
+        stop_loss = entry - distance if rng.random() < 0.9 else None
+        rows.append(_row(signal_id, "BUY" if is_long else "SELL", entry, stop_loss, take_profits, bar * 3600))
+    levels = SignalLevels(rows)
+    starts = np.searchsorted(candles["time"], levels.created_at)
+
+    replayed = replay_levels(levels, candles, starts)
+    close_bar, close_price = _per_bar_replay(levels, low, high, starts)
+
+    assert (close_bar >= 0).sum() > 1000
+    np.testing.assert_array_equal(replayed["close_bar"], close_bar)
+    np.testing.assert_array_equal(replayed["close_price"], close_price)
@@ -0,0 +1,45 @@
+"""Tests of the static template regex checks, in particular under IGNORECASE."""
+
+import re
+
+import pytest
+
+from utils.regex_utils import LiteralScanner, find_unsafe_construct, required_literals
+
+
+@pytest.mark.parametrize("flags", [0, re.IGNORECASE])
+@pytest.mark.parametrize("pattern", [
+    r"(?:[^,]+,)+",
+    r"(?:[^\n]+\n)+",
+    r"(?:[^;]*;)*x",
+    r"(?:\d{1,3},)*\d+",
+])
+def test_terminated_repeats_are_safe(pattern, flags):
+    assert find_unsafe_construct(pattern, flags) is None
+
+
+@pytest.mark.parametrize("flags", [0, re.IGNORECASE])
+@pytest.mark.parametrize("pattern", [
+    r"(a+)+",
+    r"(\d+\s?)*",
+    r"(a|ab)+",
+    r"(\w|\d\.)*",
+])
+def test_ambiguous_repeats_are_rejected(pattern, flags):
+    assert find_unsafe_construct(pattern, flags) is not None
+
+
+def test_negated_class_terminator_respects_case_folding():
+    # [^a] can match "A" case-sensitively but not under IGNORECASE, so only the
+    # latter lets "A" split the iterations
+    assert find_unsafe_construct(r"(?:[^a]+A)+") is not None
+    assert find_unsafe_construct(r"(?:[^a]+A)+", re.IGNORECASE) is None
+
+
+def test_required_literals_under_ignorecase():
+    assert required_literals(r"Entry:\s*([\d.]+)", re.IGNORECASE) == ["Entry:"]
+    assert required_literals(r"(?:BUY|SELL)\s+(\w+)", re.IGNORECASE) == []
+
+    scanner = LiteralScanner(["Entry:"], re.IGNORECASE)
+    assert scanner.scan("ENTRY: 1.2345") == frozenset({scanner.normalize("Entry:")})
+    assert scanner.scan("Stop: 1.2") == frozenset()
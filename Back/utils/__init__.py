@@ -1,13 +1,14 @@
 """Utility functions for SignalFlux."""
 
 from .password_utils import hash_password, verify_password
-from .database_utils import get_db, close_db, db_session_required
+from .database_utils import get_db, get_read_db, close_db, db_session_required
 from .logger_utils import get_logger, get_module_logger
 
 __all__ = [
     "hash_password", 
     "verify_password", 
     "get_db", 
+    "get_read_db", 
     "close_db", 
     "db_session_required",
     "get_logger",
@@ -2,7 +2,8 @@
 API layer database utilities.
 
 These utilities are Flask-specific and handle database sessions within the HTTP request lifecycle.
-They use Flask's `g` object to store sessions per request.
+They use Flask's `g` object to store sessions per request. Read-only routes can use
+get_read_db() to query a read replica when POSTGRES_REPLICA_URLS is set.
 
 For non-HTTP contexts (CLI, background jobs, etc.), use DatabaseConnectionHandler directly:
     db_handler = DatabaseConnectionHandler()
@@ -12,13 +13,22 @@ For non-HTTP contexts (CLI, background jobs, etc.), use DatabaseConnectionHandle
     db.close()
 """
 
+import threading
+import time
 from functools import wraps
 from flask import g
-from config.database_handler import DatabaseConnectionHandler
+from config.database_handler import DatabaseConnectionHandler, HAS_WRITES_KEY
+from config.env_handler import EnvHandler
 
 # Global database handler instance (shared across requests)
 _db_handler = None
 
+env_handler = EnvHandler()
+
+# Account id -> monotonic time until which the account's reads go to the primary
+_read_pins = {}
+_read_pins_lock = threading.Lock()
+
 
 def get_db_handler() -> DatabaseConnectionHandler:
     """
@@ -54,6 +64,70 @@ def get_db():
     return g.db
 
 
+def pin_reads_to_primary(account_id) -> None:
+    """
+    Route an account's reads to the primary for READ_AFTER_WRITE_PIN_SECONDS.
+
+    Called after the account's request wrote, so it reads its own writes
+    even while the replicas catch up.
+
+    Args:
+        account_id: Account UUID
+    """
+    now = time.monotonic()
+    with _read_pins_lock:
+        _read_pins[str(account_id)] = now + env_handler.get_env("READ_AFTER_WRITE_PIN_SECONDS")
+        expired = [key for key, until in _read_pins.items() if until <= now]
+        for key in expired:
+            del _read_pins[key]
+
+
+def reads_pinned_to_primary(account_id) -> bool:
+    """Whether an account wrote recently enough that its reads must go to the primary."""
+    if account_id is None:
+        return False
+    with _read_pins_lock:
+        return _read_pins.get(str(account_id), 0) > time.monotonic()
+
+
+def get_read_db():
+    """
+    Get a read-only database session for current Flask request.
+    
+    The session is bound to a read replica within the allowed lag. It is the
+    request's get_db() session instead when no replica is configured or
+    healthy, and when the authenticated account wrote within
+    READ_AFTER_WRITE_PIN_SECONDS. Only use it for queries; replica data may
+    be slightly behind the primary.
+    
+    Returns:
+        SQLAlchemy Session instance
+    """
+    if 'read_db' not in g:
+        db_handler = get_db_handler()
+        session_factory = None
+        if db_handler.has_replicas and not reads_pinned_to_primary(getattr(g, 'account_id', None)):
+            session_factory = db_handler.get_read_session_factory()
+        
+        if session_factory is None or session_factory is db_handler.get_session_factory():
+            g.read_db = get_db()
+        else:
+            g.read_db = session_factory()
+    
+    return g.read_db
+
+
+def read_routing_stats() -> dict:
+    """Return read replica routing counters and the number of accounts pinned to the primary."""
+    now = time.monotonic()
+    with _read_pins_lock:
+        pinned = sum(1 for until in _read_pins.values() if until > now)
+    return {
+        **get_db_handler().replica_stats(),
+        'pinned_accounts': pinned,
+    }
+
+
 def close_db(error=None):
     """
     Close database session after Flask request completes.
@@ -64,8 +138,15 @@ def close_db(error=None):
     Args:
         error: Exception that occurred during request (if any)
     """
+    read_db = g.pop('read_db', None)
     db = g.pop('db', None)
+    if read_db is not None and read_db is not db:
+        read_db.close()
+    
     if db is not None:
+        account_id = getattr(g, 'account_id', None)
+        if account_id is not None and db.info.get(HAS_WRITES_KEY) and get_db_handler().has_replicas:
+            pin_reads_to_primary(account_id)
         db_gen = g.pop('db_gen', None)
         if db_gen:
             try:
@@ -0,0 +1,378 @@
+"""Static analysis helpers for user-supplied template regexes."""
+
+import re
+from typing import List, Optional
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# Zero-width ops that don't break a run of adjacent literal characters
+_ZERO_WIDTH_OPS = (sre_constants.AT,)
+
+_REPEAT_OPS = tuple(
+    op for op in (
+        sre_constants.MAX_REPEAT,
+        sre_constants.MIN_REPEAT,
+        getattr(sre_constants, 'POSSESSIVE_REPEAT', None),
+    ) if op is not None
+)
+
+# Longest template regex accepted at save time
+MAX_PATTERN_LENGTH = 500
+
+# First-character sets are computed over ASCII; NON_ASCII stands for every other character
+NON_ASCII = -1
+_ASCII = frozenset(range(128))
+_ANY_CHAR = _ASCII | {NON_ASCII}
+_CATEGORY_CHARS = {
+    sre_constants.CATEGORY_DIGIT: frozenset(ord(c) for c in '0123456789') | {NON_ASCII},
+    sre_constants.CATEGORY_SPACE: frozenset(ord(c) for c in ' \t\n\r\f\v') | {NON_ASCII},
+    sre_constants.CATEGORY_WORD: frozenset(
+        c for c in range(128) if chr(c).isalnum() or chr(c) == '_'
+    ) | {NON_ASCII},
+}
+_CATEGORY_CHARS[sre_constants.CATEGORY_NOT_DIGIT] = (_ASCII - _CATEGORY_CHARS[sre_constants.CATEGORY_DIGIT]) | {NON_ASCII}
+_CATEGORY_CHARS[sre_constants.CATEGORY_NOT_SPACE] = (_ASCII - _CATEGORY_CHARS[sre_constants.CATEGORY_SPACE]) | {NON_ASCII}
+_CATEGORY_CHARS[sre_constants.CATEGORY_NOT_WORD] = (_ASCII - _CATEGORY_CHARS[sre_constants.CATEGORY_WORD]) | {NON_ASCII}
+
+
+def required_literals(pattern: str, flags: int = 0, min_length: int = 2) -> List[str]:
+    """
+    Derive literal substrings that any match of a pattern must contain.
+
+    Only literals that are unconditionally part of a match are returned:
+    anything inside alternations, optional repeats or lookarounds is ignored.
+    The result is therefore a necessary (not sufficient) condition for a match.
+
+    Args:
+        pattern: Regex pattern string
+        flags: Flags the pattern is compiled with
+        min_length: Shortest literal worth returning
+
+    Returns:
+        List of required literal substrings (empty if none or if the pattern is invalid)
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return []
+
+    literals = []
+    _collect_literals(parsed, literals, min_length)
+    return literals
+
+
+def _collect_literals(items, literals: List[str], min_length: int) -> None:
+    """Walk a parsed pattern, appending runs of required literal characters."""
+    run = []
+
+    def flush():
+        if len(run) >= min_length:
+            literals.append(''.join(run))
+        run.clear()
+
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            run.append(chr(av))
+        elif op in _ZERO_WIDTH_OPS:
+            continue
+        elif op == sre_constants.SUBPATTERN:
+            flush()
+            _collect_literals(av[-1], literals, min_length)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) or op == getattr(sre_constants, 'POSSESSIVE_REPEAT', None):
+            flush()
+            min_count, _, item = av
+            if min_count >= 1:
+                _collect_literals(item, literals, min_length)
+        elif op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            flush()
+            _collect_literals(av, literals, min_length)
+        else:
+            flush()
+
+    flush()
+
+
+def find_unsafe_construct(pattern: str, flags: int = 0) -> Optional[str]:
+    """
+    Statically check a regex for constructs prone to catastrophic backtracking.
+
+    Rejected constructs:
+    - nested quantifiers, where a repeated group contains another repeat and
+      at least one of them is unbounded (e.g. (a+)+, (\\d+\\s?)*); a group
+      ending in a required character its inner repeats can't match is
+      allowed, since that character splits the iterations unambiguously
+      (e.g. (?:\\d{1,3},)*\\d+)
+    - ambiguous alternations inside an unbounded repeat, where two
+      alternatives can start with the same character or one can match
+      nothing (e.g. (a|ab)+, (\\w|\\d\\.)*)
+
+    Args:
+        pattern: Regex pattern string
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        Description of the problem, or None if the pattern looks safe
+
+    Raises:
+        re.error: If the pattern does not compile
+    """
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        return f"pattern is longer than {MAX_PATTERN_LENGTH} characters"
+
+    parsed = sre_parse.parse(pattern, flags)
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    return _check_items(parsed, ignore_case, outer_repeat=None)
+
+
+def _is_unbounded(max_count) -> bool:
+    return max_count == sre_constants.MAXREPEAT
+
+
+def _check_items(items, ignore_case: bool, outer_repeat) -> Optional[str]:
+    """
+    Recursively look for unsafe constructs.
+
+    Args:
+        items: Parsed pattern items
+        ignore_case: Whether the pattern matches case-insensitively
+        outer_repeat: (min, max, terminator) of the closest enclosing repeat with
+            max > 1, if any; terminator is the set of characters its body must end with
+    """
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            min_count, max_count, item = av
+            if max_count > 1 and outer_repeat is not None:
+                if (_is_unbounded(max_count) or _is_unbounded(outer_repeat[1])) and not _terminated(item, outer_repeat[2], ignore_case):
+                    return "nested quantifiers (a repeated group contains another repeat)"
+            inner_outer = (min_count, max_count, _terminator(item, ignore_case)) if max_count > 1 else outer_repeat
+            problem = _check_items(item, ignore_case, inner_outer)
+            if problem:
+                return problem
+        elif op == sre_constants.BRANCH:
+            alternatives = av[1]
+            if outer_repeat is not None and _is_unbounded(outer_repeat[1]) and _alternatives_overlap(alternatives, ignore_case):
+                return "ambiguous alternation inside a repeat (alternatives can match the same text)"
+            for alternative in alternatives:
+                problem = _check_items(alternative, ignore_case, outer_repeat)
+                if problem:
+                    return problem
+        elif op == sre_constants.SUBPATTERN:
+            problem = _check_items(av[-1], ignore_case, outer_repeat)
+            if problem:
+                return problem
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            problem = _check_items(av[1], ignore_case, outer_repeat)
+            if problem:
+                return problem
+        elif op == getattr(sre_constants, 'ATOMIC_GROUP', None):
+            # Atomic groups never backtrack into themselves
+            continue
+        elif op == sre_constants.GROUPREF_EXISTS:
+            for branch in av[1:]:
+                if branch is not None:
+                    problem = _check_items(branch, ignore_case, outer_repeat)
+                    if problem:
+                        return problem
+    return None
+
+
+def _terminator(items, ignore_case: bool) -> Optional[frozenset]:
+    """Characters a repeated body must end with when its last item is a single literal or class, else None."""
+    while len(items) == 1 and items[0][0] == sre_constants.SUBPATTERN:
+        items = items[0][1][-1]
+    if not items:
+        return None
+    op, av = items[-1]
+    if op == sre_constants.LITERAL:
+        return _fold({av}, ignore_case)
+    if op == sre_constants.IN:
+        return _class_chars(av, ignore_case)
+    return None
+
+
+def _terminated(items, terminator: Optional[frozenset], ignore_case: bool) -> bool:
+    """Whether a repeat nested in a body ending with terminator can't run past the end of an iteration."""
+    if terminator is None:
+        return False
+    chars = _matched_chars(items, ignore_case)
+    return chars is not None and not chars & terminator
+
+
+def _matched_chars(items, ignore_case: bool) -> Optional[frozenset]:
+    """Set of characters a sequence can consume anywhere, or None if it can't be determined."""
+    result = frozenset()
+    for op, av in items:
+        if op in _ZERO_WIDTH_OPS:
+            continue
+        if op == sre_constants.LITERAL:
+            chars = _fold({av}, ignore_case)
+        elif op == sre_constants.NOT_LITERAL:
+            chars = _ANY_CHAR - _fold({av}, ignore_case)
+        elif op == sre_constants.ANY:
+            chars = _ANY_CHAR
+        elif op == sre_constants.IN:
+            chars = _class_chars(av, ignore_case)
+        elif op == sre_constants.SUBPATTERN:
+            chars = _matched_chars(av[-1], ignore_case)
+        elif op in _REPEAT_OPS:
+            chars = _matched_chars(av[2], ignore_case)
+        elif op == sre_constants.BRANCH:
+            chars = frozenset()
+            for alternative in av[1]:
+                alternative_chars = _matched_chars(alternative, ignore_case)
+                if alternative_chars is None:
+                    return None
+                chars |= alternative_chars
+        else:
+            return None
+        if chars is None:
+            return None
+        result |= chars
+    return result
+
+
+def _alternatives_overlap(alternatives, ignore_case: bool) -> bool:
+    """Whether any two alternatives can start with the same character (or one can be empty)."""
+    seen = set()
+    for alternative in alternatives:
+        first = _first_chars(alternative, ignore_case)
+        if first is None or first & seen:
+            return True
+        seen |= first
+    return False
+
+
+def _first_chars(items, ignore_case: bool) -> Optional[frozenset]:
+    """
+    Set of characters a sequence can start with.
+
+    Returns None when the sequence can match the empty string or its first
+    character can't be determined, which callers treat as "anything".
+    """
+    for op, av in items:
+        if op in _ZERO_WIDTH_OPS:
+            continue
+        if op == sre_constants.LITERAL:
+            return _fold({av}, ignore_case)
+        if op == sre_constants.NOT_LITERAL:
+            return _ANY_CHAR - _fold({av}, ignore_case)
+        if op == sre_constants.ANY:
+            return _ANY_CHAR
+        if op == sre_constants.IN:
+            return _class_chars(av, ignore_case)
+        if op == sre_constants.SUBPATTERN:
+            return _first_chars(av[-1], ignore_case)
+        if op in _REPEAT_OPS and av[0] >= 1:
+            return _first_chars(av[2], ignore_case)
+        if op == sre_constants.BRANCH:
+            result = frozenset()
+            for alternative in av[1]:
+                first = _first_chars(alternative, ignore_case)
+                if first is None:
+                    return None
+                result |= first
+            return result
+        return None
+    return None
+
+
+def _class_chars(items, ignore_case: bool) -> frozenset:
+    """Characters matched by a character class, approximated over ASCII."""
+    negate = False
+    chars = set()
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL:
+            chars.add(av if av < 128 else NON_ASCII)
+        elif op == sre_constants.RANGE:
+            low, high = av
+            chars.update(range(low, min(high, 127) + 1))
+            if high >= 128:
+                chars.add(NON_ASCII)
+        elif op == sre_constants.CATEGORY:
+            chars |= _CATEGORY_CHARS.get(av, _ANY_CHAR)
+        else:
+            chars |= _ANY_CHAR
+    chars = _fold(chars, ignore_case)
+    if negate:
+        return (_ANY_CHAR - chars) | {NON_ASCII}
+    return frozenset(chars)
+
+
+def _fold(chars, ignore_case: bool) -> frozenset:
+    """Map characters to ASCII codes (lowercased when ignoring case), others to NON_ASCII."""
+    folded = set()
+    for char in chars:
+        if char == NON_ASCII or char >= 128:
+            folded.add(NON_ASCII)
+        elif ignore_case:
+            folded.add(ord(chr(char).lower()))
+        else:
+            folded.add(char)
+    return frozenset(folded)
+
+
+class LiteralScanner:
+    """
+    Finds which of a set of literals occur in a text with a single regex pass.
+
+    Literals are tried longest-first inside a lookahead at every position, so
+    overlapping occurrences are all seen; a literal that is a substring of a
+    longer one found at the same position is credited through a precomputed
+    containment map. The result is exact for the given flags.
+    """
+
+    def __init__(self, literals, flags: int = 0):
+        """
+        Build the scanner.
+
+        Args:
+            literals: Iterable of literal strings
+            flags: re flags to match with (e.g. re.IGNORECASE)
+        """
+        normalize = str.lower if flags & re.IGNORECASE else (lambda value: value)
+        self._normalize = normalize
+        self.literals = sorted({normalize(literal) for literal in literals if literal}, key=len, reverse=True)
+
+        # Every literal that is found implies all the literals it contains
+        self._implied = [
+            frozenset(other for other in self.literals if other in literal)
+            for literal in self.literals
+        ]
+
+        if self.literals:
+            alternation = '|'.join(f'({re.escape(literal)})' for literal in self.literals)
+            self._pattern = re.compile(f'(?=(?:{alternation}))', flags)
+        else:
+            self._pattern = None
+
+    def normalize(self, literal: str) -> str:
+        """Return the form a literal takes in the scan results."""
+        return self._normalize(literal)
+
+    def scan(self, text: str) -> frozenset:
+        """
+        Return the set of literals that occur in a text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Frozenset of (normalized) literals present in the text
+        """
+        if self._pattern is None:
+            return frozenset()
+
+        found = set()
+        implied = self._implied
+        for match in self._pattern.finditer(text):
+            found |= implied[match.lastindex - 1]
+            if len(found) == len(self.literals):
+                break
+        return frozenset(found)
@@ -1,13 +1,14 @@
 import React from "react";
 import useGet from "@/api/query";
 import { RefreshCw } from "lucide-react";
-import { useGetMarketData } from "@/services/market-data.service";
+import { useMarketDataStream } from "@/services/market-data.service";
 
 interface MarketTickerItemProps {
   symbol: string;
   price: number;
   change: number;
   isLoading?: boolean;
+  stale?: boolean;
 }
 
 const MarketTickerItem: React.FC<MarketTickerItemProps> = ({
@@ -15,6 +16,7 @@ const MarketTickerItem: React.FC<MarketTickerItemProps> = ({
   price,
   change,
   isLoading = false,
+  stale = false,
 }) => {
   const formatPrice = (price: number, symbol: string): string => {
     if (symbol === "BTCUSD") {
@@ -29,7 +31,12 @@ const MarketTickerItem: React.FC<MarketTickerItemProps> = ({
   };
 
   return (
-    <div className="flex items-center gap-2 px-3 py-1.5 bg-white dark:bg-slate-900 rounded-lg border border-slate-200 dark:border-slate-800 shadow-sm min-w-[120px]">
+    <div
+      className={`flex items-center gap-2 px-3 py-1.5 bg-white dark:bg-slate-900 rounded-lg border border-slate-200 dark:border-slate-800 shadow-sm min-w-[120px] ${
+        stale ? "opacity-60" : ""
+      }`}
+      title={stale ? "Last known price, live data temporarily unavailable" : undefined}
+    >
       <span className="font-bold text-xs text-slate-900 dark:text-white">
         {symbol}
       </span>
@@ -56,14 +63,13 @@ const MarketTickerItem: React.FC<MarketTickerItemProps> = ({
 
 interface MarketTickerProps {
   symbols?: string[];
-  refreshInterval?: number;
 }
 
 const MarketTicker: React.FC<MarketTickerProps> = ({
   symbols = ["XAUUSD", "BTCUSD", "EURUSD", "GBPJPY"],
-  refreshInterval = 60000, // 1 minute default
 }) => {
-  const { data, isLoading } = useGetMarketData(symbols, refreshInterval);
+  // Live quotes pushed by the server instead of polling on an interval
+  const { data, isLoading } = useMarketDataStream(symbols);
 
   const marketData = data || {};
 
@@ -93,6 +99,7 @@ const MarketTicker: React.FC<MarketTickerProps> = ({
             price={symbolData?.price || 0}
             change={symbolData?.change_percent || 0}
             isLoading={isLoading && !symbolData}
+            stale={symbolData?.stale}
           />
         );
       })}
@@ -1,4 +1,15 @@
+import { useEffect, useState } from "react";
+
 import useGet from "@/api/query";
+import { generateHeaders } from "@/api/axiosClient";
+import getEnv from "@/utilities/envs.util";
+import { toQueryString } from "@/utilities/misc.util";
+
+const { VITE_BASE_API_URL } = getEnv();
+
+// Reconnect delays of the quote stream, doubled after each failed attempt
+const STREAM_RETRY_MIN_MS = 1000;
+const STREAM_RETRY_MAX_MS = 30000;
 
 export interface MarketData {
   symbol: string;
@@ -6,6 +17,7 @@ export interface MarketData {
   change_percent: number;
   change?: number;
   error?: string;
+  stale?: boolean;
 }
 
 export const useGetMarketData = (
@@ -28,3 +40,101 @@ export const useGetMarketData = (
     isLoading,
   };
 };
+
+/**
+ * Subscribes to live quotes over the server-sent event stream.
+ *
+ * EventSource can't send the Authorization header, so the stream is read
+ * with fetch. The first event is a snapshot of all symbols; later events
+ * only carry the quotes that changed.
+ */
+export const useMarketDataStream = (symbols: string[]) => {
+  const [data, setData] = useState<Record<string, MarketData>>({});
+  const [isLoading, setIsLoading] = useState(true);
+  const symbolsKey = symbols.join(",");
+
+  useEffect(() => {
+    const controller = new AbortController();
+    let retryDelay = STREAM_RETRY_MIN_MS;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const handleEvent = (block: string) => {
+      let event = "message";
+      const dataLines: string[] = [];
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event:")) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          dataLines.push(line.slice(5).trim());
+        }
+      }
+      if (event !== "quotes" || dataLines.length === 0) {
+        return;
+      }
+      const quotes = JSON.parse(dataLines.join("\n")) as Record<
+        string,
+        MarketData
+      >;
+      setData((previous) => ({ ...previous, ...quotes }));
+      setIsLoading(false);
+    };
+
+    const connect = async () => {
+      try {
+        const response = await fetch(
+          `${VITE_BASE_API_URL}market-data/stream${toQueryString({
+            symbols: symbolsKey,
+          })}`,
+          {
+            headers: generateHeaders(true, "", "GET") as Record<string, string>,
+            signal: controller.signal,
+          }
+        );
+        if (!response.ok || !response.body) {
+          throw new Error(`Quote stream failed with status ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        retryDelay = STREAM_RETRY_MIN_MS;
+
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) {
+            break;
+          }
+          buffer += decoder.decode(value, { stream: true });
+          let boundary = buffer.indexOf("\n\n");
+          while (boundary !== -1) {
+            handleEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf("\n\n");
+          }
+        }
+      } catch (error) {
+        if (controller.signal.aborted) {
+          return;
+        }
+        console.error("Error streaming market data:", error);
+      }
+
+      if (!controller.signal.aborted) {
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, STREAM_RETRY_MAX_MS);
+      }
+    };
+
+    connect();
+
+    return () => {
+      controller.abort();
+      clearTimeout(retryTimer);
+    };
+  }, [symbolsKey]);
+
+  return {
+    data,
+    isLoading,
+  };
+};